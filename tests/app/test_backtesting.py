@@ -0,0 +1,555 @@
+"""
+Test if vectorized backtesting paths match the event-driven replay
+"""
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+import numpy as np
+import talib
+
+from vnpy.app.cta_strategy import ArrayManager, CtaTemplate
+from vnpy.app.cta_strategy.backtesting import (
+    BacktestingEngine,
+    BacktestingMode,
+    DailyResult,
+    OrderBook,
+    load_bar_data,
+    optimize,
+)
+from vnpy.app.cta_strategy.base import StopOrderStatus
+from vnpy.app.cta_strategy.strategies.double_ma_strategy import DoubleMaStrategy
+from vnpy.trader.columnar import BarBuffer
+from vnpy.trader.constant import Direction, Exchange, Interval, Status
+from vnpy.trader.object import BarData
+
+START = datetime(2019, 1, 1)
+
+
+def generate_bars(seed: int, days: int = 10):
+    rng = np.random.RandomState(seed)
+    close = 3000 + np.cumsum(rng.randn(days * 1440))
+
+    bars = []
+    for n, close_price in enumerate(close):
+        open_price = close_price + rng.randn() * 0.3
+        bars.append(BarData(
+            symbol="rb",
+            exchange=Exchange.SHFE,
+            datetime=START + timedelta(minutes=n),
+            interval=Interval.MINUTE,
+            open_price=round(open_price),
+            high_price=round(max(open_price, close_price) + abs(rng.randn())),
+            low_price=round(min(open_price, close_price) - abs(rng.randn())),
+            close_price=round(close_price),
+            volume=10,
+            gateway_name="DB"
+        ))
+    return bars
+
+
+class TargetStrategy(CtaTemplate):
+    """
+    Hold 1 lot in direction of fast/slow MA, cancelling unfilled orders
+    on every bar.
+    """
+
+    fast_window = 10
+    slow_window = 20
+    parameters = ["fast_window", "slow_window"]
+
+    def on_init(self):
+        self.am = ArrayManager()
+        self.load_bar(1)
+
+    def on_bar(self, bar: BarData):
+        self.cancel_all()
+
+        am = self.am
+        am.update_bar(bar)
+        if not am.inited:
+            return
+
+        fast_ma = am.sma(self.fast_window)
+        slow_ma = am.sma(self.slow_window)
+        target = 1 if fast_ma > slow_ma else -1
+
+        if target > 0 and self.pos < target:
+            if self.pos < 0:
+                self.cover(bar.close_price, -self.pos)
+            self.buy(bar.close_price, target - max(self.pos, 0))
+        elif target < 0 and self.pos > target:
+            if self.pos > 0:
+                self.sell(bar.close_price, self.pos)
+            self.short(bar.close_price, min(self.pos, 0) - target)
+
+    def generate_signals(self, data):
+        close = data.close_price
+        fast_ma = talib.SMA(close, self.fast_window)
+        slow_ma = talib.SMA(close, self.slow_window)
+
+        target = np.where(fast_ma > slow_ma, 1, -1)
+        target[:self.am.size - 1] = 0
+        return target, close, None
+
+
+class EventTargetStrategy(TargetStrategy):
+    """
+    TargetStrategy without generate_signals.
+    """
+
+    generate_signals = CtaTemplate.generate_signals
+
+
+class IdleStrategy(CtaTemplate):
+    """
+    Never send any order.
+    """
+
+    def on_init(self):
+        self.load_bar(1)
+
+
+class TestBacktesting(unittest.TestCase):
+
+    def create_engine(self, strategy_class: type, bars: list, **kwargs):
+        engine = BacktestingEngine()
+        engine.output = lambda msg: None
+        engine.set_parameters(
+            "rb.SHFE", Interval.MINUTE, START, 0.0001, 1, 10, 1,
+            kwargs.pop("capital", 1_000_000), START + timedelta(days=40),
+            **kwargs
+        )
+        engine.add_strategy(strategy_class, {})
+        engine.history_data = bars
+        return engine
+
+    def run_both(self, strategy_class: type, seed: int, days: int = 10):
+        bars = generate_bars(seed, days)
+
+        engine = self.create_engine(strategy_class, bars)
+        engine.run_backtesting()
+        event_df = engine.calculate_result()
+
+        engine = self.create_engine(strategy_class, bars)
+        vector_df = engine.run_vector_backtesting()
+        return event_df, vector_df
+
+    def test_calculate_result(self):
+        engine = self.create_engine(TargetStrategy, generate_bars(0))
+        engine.run_backtesting()
+        df = engine.calculate_result()
+
+        # Reference: DailyResult calculated one day at a time.
+        results = {d: DailyResult(d, r.close_price) for d, r in engine.daily_results.items()}
+        for trade in engine.trades.values():
+            results[trade.datetime.date()].add_trade(trade)
+
+        pre_close = 0
+        start_pos = 0
+        for result in results.values():
+            result.calculate_pnl(pre_close, start_pos, engine.size, engine.rate, engine.slippage)
+            pre_close = result.close_price
+            start_pos = result.end_pos
+
+        self.assertEqual(df.index.tolist(), list(results))
+        for name in df.columns:
+            expected = [getattr(result, name) for result in results.values()]
+            if name == "trades":
+                self.assertEqual(df[name].tolist(), expected)
+            else:
+                self.assertEqual(df[name].tolist(), expected, name)
+
+        self.assertEqual(df["start_pos"].dtype, np.int64)
+        self.assertEqual(df["end_pos"].dtype, np.int64)
+        self.assertEqual(df["trade_count"].dtype, np.int64)
+
+    def test_vector_exact(self):
+        # Exact for strategies re-sending orders towards target on every bar.
+        for seed in range(3):
+            event_df, vector_df = self.run_both(TargetStrategy, seed)
+
+            self.assertEqual(event_df.index.tolist(), vector_df.index.tolist())
+            for name in event_df.columns:
+                if name == "trades":
+                    continue
+                self.assertTrue(
+                    np.allclose(event_df[name].values, vector_df[name].values),
+                    f"seed {seed} {name}"
+                )
+            self.assertEqual(vector_df["end_pos"].dtype, np.int64)
+
+    def test_vector_fallback(self):
+        # Strategies without generate_signals are replayed bar by bar.
+        bars = generate_bars(0)
+        engine = self.create_engine(TargetStrategy, bars)
+        engine.run_backtesting()
+        expected = engine.calculate_result()
+
+        engine = self.create_engine(EventTargetStrategy, bars)
+        df = engine.run_vector_backtesting()
+        self.assertTrue(engine.trades)
+        self.assertTrue(df.drop(columns="trades").equals(expected.drop(columns="trades")))
+
+    def test_vector_approximation(self):
+        # DoubleMaStrategy never cancels orders and sizes orders by filled
+        # position only, which the target model only approximates.
+        for seed in range(5):
+            event_df, vector_df = self.run_both(DoubleMaStrategy, seed, 20)
+
+            pos_differs = (event_df["end_pos"].values != vector_df["end_pos"].values).mean()
+            self.assertLessEqual(pos_differs, 0.2)
+
+            event_pnl = event_df["net_pnl"].sum()
+            vector_pnl = vector_df["net_pnl"].sum()
+            self.assertLess(abs(vector_pnl - event_pnl), abs(event_pnl) * 0.1)
+
+    def run_statistics(self, strategy_class: type, bars: list, **kwargs):
+        engine = self.create_engine(strategy_class, bars, **kwargs)
+        engine.run_backtesting()
+        if not engine.streaming:
+            engine.calculate_result()
+        return engine.calculate_statistics(output=False)
+
+    def assert_statistics_equal(self, statistics, expected):
+        self.assertEqual(list(statistics), list(expected))
+        for key, value in expected.items():
+            if isinstance(value, (float, np.floating)):
+                self.assertTrue(
+                    np.isclose(statistics[key], value, rtol=1e-9, equal_nan=True),
+                    f"{key}: {statistics[key]} != {value}"
+                )
+            else:
+                self.assertEqual(statistics[key], value, key)
+
+    def test_streaming_statistics(self):
+        bars = generate_bars(0, 20)
+        # Small capital makes balance negative, with undefined returns.
+        for strategy_class, capital in (
+            (TargetStrategy, 1_000_000),
+            (DoubleMaStrategy, 1_000_000),
+            (TargetStrategy, 20_000),
+        ):
+            with self.subTest(strategy=strategy_class.__name__, capital=capital):
+                expected = self.run_statistics(strategy_class, bars, capital=capital)
+                statistics = self.run_statistics(
+                    strategy_class, bars, capital=capital, streaming=True
+                )
+                self.assert_statistics_equal(statistics, expected)
+
+        # Finished days are dropped during replay.
+        engine = self.create_engine(TargetStrategy, bars, streaming=True)
+        engine.run_backtesting()
+        self.assertFalse(engine.daily_results)
+        self.assertFalse(engine.trades)
+        self.assertEqual(set(engine.limit_orders), set(engine.active_limit_orders))
+
+    def test_streaming_no_trade(self):
+        bars = generate_bars(0, 3)
+        expected = self.run_statistics(IdleStrategy, bars)
+        statistics = self.run_statistics(IdleStrategy, bars, streaming=True)
+        self.assertEqual(expected["total_days"], 0)
+        self.assertEqual(statistics, expected)
+
+    def test_drawdown_limit(self):
+        bars = generate_bars(0, 20)
+        engine = self.create_engine(TargetStrategy, bars, capital=50_000)
+        engine.run_backtesting()
+        df = engine.calculate_result()
+        engine.calculate_statistics(df, output=False)
+
+        limit = -df["ddpercent"].min() / 2
+        stop_day = (-df["ddpercent"] >= limit).values.argmax()
+        self.assertLess(stop_day, len(df) - 1)
+
+        statistics = self.run_statistics(
+            TargetStrategy, bars, capital=50_000,
+            streaming=True, drawdown_limit=limit
+        )
+        self.assertEqual(statistics["end_date"], df.index[stop_day])
+        self.assertEqual(statistics["total_days"], stop_day + 1)
+        self.assertAlmostEqual(statistics["end_balance"], df["balance"].iloc[stop_day])
+
+    def test_optimize_streaming(self):
+        buffer = BarBuffer()
+        buffer.extend(generate_bars(0, 20))
+
+        args = (
+            "sharpe_ratio", TargetStrategy, {}, "rb.SHFE", Interval.MINUTE,
+            START, 0.0001, 1, 10, 1, 1_000_000, START + timedelta(days=40),
+            BacktestingMode.BAR
+        )
+        with mock.patch(
+            "vnpy.app.cta_strategy.backtesting.database_manager"
+        ) as database_manager, mock.patch(
+            "vnpy.app.cta_strategy.backtesting.BacktestingEngine.output"
+        ):
+            database_manager.load_bar_buffer.return_value = buffer
+            load_bar_data.cache_clear()
+
+            _, target, expected = optimize(*args)
+            _, streaming_target, statistics = optimize(*args, streaming=True)
+            load_bar_data.cache_clear()
+
+        self.assertAlmostEqual(streaming_target, target)
+        self.assert_statistics_equal(statistics, expected)
+
+
+def create_bar(dt: datetime, open_price, high_price, low_price, close_price):
+    return BarData(
+        symbol="rb",
+        exchange=Exchange.SHFE,
+        datetime=dt,
+        interval=Interval.MINUTE,
+        open_price=open_price,
+        high_price=high_price,
+        low_price=low_price,
+        close_price=close_price,
+        volume=10,
+        gateway_name="DB"
+    )
+
+
+class ScriptStrategy(CtaTemplate):
+    """
+    Run actions[n] on the n-th bar after initialization, and
+    on_trade_action on every trade.
+    """
+
+    def __init__(self, cta_engine, strategy_name, vt_symbol, setting):
+        super().__init__(cta_engine, strategy_name, vt_symbol, setting)
+        self.bar_count = 0
+        self.actions = {}
+        self.on_trade_action = None
+        self.trade_list = []
+
+    def on_init(self):
+        self.load_bar(1)
+
+    def on_bar(self, bar: BarData):
+        if not self.trading:
+            return
+
+        action = self.actions.get(self.bar_count, None)
+        if action:
+            action(self)
+        self.bar_count += 1
+
+    def on_trade(self, trade):
+        self.trade_list.append(trade)
+        if self.on_trade_action:
+            self.on_trade_action(self, trade)
+
+
+class RandomOrderStrategy(CtaTemplate):
+    """
+    Keep a random ladder of limit and stop orders around close price,
+    cancelling random orders on bars and trades.
+    """
+
+    def on_init(self):
+        self.rng = np.random.RandomState(0)
+        self.vt_orderids = []
+        self.load_bar(1)
+
+    def on_bar(self, bar: BarData):
+        self.cancel_random()
+        for _ in range(self.rng.randint(4)):
+            method = [self.buy, self.sell, self.short, self.cover][self.rng.randint(4)]
+            price = bar.close_price + self.rng.randint(-5, 6)
+            stop = bool(self.rng.randint(2))
+            self.vt_orderids.extend(method(price, 1, stop))
+
+    def on_trade(self, trade):
+        self.cancel_random()
+
+    def cancel_random(self):
+        if self.vt_orderids and self.rng.rand() < 0.3:
+            ix = self.rng.randint(len(self.vt_orderids))
+            self.cancel_order(self.vt_orderids.pop(ix))
+
+
+class ScanOrderBook(OrderBook):
+    """
+    Order book checking every order in sending order, as the engine did
+    before orders were indexed by price.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.orders = {}
+
+    def add(self, orderid: str, direction: Direction, price: float):
+        super().add(orderid, direction, price)
+        self.orders[orderid] = (direction, price)
+
+    def remove(self, orderid: str):
+        super().remove(orderid)
+        self.orders.pop(orderid, None)
+
+    def get_above(self, direction: Direction, price: float):
+        return [
+            orderid for orderid, (d, p) in self.orders.items()
+            if d == direction and p >= price
+        ]
+
+    def get_below(self, direction: Direction, price: float):
+        return [
+            orderid for orderid, (d, p) in self.orders.items()
+            if d == direction and p <= price
+        ]
+
+    def sort(self, orderids: list):
+        ids = set(orderids)
+        return [orderid for orderid in self.orders if orderid in ids]
+
+    def clear(self):
+        super().clear()
+        self.orders.clear()
+
+
+class TestOrderMatching(unittest.TestCase):
+
+    def run_script(self, prices: list, actions: dict, on_trade_action=None):
+        # One bar for initialization, then orders are sent on bar 0.
+        bars = [create_bar(START, 100, 100, 100, 100)]
+        for n, price in enumerate(prices):
+            bars.append(create_bar(START + timedelta(days=1, minutes=n), *price))
+
+        engine = BacktestingEngine()
+        engine.output = lambda msg: None
+        engine.set_parameters(
+            "rb.SHFE", Interval.MINUTE, START, 0, 0, 10, 1,
+            1_000_000, START + timedelta(days=2)
+        )
+        engine.add_strategy(ScriptStrategy, {})
+        engine.strategy.actions = actions
+        engine.strategy.on_trade_action = on_trade_action
+        engine.history_data = bars
+        engine.run_backtesting()
+        return engine
+
+    def get_trades(self, engine: BacktestingEngine):
+        return [
+            (trade.orderid, trade.direction, trade.price, trade.datetime.minute)
+            for trade in engine.strategy.trade_list
+        ]
+
+    def test_price_ladder(self):
+        def send(strategy):
+            # Limit orders 1-6
+            for price in (99, 101, 97):
+                strategy.buy(price, 1)
+            for price in (103, 100, 105):
+                strategy.short(price, 1)
+            # Stop orders
+            for price in (104, 102):
+                strategy.buy(price, 1, True)
+            for price in (96, 98):
+                strategy.short(price, 1, True)
+
+        engine = self.run_script(
+            [(100, 100, 100, 100), (100, 104, 98, 100)], {0: send}
+        )
+
+        long, short = Direction.LONG, Direction.SHORT
+        self.assertEqual(self.get_trades(engine), [
+            # Limit orders crossed by low/high, in sending order, filled
+            # at no worse than open price.
+            ("1", long, 99, 1),
+            ("2", long, 100, 1),
+            ("4", short, 103, 1),
+            ("5", short, 100, 1),
+            # Stop orders triggered by high/low after limit orders.
+            ("7", long, 104, 1),
+            ("8", long, 102, 1),
+            ("9", short, 98, 1),
+        ])
+        self.assertEqual(engine.strategy.pos, 1)
+
+        self.assertEqual(sorted(engine.active_limit_orders), ["BACKTESTING.3", "BACKTESTING.6"])
+        self.assertEqual(engine.limit_order_book.get_above(long, 0), ["BACKTESTING.3"])
+        self.assertEqual(engine.limit_order_book.get_above(short, 0), ["BACKTESTING.6"])
+        self.assertEqual(len(engine.active_stop_orders), 1)
+        stop_order = list(engine.active_stop_orders.values())[0]
+        self.assertEqual(stop_order.price, 96)
+
+    def test_cancel_in_on_trade(self):
+        def send(strategy):
+            for price in (101, 99, 97):
+                strategy.buy(price, 1)
+
+        def on_trade(strategy, trade):
+            # Replace order 2 once order 1 is filled.
+            if trade.orderid == "1":
+                strategy.cancel_order("BACKTESTING.2")
+                strategy.buy(100, 1)
+
+        engine = self.run_script(
+            [(100, 100, 100, 100), (100, 101, 96, 98), (100, 100, 99, 100)],
+            {0: send},
+            on_trade
+        )
+
+        long = Direction.LONG
+        self.assertEqual(self.get_trades(engine), [
+            ("1", long, 100, 1),
+            ("3", long, 97, 1),
+            # Order sent in on_trade is crossed from the next bar.
+            ("4", long, 100, 2),
+        ])
+        self.assertEqual(engine.limit_orders["BACKTESTING.2"].status, Status.CANCELLED)
+        self.assertFalse(engine.active_limit_orders)
+        self.assertFalse(engine.limit_order_book.keys)
+
+    def test_stop_with_limit(self):
+        def send(strategy):
+            strategy.buy(102, 1, True)
+            strategy.short(101, 1)
+
+        engine = self.run_script(
+            [(100, 100, 100, 100), (100, 103, 99, 101), (100, 103, 99, 101)],
+            {0: send}
+        )
+
+        self.assertEqual(self.get_trades(engine), [
+            ("1", Direction.SHORT, 101, 1),
+            ("2", Direction.LONG, 102, 1),
+        ])
+        self.assertEqual(engine.strategy.pos, 0)
+
+        stop_order = list(engine.stop_orders.values())[0]
+        self.assertEqual(stop_order.status, StopOrderStatus.TRIGGERED)
+        self.assertEqual(stop_order.vt_orderid, "BACKTESTING.2")
+        self.assertEqual(engine.limit_orders["BACKTESTING.2"].status, Status.ALLTRADED)
+        self.assertFalse(engine.active_limit_orders)
+        self.assertFalse(engine.active_stop_orders)
+
+    def test_scan_parity(self):
+        # Same trades as checking every active order on every bar.
+        bars = generate_bars(1, 3)
+        results = []
+        for order_book_class in (OrderBook, ScanOrderBook):
+            engine = BacktestingEngine()
+            engine.output = lambda msg: None
+            engine.set_parameters(
+                "rb.SHFE", Interval.MINUTE, START, 0.0001, 1, 10, 1,
+                1_000_000, START + timedelta(days=40)
+            )
+            engine.add_strategy(RandomOrderStrategy, {})
+            engine.limit_order_book = order_book_class()
+            engine.stop_order_book = order_book_class()
+            engine.history_data = bars
+            engine.run_backtesting()
+
+            results.append([
+                (trade.orderid, trade.direction, trade.price, trade.datetime)
+                for trade in engine.trades.values()
+            ])
+
+        self.assertGreater(len(results[0]), 1000)
+        self.assertEqual(results[0], results[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
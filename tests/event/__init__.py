@@ -0,0 +1,3 @@
+from .test_engine import *
+from .test_shm import *
+from .test_async_engine import *
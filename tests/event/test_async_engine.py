@@ -0,0 +1,118 @@
+"""
+Test if asyncio event engine works fine
+"""
+import asyncio
+import threading
+import time
+import unittest
+
+from vnpy.event import AsyncEventEngine, Event, PRIORITY_TRADING
+
+
+def wait_for(condition, timeout=5):
+    end = time.time() + timeout
+    while not condition() and time.time() < end:
+        time.sleep(0.005)
+    return condition()
+
+
+class TestAsyncEventEngine(unittest.TestCase):
+
+    def test_handlers(self):
+        engine = AsyncEventEngine()
+        got = []
+
+        async def async_handler(event: Event):
+            await asyncio.sleep(0.001)
+            got.append(("async", event.data))
+
+        engine.register("eTest", async_handler)
+        engine.register("eTest", lambda event: got.append(("sync", event.data)))
+        engine.put(Event("eTest", 0))
+        engine.start()
+
+        threads = [
+            threading.Thread(
+                target=lambda: [engine.put(Event("eTest", n)) for n in range(1, 11)]
+            )
+        ]
+        [thread.start() for thread in threads]
+        [thread.join() for thread in threads]
+
+        end = time.time() + 5
+        while len(got) < 22 and time.time() < end:
+            time.sleep(0.01)
+        engine.stop()
+
+        expected = []
+        for n in range(11):
+            expected.extend([("async", n), ("sync", n)])
+        self.assertEqual(got, expected)
+
+    def test_run_coroutine(self):
+        engine = AsyncEventEngine()
+        engine.start()
+
+        async def query():
+            await asyncio.sleep(0.001)
+            return 1
+
+        self.assertEqual(engine.run_coroutine(query()).result(5), 1)
+        engine.stop()
+
+    def test_batch_and_priority(self):
+        engine = AsyncEventEngine(priority=True)
+        engine.set_priority("eOrder", PRIORITY_TRADING)
+        got = []
+        batches = []
+
+        async def batch_handler(events):
+            batches.append([event.data for event in events])
+
+        engine.register("eTick", lambda event: got.append(event.type))
+        engine.register("eOrder", lambda event: got.append(event.type))
+        engine.register_batch("eTick", batch_handler)
+
+        for n in range(5):
+            engine.put(Event("eTick", n))
+        engine.put(Event("eOrder"))
+        self.assertEqual(engine.get_queue_depth()[PRIORITY_TRADING], 1)
+
+        engine.start()
+        self.assertTrue(wait_for(lambda: len(got) == 6))
+        engine.stop()
+
+        self.assertEqual(got, ["eOrder"] + ["eTick"] * 5)
+        self.assertEqual(batches, [[0, 1, 2, 3, 4]])
+
+    def test_schedule_and_stats(self):
+        engine = AsyncEventEngine()
+        once = []
+        repeat = []
+
+        async def slow_callback():
+            await asyncio.sleep(0.002)
+            once.append(1)
+
+        engine.enable_stats()
+        engine.schedule(0.01, slow_callback)
+        engine.start()
+        timer_id = engine.schedule(0, lambda: repeat.append(1), 0.01)
+
+        self.assertTrue(wait_for(lambda: once and len(repeat) >= 3))
+        engine.cancel(timer_id)
+        time.sleep(0.03)
+        n = len(repeat)
+        time.sleep(0.03)
+        stats = engine.get_stats()
+        engine.stop()
+
+        self.assertEqual(len(repeat), n)
+        self.assertEqual(len(once), 1)
+        name = [name for name in stats["handlers"] if "slow_callback" in name][0]
+        self.assertGreaterEqual(stats["handlers"][name]["p50"], 0.002)
+        self.assertEqual(stats["queue_depth"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,272 @@
+"""
+Test if event engine works fine
+"""
+import threading
+import time
+import unittest
+
+from vnpy.event import (
+    Event,
+    EventEngine,
+    EVENT_TIMER,
+    EVENT_ENGINE_STATS,
+    EventQueue,
+    EventStats,
+    PRIORITY_LANES,
+    PRIORITY_TRADING,
+    PRIORITY_MARKET,
+    PRIORITY_LOG,
+    PRIORITY_TIMER,
+    partition_by_symbol
+)
+
+
+class Data:
+
+    def __init__(self, vt_symbol: str, n: int):
+        self.vt_symbol = vt_symbol
+        self.n = n
+
+
+def wait_for(condition, timeout: float = 5):
+    end = time.time() + timeout
+    while time.time() < end:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestEventEngine(unittest.TestCase):
+
+    def test_process(self):
+        engine = EventEngine()
+        got = []
+        engine.register("eTest", lambda event: got.append(event.data))
+        engine.start()
+
+        for i in range(100):
+            engine.put(Event("eTest", i))
+
+        self.assertTrue(wait_for(lambda: len(got) == 100))
+        self.assertEqual(got, list(range(100)))
+        engine.stop()
+
+    def test_partitioned_workers(self):
+        engine = EventEngine(workers=4, partition=partition_by_symbol)
+        got = {}
+        lock = threading.Lock()
+
+        def handler(event: Event):
+            with lock:
+                got.setdefault(event.data.vt_symbol, []).append(
+                    (event.data.n, threading.get_ident())
+                )
+
+        engine.register("eTick.", handler)
+        engine.start()
+
+        symbols = [f"s{i}.TEST" for i in range(20)]
+        for n in range(50):
+            for vt_symbol in symbols:
+                engine.put(Event("eTick.", Data(vt_symbol, n)))
+
+        self.assertTrue(
+            wait_for(lambda: sum(len(v) for v in got.values()) == 1000)
+        )
+        engine.stop()
+
+        for values in got.values():
+            # Events of one partition are processed in order by one worker.
+            self.assertEqual([n for n, _ in values], list(range(50)))
+            self.assertEqual(len(set(ident for _, ident in values)), 1)
+
+    def test_priority_lanes(self):
+        engine = EventEngine(priority=True)
+        engine.set_priority("eTrade.", PRIORITY_TRADING)
+        engine.set_priority("eTick.", PRIORITY_MARKET)
+        engine.set_priority("eLog", PRIORITY_LOG)
+
+        got = []
+        engine.register_general(lambda event: got.append(event.type))
+
+        engine.put(Event(EVENT_TIMER))
+        engine.put(Event("eLog"))
+        for _ in range(3):
+            engine.put(Event("eTick.BTC.TEST"))
+        engine.put(Event("eTrade."))
+
+        depth = engine.get_queue_depth()
+        self.assertEqual(depth[PRIORITY_TRADING], 1)
+        self.assertEqual(depth[PRIORITY_MARKET], 3)
+
+        engine.start()
+        self.assertTrue(wait_for(lambda: len(got) == 6))
+        engine.stop()
+
+        self.assertEqual(
+            got[:6],
+            ["eTrade."] + ["eTick.BTC.TEST"] * 3 + ["eLog", EVENT_TIMER]
+        )
+
+    def test_lane_starvation(self):
+        queue = EventQueue(PRIORITY_LANES, burst=10)
+        for n in range(100):
+            queue.put(Event("eTick.", n), PRIORITY_MARKET)
+        queue.put(Event("eLog"), PRIORITY_LOG)
+        queue.put(Event(EVENT_TIMER), PRIORITY_TIMER)
+
+        # Market data keeps coming while queue is drained.
+        got = []
+        for n in range(100, 130):
+            queue.put(Event("eTick.", n), PRIORITY_MARKET)
+            got.append(queue.get(block=False).type)
+        self.assertLessEqual(got.index("eLog"), 11)
+        self.assertLessEqual(got.index(EVENT_TIMER), 12)
+
+        # Events of the same lane keep their order.
+        ticks = [event.data for event in queue.get_many(200) if event.type == "eTick."]
+        self.assertEqual(ticks, list(range(28, 130)))
+        self.assertEqual(queue.qsize(), 0)
+
+    def test_conflated_handler(self):
+        engine = EventEngine()
+        got = []
+        lossless = []
+        release = threading.Event()
+
+        def slow_handler(event: Event):
+            release.wait()
+            got.append((event.data.vt_symbol, event.data.n))
+
+        conflated = engine.register_conflated("eTick.", slow_handler)
+        engine.register("eTick.", lambda event: lossless.append(event.data.n))
+        engine.start()
+
+        for n in range(100):
+            engine.put(Event("eTick.", Data("a.TEST", n)))
+            engine.put(Event("eTick.", Data("b.TEST", n)))
+
+        self.assertTrue(wait_for(lambda: len(lossless) == 200))
+        release.set()
+        self.assertTrue(wait_for(lambda: ("b.TEST", 99) in got))
+        engine.stop()
+
+        # Slow consumer gets latest value of each key, others get all.
+        self.assertIn(("a.TEST", 99), got)
+        self.assertLess(len(got), 200)
+        self.assertEqual(len(got) + conflated.get_skipped(), 200)
+        self.assertEqual(
+            conflated.get_skipped("a.TEST") + conflated.get_skipped("b.TEST"),
+            conflated.get_skipped()
+        )
+
+    def test_batch_handler(self):
+        engine = EventEngine()
+        batches = []
+        single = []
+        engine.register_batch("eTick.", lambda events: batches.append(events))
+        engine.register("eTick.", lambda event: single.append(event.data))
+
+        for n in range(500):
+            engine.put(Event("eTick.", n))
+            engine.put(Event("eLog", n))
+
+        engine.start()
+        self.assertTrue(
+            wait_for(lambda: sum(len(b) for b in batches) == 500)
+        )
+        engine.stop()
+
+        self.assertEqual(len(batches), 1)
+        self.assertEqual([event.data for event in batches[0]], list(range(500)))
+        self.assertEqual(single, list(range(500)))
+
+    def test_schedule(self):
+        engine = EventEngine()
+        once = []
+        repeat = []
+
+        engine.schedule(0.05, lambda: once.append(time.time()))
+        timer_id = engine.schedule(0.01, lambda: repeat.append(1), 0.01)
+        engine.start()
+
+        self.assertTrue(wait_for(lambda: once and len(repeat) >= 5))
+        engine.cancel(timer_id)
+        time.sleep(0.05)
+        n = len(repeat)
+        time.sleep(0.05)
+        self.assertEqual(len(repeat), n)
+        self.assertEqual(len(once), 1)
+
+        start = time.time()
+        engine.stop()
+        self.assertLess(time.time() - start, 0.5)
+
+    def test_stats(self):
+        engine = EventEngine()
+        reports = []
+
+        def slow_handler(event: Event):
+            time.sleep(0.002)
+
+        engine.register("eTest", slow_handler)
+        engine.register(EVENT_ENGINE_STATS, lambda event: reports.append(event.data))
+        engine.enable_stats(0.05)
+        engine.start()
+
+        for n in range(20):
+            engine.put(Event("eTest", n))
+
+        self.assertTrue(wait_for(lambda: reports))
+        self.assertTrue(wait_for(lambda: engine.get_stats()["count"] >= 20))
+        stats = engine.get_stats()
+        engine.stop()
+
+        self.assertEqual(stats["latency"]["eTest"]["count"], 20)
+        name = [name for name in stats["handlers"] if "slow_handler" in name][0]
+        self.assertGreaterEqual(stats["handlers"][name]["p50"], 0.002)
+        self.assertIn("queue_depth", stats)
+
+        engine.disable_stats()
+        self.assertEqual(engine.get_stats(), {})
+        self.assertNotIn("put", engine.__dict__)
+
+    def test_stats_conflated(self):
+        engine = EventEngine()
+
+        def slow_tick(event: Event):
+            time.sleep(0.002)
+
+        engine.register_conflated("eTick.", slow_tick)
+        engine.enable_stats()
+        engine.start()
+
+        for n in range(5):
+            engine.put(Event("eTick.", n))
+
+        def get_names():
+            return [name for name in engine.get_stats()["handlers"] if "slow_tick" in name]
+
+        self.assertTrue(wait_for(lambda: len(get_names()) == 2))
+        stats = engine.get_stats()
+        engine.stop()
+
+        names = sorted(get_names())
+        self.assertTrue(names[1].endswith("slow_tick (ConflatedHandler)"))
+        self.assertGreaterEqual(stats["handlers"][names[0]]["p50"], 0.002)
+
+    def test_stats_rate(self):
+        stats = EventStats()
+        for n in range(10):
+            stats.update_latency("eTest", 0)
+        time.sleep(0.01)
+
+        # Reading summary does not start a new window.
+        self.assertGreater(stats.get_summary()["events_per_second"], 0)
+        self.assertGreater(stats.get_summary(True)["events_per_second"], 0)
+        self.assertEqual(stats.get_summary()["events_per_second"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+"""
+Test if shared memory ring buffer works fine
+"""
+import os
+import time
+import unittest
+
+from vnpy.event import Event, EVENT_TIMER
+from vnpy.event.engine import EVENT_CALLBACK
+from vnpy.event.shm import ProcessEventEngine, SharedRingBuffer
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+
+@unittest.skipIf(shared_memory is None, "shared memory requires Python 3.8+")
+class TestSharedRingBuffer(unittest.TestCase):
+
+    def setUp(self):
+        name = f"vnpy_test_{os.getpid()}"
+        self.writer = SharedRingBuffer(name, 256, create=True)
+        self.reader = SharedRingBuffer(name)
+
+    def tearDown(self):
+        self.reader.close()
+        self.writer.close()
+
+    def test_wrap(self):
+        self.assertIsNone(self.reader.get())
+
+        got = []
+        for n in range(1000):
+            data = bytes([n % 256]) * (n % 50)
+            self.assertTrue(self.writer.put(data))
+            got.append(self.reader.get() == data)
+
+        self.assertTrue(all(got))
+        self.assertIsNone(self.reader.get())
+
+    def test_full(self):
+        n = 0
+        while self.writer.put(b"x" * 20):
+            n += 1
+
+        self.assertGreater(n, 0)
+        for _ in range(n):
+            self.assertEqual(self.reader.get(), b"x" * 20)
+        self.assertIsNone(self.reader.get())
+        self.assertTrue(self.writer.put(b"y"))
+
+
+class ListRing:
+    """Ring stub keeping records in a list."""
+
+    def __init__(self):
+        self.records = []
+
+    def put(self, data):
+        self.records.append(data)
+        return True
+
+
+class FullRing(ListRing):
+    """Ring stub with room for size records, freed by consume."""
+
+    def __init__(self, size):
+        super().__init__()
+        self.size = size
+
+    def put(self, data):
+        if len(self.records) >= self.size:
+            return False
+        return super().put(data)
+
+    def consume(self):
+        self.records.pop(0)
+
+
+class TestProcessEventEngine(unittest.TestCase):
+
+    def test_full_ring(self):
+        engine = ProcessEventEngine()
+        ring = FullRing(2)
+        other = ListRing()
+        engine.add_outbound(ring, ["eTick."], timeout=0.05)
+        engine.add_outbound(other, ["eTick."])
+        engine.start()
+
+        try:
+            for n in range(2):
+                engine.put(Event("eTick.", n))
+
+            # Full ring gives up after timeout, other rings still get event.
+            start = time.monotonic()
+            engine.put(Event("eTick.", 2))
+            elapsed = time.monotonic() - start
+
+            self.assertGreaterEqual(elapsed, 0.05)
+            self.assertLess(elapsed, 1)
+            self.assertEqual(engine.get_dropped(ring), 1)
+            self.assertEqual(engine.get_dropped(other), 0)
+            self.assertEqual(len(other.records), 3)
+
+            # Forwarding goes on once the consumer catches up.
+            ring.consume()
+            engine.put(Event("eTick.", 3))
+            self.assertEqual(engine.get_dropped(ring), 1)
+            data = [engine._codec.decode(data).data for data in ring.records]
+            self.assertEqual(data, [1, 3])
+        finally:
+            engine.stop()
+
+    def test_outbound_types(self):
+        engine = ProcessEventEngine()
+        ring = ListRing()
+        engine.add_outbound(ring, ["eTick.", EVENT_TIMER, EVENT_CALLBACK])
+
+        engine.put(Event("eTick.rb1905.SHFE", 1))
+        engine.put(Event("eOrder.", 2))
+        engine.put(Event(EVENT_TIMER))
+        engine.put(Event(EVENT_CALLBACK, lambda: None))
+
+        events = [engine._codec.decode(data) for data in ring.records]
+        self.assertEqual([event.type for event in events], ["eTick.rb1905.SHFE"])
+
+        with self.assertRaises(ValueError):
+            engine.add_outbound(ring, [""])
+        with self.assertRaises(TypeError):
+            engine.add_outbound(ring)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,2 +1,9 @@
 from .test_database import *
 from .test_settings import *
+from .test_codec import *
+from .test_columnar import *
+from .test_symbol import *
+from .test_utility import *
+from .test_indicator import *
+from .test_timestamp import *
+from .test_tick_indicator import *
@@ -0,0 +1,90 @@
+"""
+Benchmark timestamp utilities against strptime/time functions used by
+gateways and TimeUtils before. Run with: python benchmark_timestamp.py
+"""
+import time
+from datetime import datetime, timedelta
+from timeit import timeit
+
+from vnpy.trader.timestamp import (
+    parse_compact,
+    parse_iso,
+    parse_iso_timestamp,
+    to_local_timestamp,
+)
+from vnpy.trader.utility import TimeUtils
+
+NUMBER = 100000
+CHINA_OFFSET = timedelta(hours=8)
+
+
+def strptime_utc_to_local(text: str):
+    """utc_to_local of OKEX/ZB gateways before."""
+    return datetime.strptime(text, "%Y-%m-%dT%H:%M:%S.%fZ") + CHINA_OFFSET
+
+
+def localtime_convert_datetime(timestamp: float):
+    """TimeUtils.convert_datetime before."""
+    tm = time.localtime(timestamp)
+    return datetime(tm.tm_year, tm.tm_mon, tm.tm_mday, tm.tm_hour, tm.tm_min, tm.tm_sec)
+
+
+def mktime_convert_date2timestamp(date: str):
+    """TimeUtils.convert_date2timestamp before."""
+    return int(time.mktime(time.strptime(date, "%Y-%m-%d %H:%M:%S")))
+
+
+def compare(name: str, old, new):
+    """"""
+    old_time = timeit(old, number=NUMBER)
+    new_time = timeit(new, number=NUMBER)
+    print(
+        f"{name:<24}{old_time / NUMBER * 1e6:>8.2f}us{new_time / NUMBER * 1e6:>8.2f}us"
+        f"{old_time / new_time:>8.1f}x"
+    )
+
+
+def main():
+    """"""
+    iso = "2019-09-11T09:30:01.123Z"
+    compact = "20190911 21:05:09.5"
+    timestamp = 1568165401123000
+    seconds = 1568165401.7
+    date = "2019-09-11 09:30:01"
+    utils = TimeUtils()
+
+    print(f"{'':<24}{'old':>10}{'new':>10}{'speedup':>9}")
+    compare(
+        "iso utc_to_local",
+        lambda: strptime_utc_to_local(iso),
+        lambda: parse_iso(iso, CHINA_OFFSET)
+    )
+    compare(
+        "iso to timestamp",
+        lambda: int(strptime_utc_to_local(iso).timestamp() * 1000000),
+        lambda: parse_iso_timestamp(iso)
+    )
+    compare(
+        "ctp compact",
+        lambda: datetime.strptime(compact, "%Y%m%d %H:%M:%S.%f"),
+        lambda: parse_compact(compact)
+    )
+    compare(
+        "local timestamp",
+        lambda: datetime.fromtimestamp(timestamp / 1000000),
+        lambda: to_local_timestamp(timestamp)
+    )
+    compare(
+        "convert_datetime",
+        lambda: localtime_convert_datetime(seconds),
+        lambda: utils.convert_datetime(seconds)
+    )
+    compare(
+        "convert_date2timestamp",
+        lambda: mktime_convert_date2timestamp(date),
+        lambda: utils.convert_date2timestamp(date)
+    )
+
+
+if __name__ == "__main__":
+    main()
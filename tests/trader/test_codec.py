@@ -0,0 +1,66 @@
+"""
+Test if binary event codec works fine
+"""
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from vnpy.event import Event
+from vnpy.trader.codec import TraderEventCodec
+from vnpy.trader.constant import Direction, Exchange, Offset, Status
+from vnpy.trader.event import EVENT_ORDER, EVENT_TICK
+from vnpy.trader.object import OrderData, TickData
+
+
+class TestTraderEventCodec(unittest.TestCase):
+
+    def setUp(self):
+        self.codec = TraderEventCodec()
+
+    def test_tick(self):
+        tick = TickData(
+            symbol="BTCUSDT",
+            exchange=Exchange.HUOBI,
+            datetime=datetime(2019, 9, 11, 10, 49, 19, 123456),
+            gateway_name="HUOBI",
+            last_price=10000.5,
+            bid_price_1=10000,
+            ask_volume_5=3.25,
+        )
+        event = self.codec.decode(self.codec.encode(Event(EVENT_TICK, tick)))
+
+        self.assertEqual(event.type, EVENT_TICK)
+        self.assertEqual(event.data, tick)
+        self.assertEqual(event.data.vt_symbol, tick.vt_symbol)
+
+    def test_order(self):
+        order = OrderData(
+            symbol="BTCUSDT",
+            exchange=Exchange.HUOBI,
+            orderid="1",
+            direction=Direction.LONG,
+            offset=Offset.OPEN,
+            price=10000,
+            volume=1,
+            status=Status.NOTTRADED,
+            gateway_name="HUOBI",
+        )
+        event = self.codec.decode(self.codec.encode(Event(EVENT_ORDER, order)))
+        self.assertEqual(event.data, order)
+        self.assertEqual(event.data.vt_orderid, order.vt_orderid)
+
+    def test_fallback(self):
+        tick = TickData(
+            symbol="BTCUSDT",
+            exchange=Exchange.HUOBI,
+            datetime=datetime.now(timezone(timedelta(hours=8))),
+            gateway_name="HUOBI",
+        )
+        event = self.codec.decode(self.codec.encode(Event(EVENT_TICK, tick)))
+        self.assertEqual(event.data, tick)
+
+        event = self.codec.decode(self.codec.encode(Event("eLog", "text")))
+        self.assertEqual(event.data, "text")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+Test if columnar tick/bar buffers work fine
+"""
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from vnpy.trader.columnar import BarBuffer, TickBuffer
+from vnpy.trader.constant import Exchange, Interval
+from vnpy.trader.object import BarData, TickData
+
+
+class TestColumnar(unittest.TestCase):
+
+    def test_tick_buffer(self):
+        buffer = TickBuffer(capacity=2)
+        start = datetime(2019, 9, 11, 9, 0, 0, 500000)
+
+        ticks = []
+        for n in range(10):
+            tick = TickData(
+                symbol="rb1910",
+                exchange=Exchange.SHFE,
+                datetime=start + timedelta(seconds=n),
+                gateway_name="CTP",
+                last_price=3500 + n,
+                volume=100 * n,
+                bid_price_1=3499 + n,
+            )
+            ticks.append(tick)
+        buffer.extend(ticks)
+
+        self.assertEqual(len(buffer), 10)
+        self.assertEqual(list(buffer.last_price), [3500 + n for n in range(10)])
+
+        view = buffer[-1]
+        self.assertEqual(view.vt_symbol, "rb1910.SHFE")
+        self.assertEqual(view.exchange, Exchange.SHFE)
+        self.assertEqual(view.datetime, ticks[-1].datetime)
+        self.assertEqual(view.bid_price_1, 3508)
+        self.assertEqual(view.to_data(), ticks[-1])
+
+    def test_bar_buffer(self):
+        buffer = BarBuffer()
+        bar = BarData(
+            symbol="rb1910",
+            exchange=Exchange.SHFE,
+            datetime=datetime(2019, 9, 11, 9, 0),
+            interval=Interval.MINUTE,
+            gateway_name="DB",
+            close_price=3500,
+        )
+        buffer.append(bar)
+
+        self.assertEqual(buffer[0].interval, Interval.MINUTE)
+        self.assertEqual(buffer[0].to_data(), bar)
+
+    def test_from_columns(self):
+        start = np.datetime64("2019-09-11T09:00")
+        columns = {
+            "datetime": start + np.arange(25000) * np.timedelta64(1, "m"),
+            "close_price": np.arange(25000, dtype=float),
+            "volume": np.ones(25000),
+        }
+        buffer = BarBuffer.from_columns(
+            columns,
+            symbol="rb1910",
+            exchange=Exchange.SHFE,
+            interval=Interval.MINUTE,
+            gateway_name="DB"
+        )
+        self.assertEqual(len(buffer), 25000)
+
+        bars = list(buffer.iter_data())
+        self.assertEqual(len(bars), 25000)
+        self.assertEqual(bars[-1], buffer.to_data(24999))
+        self.assertEqual(bars[20001].close_price, 20001)
+        self.assertEqual(bars[20001].datetime, datetime(2019, 9, 25, 6, 21))
+        self.assertEqual(bars[0].vt_symbol, "rb1910.SHFE")
+        self.assertIsNot(bars[0], bars[1])
+
+        prices = []
+        last = None
+        for bar in buffer.iter_data(reuse=True):
+            prices.append(bar.close_price)
+            if last:
+                self.assertIs(bar, last)
+            last = bar
+        self.assertEqual(prices, list(range(25000)))
+        self.assertEqual(last, bars[-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,10 +4,14 @@ Test if database works fine
 import os
 import unittest
 from copy import copy
+from dataclasses import fields
 from datetime import datetime, timedelta
+from math import isnan
+
+import numpy as np
 
 from vnpy.trader.constant import Exchange, Interval
-from vnpy.trader.database.database import Driver
+from vnpy.trader.database.database import Driver, load_columns
 from vnpy.trader.object import BarData, TickData
 
 os.environ["VNPY_TESTING"] = "1"
@@ -61,7 +65,6 @@ tick = TickData(
     gateway_name="DB",
     symbol="test_symbol",
     exchange=Exchange.BITMEX,
-    timestamp=now().timestamp(),
     datetime=now(),
     name="DB_test_symbol",
 )
@@ -194,5 +197,135 @@ class TestDatabase(unittest.TestCase):
                 self.assertEqual(got.volume, newer_one.volume, "the newest tick we got mismatched")
 
 
+class TestDatabaseBuffer(unittest.TestCase):
+    """
+    Columnar loaders give the same data as load_bar_data/load_tick_data
+    on sqlite.
+    """
+
+    symbol = "buffer_symbol"
+    start = datetime(2019, 1, 1, 9)
+
+    def setUp(self) -> None:
+        from vnpy.trader.database.database_sql import init  # noqa
+
+        _, self.manager = init(Driver.SQLITE, {"database": "test_db.db"})
+        self.manager.clean(self.symbol)
+
+    def tearDown(self) -> None:
+        self.manager.clean(self.symbol)
+
+    def save_ticks(self, ticks: list):
+        # DbTickData.timestamp is required but not filled by from_tick.
+        db_ticks = []
+        for t in ticks:
+            db_tick = self.manager.class_tick.from_tick(t)
+            db_tick.timestamp = t.datetime.timestamp()
+            db_ticks.append(db_tick)
+        self.manager.class_tick.save_all(db_ticks)
+
+    def assertDataEqual(self, data, expected):
+        for field in fields(expected):
+            self.assertEqual(getattr(data, field.name), getattr(expected, field.name), field.name)
+
+    def test_load_bar_buffer(self):
+        rng = np.random.RandomState(0)
+        bars = []
+        for n in range(30):
+            price = 100 + rng.randn()
+            bars.append(BarData(
+                gateway_name="DB",
+                symbol=self.symbol,
+                exchange=Exchange.SHFE,
+                datetime=self.start + timedelta(minutes=n, microseconds=n),
+                interval=Interval.MINUTE,
+                volume=float(rng.randint(100)),
+                open_interest=float(rng.randint(1000)),
+                open_price=price,
+                high_price=price + 1,
+                low_price=price - 1,
+                close_price=price + rng.randn() * 0.1,
+            ))
+
+        # Inserted out of time order.
+        self.manager.save_bar_data(bars[15:])
+        self.manager.save_bar_data(bars[:15])
+
+        args = (self.symbol, Exchange.SHFE, Interval.MINUTE, self.start, self.start + timedelta(days=1))
+        expected = self.manager.load_bar_data(*args)
+        buffer = self.manager.load_bar_buffer(*args)
+
+        self.assertEqual(len(expected), 30)
+        self.assertEqual(len(buffer), len(expected))
+        for n, bar_data in enumerate(expected):
+            self.assertDataEqual(buffer.to_data(n), bar_data)
+            self.assertEqual(bar_data.datetime, bars[n].datetime)
+
+    def test_load_tick_buffer(self):
+        rng = np.random.RandomState(0)
+        ticks = []
+        for n in range(30):
+            price = 100 + rng.randn()
+            t = TickData(
+                gateway_name="DB",
+                symbol=self.symbol,
+                exchange=Exchange.SHFE,
+                datetime=self.start + timedelta(seconds=n, microseconds=500000),
+                name="buffer",
+                volume=float(n * 10),
+                open_interest=float(rng.randint(1000)),
+                last_price=price,
+                last_volume=float(rng.randint(10)),
+                limit_up=110,
+                limit_down=90,
+                open_price=100,
+                high_price=102,
+                low_price=98,
+                pre_close=99,
+            )
+            for i in range(1, 6):
+                setattr(t, f"bid_price_{i}", price - i)
+                setattr(t, f"ask_price_{i}", price + i)
+                setattr(t, f"bid_volume_{i}", float(rng.randint(1, 50)))
+                setattr(t, f"ask_volume_{i}", float(rng.randint(1, 50)))
+            ticks.append(t)
+
+        # Depth 2-5 of the last tick are stored as NULL.
+        for i in range(2, 6):
+            for name in ("bid_price", "ask_price", "bid_volume", "ask_volume"):
+                setattr(ticks[-1], f"{name}_{i}", 0)
+
+        self.save_ticks(ticks[10:])
+        self.save_ticks(ticks[:10])
+
+        args = (self.symbol, Exchange.SHFE, self.start, self.start + timedelta(days=1))
+        expected = self.manager.load_tick_data(*args)
+        buffer = self.manager.load_tick_buffer(*args)
+
+        self.assertEqual(len(expected), 30)
+        self.assertEqual(len(buffer), len(expected))
+        for n, tick_data in enumerate(expected[:-1]):
+            self.assertDataEqual(buffer.to_data(n), tick_data)
+            self.assertEqual(tick_data.datetime, ticks[n].datetime)
+
+        # NULL values are NaN in buffer, instead of 0 of TickData.
+        last = buffer.to_data(len(buffer) - 1)
+        self.assertEqual(last.bid_price_1, expected[-1].bid_price_1)
+        self.assertTrue(isnan(last.bid_price_2))
+        self.assertEqual(expected[-1].bid_price_2, 0)
+
+    def test_load_columns(self):
+        rows = [
+            (datetime(2019, 1, 1, 9), 1.0, None),
+            (datetime(2019, 1, 1, 9, 1), 2.0, 3.0),
+        ]
+        columns = load_columns(iter(rows), ["datetime", "volume", "open_interest"], chunk_size=1)
+
+        self.assertEqual(columns["datetime"].dtype, np.dtype("datetime64[us]"))
+        np.testing.assert_array_equal(columns["volume"], [1.0, 2.0])
+        self.assertTrue(isnan(columns["open_interest"][0]))
+        self.assertEqual(columns["open_interest"][1], 3.0)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,124 @@
+"""
+Test if incremental indicators match talib
+"""
+import unittest
+
+import numpy as np
+import talib
+
+from vnpy.trader.indicator import (
+    AdxIndicator,
+    AtrIndicator,
+    BollIndicator,
+    CciIndicator,
+    DonchianIndicator,
+    EmaIndicator,
+    KeltnerIndicator,
+    MacdIndicator,
+    RsiIndicator,
+    SmaIndicator,
+    StdIndicator,
+)
+from vnpy.trader.utility import ArrayManager
+
+from .test_utility import generate_bars
+
+
+class TestIndicator(unittest.TestCase):
+
+    def setUp(self):
+        self.bars = generate_bars(300)
+        self.high = np.array([bar.high_price for bar in self.bars])
+        self.low = np.array([bar.low_price for bar in self.bars])
+        self.close = np.array([bar.close_price for bar in self.bars])
+
+    def run_indicator(self, indicator):
+        values = []
+        for bar in self.bars:
+            values.append(indicator.update_bar(bar))
+        return values
+
+    def assert_match(self, values, expected):
+        values = np.array(values, dtype=float)
+        np.testing.assert_allclose(values, expected, rtol=1e-6, atol=1e-6)
+
+    def test_single_value(self):
+        high, low, close = self.high, self.low, self.close
+        cases = [
+            (SmaIndicator(20), talib.SMA(close, 20)),
+            (EmaIndicator(20), talib.EMA(close, 20)),
+            (StdIndicator(20), talib.STDDEV(close, 20)),
+            (AtrIndicator(14), talib.ATR(high, low, close, 14)),
+            (RsiIndicator(14), talib.RSI(close, 14)),
+            (CciIndicator(20), talib.CCI(high, low, close, 20)),
+            (AdxIndicator(14), talib.ADX(high, low, close, 14)),
+        ]
+        for indicator, expected in cases:
+            with self.subTest(indicator=type(indicator).__name__):
+                self.assert_match(self.run_indicator(indicator), expected)
+
+    def test_multiple_values(self):
+        high, low, close = self.high, self.low, self.close
+
+        values = self.run_indicator(MacdIndicator(12, 26, 9))
+        for n, expected in enumerate(talib.MACD(close, 12, 26, 9)):
+            self.assert_match([value[n] for value in values], expected)
+
+        values = self.run_indicator(DonchianIndicator(20))
+        self.assert_match([value[0] for value in values], talib.MAX(high, 20))
+        self.assert_match([value[1] for value in values], talib.MIN(low, 20))
+
+        values = self.run_indicator(BollIndicator(20, 2))
+        mid, std = talib.SMA(close, 20), talib.STDDEV(close, 20)
+        self.assert_match([value[0] for value in values], mid + std * 2)
+
+        values = self.run_indicator(KeltnerIndicator(20, 2))
+        mid, atr = talib.SMA(close, 20), talib.ATR(high, low, close, 20)
+        self.assert_match([value[1] for value in values], mid - atr * 2)
+
+    def test_std_high_price(self):
+        for bar in self.bars:
+            bar.close_price += 1e7
+        close = self.close + 1e7
+
+        expected = np.full(len(close), np.nan)
+        for i in range(19, len(close)):
+            expected[i] = close[i - 19:i + 1].std()
+        self.assert_match(self.run_indicator(StdIndicator(20)), expected)
+
+    def test_std_drift(self):
+        # Price drifts far away from the first close, then moves in a
+        # narrow range.
+        rng = np.random.RandomState(0)
+        change = np.concatenate([rng.randn(10000) + 1000, rng.randn(10000) * 0.01])
+        close = 100 + np.cumsum(change)
+
+        indicator = StdIndicator(20)
+        values = [indicator.update(0, 0, 0, price, 0) for price in close]
+
+        expected = talib.STDDEV(close, 20)
+        self.assert_match(values[:10000], expected[:10000])
+
+        # talib loses precision in the narrow range, compare with numpy.
+        for i in range(19, len(close)):
+            expected[i] = close[i - 19:i + 1].std()
+        np.testing.assert_allclose(values, expected, rtol=1e-6, atol=1e-5)
+
+    def test_array_manager(self):
+        am = ArrayManager(100)
+        for bar in self.bars[:150]:
+            am.update_bar(bar)
+
+        sma = am.get_indicator("sma", 10)
+        rsi = am.get_indicator("rsi", 14)
+        self.assertIs(am.get_indicator("sma", 10), sma)
+
+        for bar in self.bars[150:]:
+            am.update_bar(bar)
+            self.assertAlmostEqual(sma.value, am.sma(10))
+            # Wilder smoothing differs only by the truncated warm-up.
+            self.assertAlmostEqual(rsi.value, am.rsi(14), delta=0.1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+"""
+Test if symbol registry works fine
+"""
+import unittest
+from datetime import datetime
+
+from vnpy.trader.constant import Exchange
+from vnpy.trader.object import TickData, TradeData
+from vnpy.trader.symbol import symbol_registry
+from vnpy.trader.utility import extract_vt_symbol
+
+
+class TestSymbolRegistry(unittest.TestCase):
+
+    def test_shared_vt_symbol(self):
+        tick = TickData(
+            symbol="IF1910",
+            exchange=Exchange.CFFEX,
+            datetime=datetime.now(),
+            gateway_name="CTP",
+        )
+        trade = TradeData(
+            symbol="IF1910",
+            exchange=Exchange.CFFEX,
+            orderid="1",
+            tradeid="1",
+            gateway_name="CTP",
+        )
+
+        self.assertEqual(tick.vt_symbol, "IF1910.CFFEX")
+        self.assertIs(tick.vt_symbol, trade.vt_symbol)
+        self.assertIs(symbol_registry.intern("IF1910" + ".CFFEX"), tick.vt_symbol)
+
+    def test_extract_vt_symbol(self):
+        self.assertEqual(
+            extract_vt_symbol("IF1911.CFFEX"), ("IF1911", Exchange.CFFEX)
+        )
+        self.assertIs(
+            symbol_registry.parse("IF1911.CFFEX"),
+            symbol_registry.get("IF1911", Exchange.CFFEX)
+        )
+
+        with self.assertRaises(ValueError):
+            extract_vt_symbol("IF1911.UNKNOWN")
+
+
+if __name__ == '__main__':
+    unittest.main()
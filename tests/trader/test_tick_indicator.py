@@ -0,0 +1,142 @@
+"""
+Test if streaming tick indicators match their batch mode
+"""
+import unittest
+from math import isnan
+
+import numpy as np
+
+from vnpy.trader.columnar import TickBuffer
+from vnpy.trader.tick_indicator import (
+    Microprice,
+    OrderBookImbalance,
+    TickEma,
+    Vwap,
+    ZScore,
+)
+
+from .test_utility import generate_ticks
+
+
+def generate_book_ticks(count: int, seed: int = 0):
+    """"""
+    rng = np.random.RandomState(seed)
+    ticks = generate_ticks(count, seed)
+    for n, tick in enumerate(ticks):
+        price = tick.last_price or 3500
+        for i in range(1, 6):
+            setattr(tick, f"bid_price_{i}", price - i)
+            setattr(tick, f"ask_price_{i}", price + i)
+            setattr(tick, f"bid_volume_{i}", rng.randint(0, 50))
+            setattr(tick, f"ask_volume_{i}", rng.randint(0, 50))
+        # Flat prices and empty order book.
+        if 500 <= n < 600:
+            tick.last_price = tick.last_price and 3600
+        if n % 101 == 0:
+            tick.bid_volume_1 = 0
+            tick.ask_volume_1 = 0
+    return ticks
+
+
+class TestTickIndicator(unittest.TestCase):
+
+    def check(self, indicator, batch_indicator, ticks):
+        """"""
+        buffer = TickBuffer()
+        buffer.extend(ticks)
+        expected = batch_indicator.calculate(buffer)
+
+        values = np.array([indicator.update_tick(tick) for tick in ticks])
+        np.testing.assert_allclose(values, expected, rtol=1e-7, atol=1e-7)
+        return values
+
+    def test_ema(self):
+        ticks = generate_book_ticks(5000)
+        for n in (1, 2, 10, 300):
+            values = self.check(TickEma(n), TickEma(n), ticks)
+            self.assertTrue(isnan(values[0]))
+            self.assertEqual(values[1], ticks[1].last_price)
+
+    def test_vwap(self):
+        ticks = generate_book_ticks(3000)
+        values = self.check(Vwap(), Vwap(), ticks)
+
+        # New session after volume reset.
+        reset = 1000
+        volume_change = ticks[reset + 1].volume - ticks[reset].volume
+        if volume_change > 0 and ticks[reset + 1].last_price:
+            self.assertEqual(values[reset + 1], ticks[reset + 1].last_price)
+
+    def test_zscore(self):
+        ticks = generate_book_ticks(3000)
+        values = self.check(ZScore(20), ZScore(20), ticks)
+        self.assertEqual(values[590], 0)
+        self.assertTrue(np.isnan(values[:20]).all())
+
+    def naive_zscore(self, prices: np.ndarray, n: int):
+        """"""
+        values = np.full(len(prices), np.nan)
+        for i in range(n - 1, len(prices)):
+            window = prices[i - n + 1:i + 1]
+            if window.max() == window.min():
+                values[i] = 0
+            else:
+                values[i] = (window[-1] - window.mean()) / window.std()
+        return values
+
+    def test_zscore_flat(self):
+        # Only windows of the same price are flat, whatever the first
+        # price used to shift the running sums.
+        for first_price in (3600, 3500):
+            ticks = generate_ticks(60)
+            for tick in ticks:
+                tick.last_price = 3600
+            ticks[0].last_price = first_price
+            ticks[30].last_price = 3600.0001
+
+            values = self.check(ZScore(20), ZScore(20), ticks)
+            np.testing.assert_array_equal(values[20:30], 0)
+            np.testing.assert_array_equal(values[50:], 0)
+
+            prices = np.array([tick.last_price for tick in ticks])
+            np.testing.assert_allclose(values, self.naive_zscore(prices, 20), rtol=1e-6)
+
+    def test_zscore_drift(self):
+        # Price drifts far away from the first tick over a long history,
+        # then moves by small steps with flat periods.
+        rng = np.random.RandomState(0)
+        change = np.concatenate([
+            rng.randn(20000) + 100,
+            rng.randint(-1, 2, 20000) * 0.5,
+        ])
+        change[30000:30100] = 0
+        prices = 3500 + np.cumsum(change)
+
+        ticks = generate_ticks(len(prices))
+        for tick, price in zip(ticks, prices):
+            tick.last_price = price
+
+        values = self.check(ZScore(20), ZScore(20), ticks)
+        expected = self.naive_zscore(prices, 20)
+        self.assertTrue((expected[20000:] == 0).any())
+        np.testing.assert_allclose(values, expected, rtol=1e-6, atol=1e-6)
+
+    def test_order_book(self):
+        ticks = generate_book_ticks(1000)
+        self.check(OrderBookImbalance(), OrderBookImbalance(), ticks)
+        self.check(OrderBookImbalance(5), OrderBookImbalance(5), ticks)
+        values = self.check(Microprice(), Microprice(), ticks)
+        self.assertTrue(isnan(values[0]))
+
+        tick = ticks[1]
+        tick.bid_volume_1 = 30
+        tick.ask_volume_1 = 10
+        self.assertEqual(
+            Microprice().update_tick(tick),
+            (tick.bid_price_1 * 10 + tick.ask_price_1 * 30) / 40
+        )
+        self.assertEqual(OrderBookImbalance().update_tick(tick), 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+"""
+Test if timestamp utilities match datetime/time functions
+"""
+import time
+import unittest
+from datetime import datetime, timedelta
+
+from vnpy.trader.timestamp import (
+    parse_compact,
+    parse_iso,
+    parse_iso_timestamp,
+    to_datetime,
+    to_local_timestamp,
+    to_timestamp,
+)
+from vnpy.trader.utility import TimeUtils
+
+
+class TestTimestamp(unittest.TestCase):
+
+    def test_parse_iso(self):
+        for text in (
+            "2019-09-11T09:30:01.123Z",
+            "2019-09-11T09:30:01.123456Z",
+            "2019-12-31T23:59:59.000Z",
+            "2020-02-29T00:00:00.5Z",
+        ):
+            expected = datetime.strptime(text, "%Y-%m-%dT%H:%M:%S.%fZ")
+            self.assertEqual(parse_iso(text), expected)
+            self.assertEqual(
+                parse_iso(text, timedelta(hours=8)),
+                expected + timedelta(hours=8)
+            )
+
+        self.assertEqual(parse_iso("2019-09-11T09:30:01"), datetime(2019, 9, 11, 9, 30, 1))
+        self.assertEqual(
+            parse_iso("2019-09-11T09:30:01.1234567+08:00"),
+            datetime(2019, 9, 11, 1, 30, 1, 123456)
+        )
+        self.assertEqual(
+            parse_iso("2019-09-11T09:30:01-0530"),
+            datetime(2019, 9, 11, 15, 0, 1)
+        )
+
+        timestamp = parse_iso_timestamp("2019-09-11T09:30:01.123Z")
+        self.assertEqual(to_datetime(timestamp), datetime(2019, 9, 11, 9, 30, 1, 123000))
+        self.assertEqual(to_timestamp(to_datetime(timestamp)), timestamp)
+
+    def test_parse_compact(self):
+        for text in ("20190911 21:05:09.5", "20190912 09:00:00.0", "20191231 23:59:59.999999"):
+            self.assertEqual(
+                parse_compact(text),
+                datetime.strptime(text, "%Y%m%d %H:%M:%S.%f")
+            )
+        self.assertEqual(parse_compact("20190911 21:05:09"), datetime(2019, 9, 11, 21, 5, 9))
+
+    def test_local_timestamp(self):
+        start = 1546300800000
+        for n in range(0, 400 * 86400000, 3600000 * 7 + 12345):
+            milliseconds = start + n
+            self.assertEqual(
+                to_datetime(to_local_timestamp(milliseconds * 1000)),
+                datetime.fromtimestamp(milliseconds / 1000)
+            )
+
+    def test_time_utils(self):
+        utils = TimeUtils()
+        timestamp = 1568165401.7
+        self.assertEqual(
+            utils.convert_time(timestamp),
+            datetime.fromtimestamp(int(timestamp)).strftime("%Y-%m-%d %H:%M:%S")
+        )
+        self.assertEqual(
+            utils.convert_date(timestamp),
+            datetime.fromtimestamp(int(timestamp)).strftime("%Y-%m-%d")
+        )
+        self.assertEqual(
+            utils.convert_datetime(timestamp),
+            datetime.fromtimestamp(int(timestamp))
+        )
+        self.assertEqual(utils.get_secend(timestamp), datetime.fromtimestamp(timestamp).second)
+        self.assertEqual(
+            utils.convert_date2timestamp("2019-09-11 09:30:01"),
+            int(datetime(2019, 9, 11, 9, 30, 1).timestamp())
+        )
+
+    def test_time_utils_compatibility(self):
+        utils = TimeUtils()
+
+        # Fraction of second is dropped, as time.localtime did.
+        timestamp = 1568165401.7
+        dt = utils.convert_datetime(timestamp)
+        self.assertEqual(dt.microsecond, 0)
+        self.assertEqual(dt, datetime(*time.localtime(timestamp)[:6]))
+
+        # Formats accepted by strptime but not fromisoformat still work.
+        for date in ("2019-9-11 9:30:01", "2019-09-11 09:30:01"):
+            self.assertEqual(
+                utils.convert_date2timestamp(date),
+                int(time.mktime(time.strptime(date, "%Y-%m-%d %H:%M:%S")))
+            )
+        with self.assertRaises(ValueError):
+            utils.convert_date2timestamp("2019/09/11")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,435 @@
+"""
+Test if bar generator and array manager work fine
+"""
+import unittest
+from datetime import datetime, time, timedelta
+
+import numpy as np
+import talib
+
+from vnpy.trader.constant import BarType, Exchange, Interval
+from vnpy.trader.object import BarData, TickData
+from vnpy.trader.utility import (
+    ArrayManager,
+    BarGenerator,
+    BarSchedule,
+    MultiBarGenerator,
+    PanelArrayManager,
+    ScheduleBarGenerator,
+    ThresholdBarGenerator,
+    create_bars,
+    resample_ticks,
+    resample_ticks_by_activity,
+)
+
+
+def generate_bars(count: int, seed: int = 0):
+    """"""
+    rng = np.random.RandomState(seed)
+    close = 100 + np.cumsum(rng.randn(count))
+    start = datetime(2019, 1, 1)
+
+    bars = []
+    for n, price in enumerate(close):
+        bars.append(BarData(
+            symbol="rb1910",
+            exchange=Exchange.SHFE,
+            datetime=start + timedelta(minutes=n),
+            interval=Interval.MINUTE,
+            gateway_name="DB",
+            open_price=price - 0.2,
+            high_price=price + abs(rng.randn()),
+            low_price=price - abs(rng.randn()),
+            close_price=price,
+            volume=rng.randint(1, 100),
+        ))
+    return bars
+
+
+def generate_ticks(count: int, seed: int = 0):
+    """"""
+    rng = np.random.RandomState(seed)
+    dt = datetime(2019, 9, 11, 9, 0)
+    volume = 0
+    price = 3500
+
+    ticks = []
+    for n in range(count):
+        dt += timedelta(milliseconds=int(rng.randint(100, 5000)))
+        # Lunch break, next tick has the same minute one hour later.
+        if n == count // 2:
+            dt += timedelta(hours=2)
+
+        price += rng.randint(-2, 3)
+        volume += rng.randint(0, 10)
+        # Volume reset of a new trading session.
+        if n == count // 3:
+            volume = 5
+
+        ticks.append(TickData(
+            symbol="rb1910",
+            exchange=Exchange.SHFE,
+            datetime=dt,
+            gateway_name="CTP",
+            last_price=0 if n % 17 == 0 else price,
+            volume=volume,
+            open_interest=1000 + n,
+        ))
+    return ticks
+
+
+class TestBarGenerator(unittest.TestCase):
+
+    def test_resample_ticks(self):
+        ticks = generate_ticks(3000)
+
+        bars = []
+        bg = BarGenerator(bars.append)
+        for tick in ticks:
+            bg.update_tick(tick)
+
+        data = resample_ticks(
+            [tick.datetime for tick in ticks],
+            [tick.last_price for tick in ticks],
+            [tick.volume for tick in ticks],
+            [tick.open_interest for tick in ticks],
+        )
+        batch_bars = create_bars(data, "rb1910", Exchange.SHFE, "CTP")
+
+        self.assertEqual(len(batch_bars), len(bars))
+        for bar, batch_bar in zip(bars, batch_bars):
+            self.assertEqual(bar, batch_bar)
+
+        data = resample_ticks(
+            [tick.datetime for tick in ticks],
+            [tick.last_price for tick in ticks],
+            [tick.volume for tick in ticks],
+            include_last=True
+        )
+        self.assertEqual(len(data["close_price"]), len(bars) + 1)
+        self.assertEqual(data["close_price"][-1], bg.bar.close_price)
+
+    def test_schedule_minute(self):
+        bars = generate_bars(200)
+
+        expected = []
+        bg = BarGenerator(None, window=5, on_window_bar=expected.append)
+        for bar in bars:
+            bg.update_bar(bar)
+
+        result = []
+        sbg = ScheduleBarGenerator(result.append, BarSchedule.minute(5))
+        for bar in bars:
+            sbg.update_bar(bar)
+
+        self.assertEqual(len(result), len(expected))
+        for bar, expected_bar in zip(result, expected):
+            self.assertEqual(bar.datetime, expected_bar.datetime)
+            self.assertEqual(bar.close_price, expected_bar.close_price)
+            self.assertEqual(bar.high_price, expected_bar.high_price)
+            self.assertEqual(bar.volume, expected_bar.volume)
+
+        # 7 minutes does not divide an hour, windows keep counting from midnight.
+        result = []
+        sbg = ScheduleBarGenerator(result.append, BarSchedule.minute(7))
+        for bar in bars:
+            sbg.update_bar(bar)
+        self.assertEqual(len(result), 200 // 7)
+        self.assertEqual(result[9].datetime, datetime(2019, 1, 1, 1, 3))
+        self.assertEqual(result[9].volume, sum(b.volume for b in bars[63:70]))
+
+    def test_schedule_sessions(self):
+        schedule = BarSchedule.minute(
+            45,
+            sessions=[
+                (time(21, 0), time(2, 30)),
+                (time(9, 0), time(10, 15)),
+                (time(10, 30), time(11, 30)),
+            ]
+        )
+        start = datetime(2019, 1, 1, 21, 0)
+        dts = [start + timedelta(minutes=n) for n in range(330)]
+        dts += [datetime(2019, 1, 2, 9, 0) + timedelta(minutes=n) for n in range(75)]
+        dts += [datetime(2019, 1, 2, 10, 30) + timedelta(minutes=n) for n in range(60)]
+
+        bars = generate_bars(len(dts))
+        for bar, dt in zip(bars, dts):
+            bar.datetime = dt
+
+        result = []
+        sbg = ScheduleBarGenerator(result.append, schedule)
+        for bar in bars:
+            sbg.update_bar(bar)
+
+        self.assertEqual(
+            [bar.datetime.strftime("%H:%M") for bar in result],
+            [
+                "21:00", "21:45", "22:30", "23:15", "00:00", "00:45",
+                "01:30", "02:15", "09:00", "09:45", "10:30", "11:15",
+            ]
+        )
+        self.assertEqual(result[7].volume, sum(b.volume for b in bars[315:330]))
+        self.assertEqual(result[-1].volume, sum(b.volume for b in bars[-15:]))
+
+    def test_schedule_ticks(self):
+        # BarGenerator compares minute field only, so stop before the lunch break.
+        ticks = generate_ticks(3000)[:1500]
+
+        expected = []
+        bg = BarGenerator(expected.append)
+        for tick in ticks:
+            bg.update_tick(tick)
+
+        result = []
+        sbg = ScheduleBarGenerator(result.append, BarSchedule.minute(1))
+        for tick in ticks:
+            sbg.update_tick(tick)
+
+        self.assertEqual(len(result), len(expected))
+        for bar, expected_bar in zip(result, expected):
+            self.assertEqual(bar.datetime, expected_bar.datetime)
+            self.assertEqual(bar.close_price, expected_bar.close_price)
+            self.assertEqual(bar.volume, expected_bar.volume)
+
+        # Bars closing at second 50.
+        result = []
+        schedule = BarSchedule.minute(1, offset=timedelta(seconds=50))
+        sbg = ScheduleBarGenerator(result.append, schedule)
+        for tick in ticks:
+            sbg.update_tick(tick)
+        for bar in result:
+            self.assertEqual(bar.datetime.second, 50)
+
+    def test_schedule_daily_weekly(self):
+        # Daily bar starts at 21:00 of previous day.
+        schedule = BarSchedule.daily(timedelta(hours=-3))
+        ts = (datetime(2019, 1, 2, 22, 0) - datetime(1970, 1, 1)) // timedelta(microseconds=1)
+        self.assertEqual(
+            schedule.previous_boundary(ts),
+            (datetime(2019, 1, 2, 21) - datetime(1970, 1, 1)) // timedelta(microseconds=1)
+        )
+
+        bars = generate_bars(60 * 24 * 14)
+        for bar in bars:
+            bar.interval = Interval.DAILY
+
+        result = []
+        sbg = ScheduleBarGenerator(result.append, schedule, Interval.DAILY)
+        for bar in bars:
+            sbg.update_bar(bar)
+        self.assertEqual(result[1].datetime, datetime(2019, 1, 1, 21))
+        self.assertEqual(result[1].volume, sum(b.volume for b in bars[1260:2700]))
+
+        result = []
+        sbg = ScheduleBarGenerator(result.append, BarSchedule.weekly(0), Interval.WEEKLY)
+        for bar in bars:
+            sbg.update_bar(bar)
+        sbg.generate()
+        # 2019-01-01 is Tuesday, weeks start on Mondays.
+        self.assertEqual(
+            [bar.datetime for bar in result],
+            [datetime(2018, 12, 31), datetime(2019, 1, 7), datetime(2019, 1, 14)]
+        )
+
+    def test_multi_timeframe(self):
+        bars = generate_bars(60 * 24 * 3)
+
+        expected = {}
+        generators = []
+        for window in (5, 15, 60):
+            expected[window] = []
+            bg = BarGenerator(None, window=window, on_window_bar=expected[window].append)
+            generators.append(bg)
+
+        result = {5: [], 15: [], 60: [], 1440: []}
+        calls = []
+        mbg = MultiBarGenerator(lambda bar: None)
+        # Added out of order, the tree is rebuilt as 1 -> 5 -> 15 -> 60 -> 1440.
+        mbg.add_window(60, result[60].append, Interval.HOUR)
+        mbg.add_window(1440, result[1440].append, Interval.DAILY, timedelta(hours=-3))
+        mbg.add_window(5, result[5].append)
+        mbg.add_window(15, result[15].append)
+        mbg.add_window(15, lambda bar: calls.append(15))
+        mbg.add_window(5, lambda bar: calls.append(5))
+
+        for bar in bars:
+            for bg in generators:
+                bg.update_bar(bar)
+            mbg.update_bar(bar)
+
+        node = mbg.root
+        windows = []
+        while node.children:
+            self.assertEqual(len(node.children), 1)
+            node = node.children[0]
+            windows.append(node.window)
+        self.assertEqual(windows, [5, 15, 60, 1440])
+
+        for window in (5, 15, 60):
+            self.assertEqual(len(result[window]), len(expected[window]))
+            for bar, expected_bar in zip(result[window], expected[window]):
+                self.assertEqual(bar.datetime, expected_bar.datetime)
+                self.assertEqual(bar.open_price, expected_bar.open_price)
+                self.assertEqual(bar.low_price, expected_bar.low_price)
+                self.assertEqual(bar.volume, expected_bar.volume)
+
+        self.assertEqual(result[1440][1].datetime, datetime(2019, 1, 1, 21))
+        self.assertEqual(result[1440][1].volume, sum(b.volume for b in bars[1260:2700]))
+        # Lower timeframe callbacks are called first.
+        self.assertEqual(calls[:4], [5, 5, 5, 15])
+
+    def test_threshold_bars(self):
+        ticks = generate_ticks(3000)
+        for tick in ticks:
+            if tick.last_price:
+                tick.last_price += 0.37
+
+        for bar_type, threshold in (
+            (BarType.TICK, 50),
+            (BarType.VOLUME, 200),
+            (BarType.TURNOVER, 500000),
+        ):
+            bars = []
+            bg = ThresholdBarGenerator(bars.append, threshold, bar_type)
+            for tick in ticks:
+                bg.update_tick(tick)
+
+            data = resample_ticks_by_activity(
+                [tick.datetime for tick in ticks],
+                [tick.last_price for tick in ticks],
+                [tick.volume for tick in ticks],
+                threshold,
+                bar_type,
+                [tick.open_interest for tick in ticks],
+            )
+            batch_bars = create_bars(data, "rb1910", Exchange.SHFE, "CTP", None)
+
+            self.assertGreater(len(bars), 10)
+            self.assertEqual(batch_bars, bars)
+
+            data = resample_ticks_by_activity(
+                [tick.datetime for tick in ticks],
+                [tick.last_price for tick in ticks],
+                [tick.volume for tick in ticks],
+                threshold,
+                bar_type,
+                include_last=True
+            )
+            if bg.bar:
+                self.assertEqual(len(data["volume"]), len(bars) + 1)
+                self.assertEqual(data["volume"][-1], bg.bar.volume)
+            else:
+                self.assertEqual(len(data["volume"]), len(bars))
+
+        bars = []
+        bg = ThresholdBarGenerator(bars.append, 50, BarType.TICK)
+        for tick in ticks:
+            bg.update_tick(tick)
+        valid = [tick for tick in ticks if tick.last_price]
+        self.assertEqual(bars[1].datetime, valid[50].datetime)
+        self.assertEqual(bars[1].close_price, valid[99].last_price)
+
+
+class TestArrayManager(unittest.TestCase):
+
+    def test_ring_buffer(self):
+        size = 30
+        am = ArrayManager(size)
+        bars = generate_bars(100)
+
+        for n, bar in enumerate(bars):
+            am.update_bar(bar)
+
+            expected = np.zeros(size)
+            closes = [b.close_price for b in bars[max(0, n + 1 - size):n + 1]]
+            expected[size - len(closes):] = closes
+
+            np.testing.assert_array_equal(am.close, expected)
+            self.assertTrue(am.close.flags["C_CONTIGUOUS"])
+
+        self.assertEqual(am.volume[-1], bars[-1].volume)
+        self.assertAlmostEqual(am.sma(10), np.mean(am.close[-10:]))
+
+    def test_cached_results(self):
+        am = ArrayManager(30)
+        bars = generate_bars(40)
+        for bar in bars[:-1]:
+            am.update_bar(bar)
+
+        self.assertIs(am.sma(10, array=True), am.sma(10, array=True))
+        up, down = am.boll(10, 2)
+        self.assertAlmostEqual(up, am.sma(10) + am.std(10) * 2)
+
+        # Cache is cleared by new bar.
+        last = am.sma(10)
+        am.update_bar(bars[-1])
+        self.assertNotEqual(am.sma(10), last)
+        self.assertAlmostEqual(am.sma(10), np.mean(am.close[-10:]))
+
+
+class TestPanelArrayManager(unittest.TestCase):
+
+    def test_indicators(self):
+        size = 60
+        symbol_bars = {f"s{n}.SHFE": generate_bars(80, n) for n in range(5)}
+        pam = PanelArrayManager(list(symbol_bars.keys()), size)
+        ams = {vt_symbol: ArrayManager(size) for vt_symbol in symbol_bars}
+
+        for i in range(80):
+            bars = {}
+            for vt_symbol, symbol_bar_list in symbol_bars.items():
+                bar = symbol_bar_list[i]
+                bars[vt_symbol] = bar
+                ams[vt_symbol].update_bar(bar)
+            pam.update_bars(bars)
+
+        for vt_symbol, am in ams.items():
+            row = pam.get_row(vt_symbol)
+            np.testing.assert_array_equal(pam.close[row], am.close)
+
+            self.assertAlmostEqual(pam.sma(10)[row], am.sma(10))
+            self.assertAlmostEqual(pam.std(10)[row], am.std(10))
+            self.assertAlmostEqual(pam.atr(14)[row], am.atr(14))
+            self.assertAlmostEqual(pam.rsi(14)[row], am.rsi(14))
+            self.assertEqual(pam.donchian(20)[0][row], am.donchian(20)[0])
+
+            np.testing.assert_allclose(
+                pam.std(10, array=True)[row], am.std(10, array=True), atol=1e-6
+            )
+            np.testing.assert_allclose(
+                pam.atr(14, array=True)[row], am.atr(14, array=True)
+            )
+            np.testing.assert_allclose(
+                pam.donchian(20, array=True)[1][row], talib.MIN(am.low, 20)
+            )
+
+    def test_std_high_price(self):
+        bars = generate_bars(80)
+        for bar in bars:
+            bar.close_price += 1e7
+
+        pam = PanelArrayManager(["rb1910.SHFE"], 60)
+        for bar in bars:
+            pam.update_bars({"rb1910.SHFE": bar})
+
+        close = pam.close[0]
+        expected = np.full(close.shape, np.nan)
+        for i in range(9, len(close)):
+            expected[i] = close[i - 9:i + 1].std()
+
+        result = pam.std(10, array=True)[0]
+        np.testing.assert_allclose(result[9:], expected[9:], atol=1e-6)
+        self.assertTrue(np.isnan(result[:9]).all())
+
+    def test_missing_bar(self):
+        bars = generate_bars(2)
+        pam = PanelArrayManager(["rb1910.SHFE", "hc1910.SHFE"], 10)
+        pam.update_bars({"rb1910.SHFE": bars[0], "hc1910.SHFE": bars[0]})
+        pam.update_bars({"rb1910.SHFE": bars[1]})
+
+        self.assertEqual(pam.close[1, -1], bars[0].close_price)
+        self.assertEqual(pam.volume[1, -1], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
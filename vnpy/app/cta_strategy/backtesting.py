@@ -1,5 +1,6 @@
-from collections import defaultdict
+from bisect import bisect_left, bisect_right, insort
 from datetime import date, datetime
+from math import inf, log, sqrt
 from typing import Callable
 from itertools import product
 from functools import lru_cache
@@ -13,6 +14,7 @@ import seaborn as sns
 from pandas import DataFrame
 from deap import creator, base, tools, algorithms
 
+from vnpy.trader.columnar import BarBuffer, DataBuffer
 from vnpy.trader.constant import (Direction, Offset, Exchange, 
                                   Interval, Status)
 from vnpy.trader.database import database_manager
@@ -124,15 +126,23 @@ class BacktestingEngine:
         self.interval = None
         self.days = 0
         self.callback = None
+        # 列式存储的历史数据，回放时才逐条生成BarData/TickData
         self.history_data = []
+        self.reuse_data = False
+
+        self.streaming = False
+        self.drawdown_limit = 0
+        self.streaming_statistics = None
 
         self.stop_order_count = 0
         self.stop_orders = {}
         self.active_stop_orders = {}
+        self.stop_order_book = OrderBook()
 
         self.limit_order_count = 0
         self.limit_orders = {}
         self.active_limit_orders = {}
+        self.limit_order_book = OrderBook()
 
         self.trade_count = 0
         self.trades = {}
@@ -154,16 +164,19 @@ class BacktestingEngine:
         self.stop_order_count = 0
         self.stop_orders.clear()
         self.active_stop_orders.clear()
+        self.stop_order_book.clear()
 
         self.limit_order_count = 0
         self.limit_orders.clear()
         self.active_limit_orders.clear()
+        self.limit_order_book.clear()
 
         self.trade_count = 0
         self.trades.clear()
 
         self.logs.clear()
         self.daily_results.clear()
+        self.streaming_statistics = None
 
     def set_parameters(
         self,
@@ -177,9 +190,26 @@ class BacktestingEngine:
         capital: int = 0,
         end: datetime = None,
         mode: BacktestingMode = BacktestingMode.BAR,
+        reuse_data: bool = False,
+        streaming: bool = False,
+        drawdown_limit: float = 0,
     ):
-        """"""
+        """
+        With reuse_data, a single BarData/TickData object is updated in
+        place for every replayed row, which is faster but only safe for
+        strategies which do not keep references to data objects.
+
+        With streaming, statistics are accumulated at the end of every
+        day during replay, and trades/orders/daily results of finished
+        days are dropped, so calculate_statistics works without
+        calculate_result and memory stays constant. Replay stops early
+        once daily drawdown percent exceeds drawdown_limit (0 for no
+        limit).
+        """
         self.mode = mode
+        self.reuse_data = reuse_data
+        self.streaming = streaming
+        self.drawdown_limit = drawdown_limit
         self.vt_symbol = vt_symbol
         self.interval = Interval(interval)
         self.rate = rate
@@ -236,13 +266,19 @@ class BacktestingEngine:
         else:
             func = self.new_tick
 
+        if self.streaming:
+            self.streaming_statistics = StreamingStatistics(
+                self.capital, self.drawdown_limit
+            )
+
         self.strategy.on_init()
 
         # Use the first [days] of history data for initializing strategy
         day_count = 0
-        ix = 0
-        
-        for ix, data in enumerate(self.history_data):
+        data = None
+        history_data = self.iter_history_data()
+
+        for data in history_data:
             if self.datetime and data.datetime.day != self.datetime.day:
                 day_count += 1
                 if day_count >= self.days:
@@ -258,46 +294,267 @@ class BacktestingEngine:
         self.strategy.trading = True
         self.output("开始回放历史数据")
 
-        # Use the rest of history data for running backtesting
-        for data in self.history_data[ix:]:
+        # Use the rest of history data for running backtesting, starting
+        # from the data which ended initialization
+        if data is not None:
             func(data)
 
+        if self.streaming:
+            for data in history_data:
+                # Close last day before replaying the first data of a
+                # new day, and stop once drawdown limit is exceeded.
+                if data.datetime.date() != self.datetime.date():
+                    self.close_daily_result()
+                    if self.streaming_statistics.stopped:
+                        self.output("回撤超过限制，提前结束回放")
+                        break
+                func(data)
+
+            self.close_daily_result()
+        else:
+            for data in history_data:
+                func(data)
+
         self.output("历史数据回放结束")
 
-    def calculate_result(self):
-        """"""
-        self.output("开始计算逐日盯市盈亏")
+    def run_vector_backtesting(self):
+        """
+        Vectorized backtesting for strategies implementing
+        generate_signals, which returns target position, order price and
+        stop flag arrays calculated on close of every bar.
+
+        While position differs from target, the order of latest bar is
+        crossed with the next bar by the same rules as cross_limit_order
+        and cross_stop_order (nan price for market order at next open),
+        i.e. orders are re-issued every bar until filled. Position is
+        only looped over target changes, fills are searched with numpy,
+        and trades/daily_df are generated like calculate_result.
+
+        The result equals run_backtesting for strategies which cancel
+        unfilled orders on every bar and order the difference between
+        target and position. Strategies leaving orders working (e.g.
+        DoubleMaStrategy) or sizing orders without pending orders can
+        end up in other positions in the event loop, then the result
+        is only an approximation.
+
+        Strategies not implementing generate_signals are run by
+        run_backtesting and calculate_result instead.
+        """
+        if self.mode != BacktestingMode.BAR:
+            self.output("向量化回测只支持K线模式")
+            return
+
+        if type(self.strategy).generate_signals is CtaTemplate.generate_signals:
+            self.output("策略未实现generate_signals，使用逐K线回测")
+            self.run_backtesting()
+            return self.calculate_result()
+
+        data = self.history_data
+        if not isinstance(data, BarBuffer):
+            data = BarBuffer()
+            data.extend(self.history_data)
+
+        size = len(data)
+        if not size:
+            self.output("历史数据为空，无法回测")
+            return
+
+        # on_init sets days of history data for initializing strategy
+        self.strategy.on_init()
+        self.strategy.inited = True
+        self.strategy.trading = True
+
+        dates = data.datetime.astype("datetime64[D]")
+        day_changes = np.flatnonzero(dates[1:] != dates[:-1]) + 1
+        if len(day_changes) >= max(self.days, 1):
+            start_ix = day_changes[max(self.days, 1) - 1]
+        else:
+            start_ix = size - 1
+
+        signals = self.strategy.generate_signals(data)
+        if signals is None:
+            self.output("generate_signals未返回信号，无法回测")
+            return
+        target, price, stop = signals
+        target = np.asarray(target)
+        integer_pos = np.issubdtype(target.dtype, np.integer)
+        target = target.astype(float)
+        target[:start_ix] = 0
+
+        if price is None:
+            price = np.full(size, np.nan)
+        price = np.asarray(price, dtype=float)
+        if self.pricetick:
+            price = np.round(price / self.pricetick) * self.pricetick
+
+        if stop is None:
+            stop = np.zeros(size, dtype=bool)
+        stop = np.asarray(stop, dtype=bool)
+
+        long_fill, long_price, short_fill, short_price = cross_orders(
+            data.open_price, data.high_price, data.low_price, price, stop
+        )
+
+        # Loop over bars where target changes, fills are searched by numpy.
+        changes = np.flatnonzero(target[1:] != target[:-1]) + 1
+        segment_starts = [start_ix] + [ix for ix in changes.tolist() if ix > start_ix]
+        segment_ends = segment_starts[1:] + [size - 1]
+
+        trade_ixs = []
+        trade_prices = []
+        trade_changes = []
+        pos = 0
+        for segment_start, segment_end in zip(segment_starts, segment_ends):
+            segment_target = target[segment_start]
+            if segment_target == pos:
+                continue
+
+            if segment_target > pos:
+                fills = long_fill[segment_start:segment_end]
+                prices = long_price
+            else:
+                fills = short_fill[segment_start:segment_end]
+                prices = short_price
+
+            if not fills.any():
+                continue
+
+            order_ix = segment_start + int(fills.argmax())
+
+            # Reverse position by a close trade and an open trade.
+            if pos * segment_target < 0:
+                pos_changes = [-pos, segment_target]
+            else:
+                pos_changes = [segment_target - pos]
+
+            for pos_change in pos_changes:
+                trade_ixs.append(order_ix + 1)
+                trade_prices.append(prices[order_ix])
+                trade_changes.append(pos_change)
+            pos = segment_target
+
+        # Daily close of bars replayed after initialization.
+        trading_dates = dates[start_ix:]
+        day_ends = np.concatenate([
+            np.flatnonzero(trading_dates[1:] != trading_dates[:-1]),
+            [len(trading_dates) - 1]
+        ])
+        day_dates = [d.item() for d in trading_dates[day_ends]]
+        close_prices = data.close_price[start_ix:][day_ends]
+
+        trade_ixs = np.array(trade_ixs, dtype=int)
+        trade_days = np.searchsorted(day_ends, trade_ixs - start_ix)
+        trade_changes = np.array(
+            trade_changes, dtype=np.int64 if integer_pos else float
+        )
+        trade_prices = np.array(trade_prices, dtype=float)
+
+        self.trades.clear()
+        day_trades = [[] for _ in day_dates]
+        pos = 0
+        for ix, day, pos_change, trade_price in zip(
+            trade_ixs.tolist(),
+            trade_days.tolist(),
+            trade_changes.tolist(),
+            trade_prices.tolist()
+        ):
+            self.limit_order_count += 1
+            self.trade_count += 1
+            dt = data.datetime[ix].item()
+
+            trade = TradeData(
+                symbol=self.symbol,
+                exchange=self.exchange,
+                orderid=str(self.limit_order_count),
+                tradeid=str(self.trade_count),
+                direction=Direction.LONG if pos_change > 0 else Direction.SHORT,
+                offset=Offset.OPEN if pos * pos_change >= 0 else Offset.CLOSE,
+                price=trade_price,
+                volume=abs(pos_change),
+                time=dt.strftime("%H:%M:%S"),
+                gateway_name=self.gateway_name,
+            )
+            trade.datetime = dt
+            pos += pos_change
+
+            self.trades[trade.vt_tradeid] = trade
+            day_trades[day].append(trade)
+
+        self.strategy.pos = pos
 
         if not self.trades:
             self.output("成交记录为空，无法计算")
             return
 
-        # Add trade data into daily reuslt.
-        for trade in self.trades.values():
-            d = trade.datetime.date()
-            daily_result = self.daily_results[d]
-            daily_result.add_trade(trade)
+        self.daily_df = calculate_daily_result(
+            day_dates,
+            close_prices,
+            trade_days,
+            trade_changes,
+            trade_prices,
+            self.size,
+            self.rate,
+            self.slippage,
+            day_trades
+        )
 
-        # Calculate daily result by iteration.
-        pre_close = 0
-        start_pos = 0
+        self.output("向量化回测完成")
+        return self.daily_df
 
-        for daily_result in self.daily_results.values():
-            daily_result.calculate_pnl(
-                pre_close, start_pos, self.size, self.rate, self.slippage
-            )
+    def iter_history_data(self):
+        """
+        Iterate history data objects, created lazily from columnar
+        buffer loaded by load_data.
+        """
+        if isinstance(self.history_data, DataBuffer):
+            return self.history_data.iter_data(self.reuse_data)
+        return iter(self.history_data)
+
+    def calculate_result(self):
+        """"""
+        self.output("开始计算逐日盯市盈亏")
 
-            pre_close = daily_result.close_price
-            start_pos = daily_result.end_pos
+        if self.streaming:
+            self.output("流式统计模式不保存逐日盈亏，无法计算")
+            return
 
-        # Generate dataframe
-        results = defaultdict(list)
+        if not self.trades:
+            self.output("成交记录为空，无法计算")
+            return
+
+        # Collect trade arrays, daily pnl is calculated by numpy.
+        dates = list(self.daily_results.keys())
+        close_prices = [result.close_price for result in self.daily_results.values()]
+        day_index = {d: ix for ix, d in enumerate(dates)}
 
-        for daily_result in self.daily_results.values():
-            for key, value in daily_result.__dict__.items():
-                results[key].append(value)
+        # Every trade object is visited once, the rest runs on arrays.
+        trade_days = []
+        trade_changes = []
+        trade_prices = []
+        day_trades = [[] for _ in dates]
 
-        self.daily_df = DataFrame.from_dict(results).set_index("date")
+        for trade in self.trades.values():
+            day = day_index[trade.datetime.date()]
+            trade_days.append(day)
+            day_trades[day].append(trade)
+
+            if trade.direction == Direction.LONG:
+                trade_changes.append(trade.volume)
+            else:
+                trade_changes.append(-trade.volume)
+            trade_prices.append(trade.price)
+
+        self.daily_df = calculate_daily_result(
+            dates,
+            close_prices,
+            trade_days,
+            trade_changes,
+            trade_prices,
+            self.size,
+            self.rate,
+            self.slippage,
+            day_trades
+        )
 
         self.output("逐日盯市盈亏计算完成")
         return self.daily_df
@@ -306,9 +563,20 @@ class BacktestingEngine:
         """"""
         self.output("开始计算策略统计指标")
 
-        if not df:
+        if df is None:
             df = self.daily_df
-        
+
+        streaming_statistics = self.streaming_statistics
+        if (
+            df is None
+            and streaming_statistics
+            and streaming_statistics.total_trade_count
+        ):
+            statistics = streaming_statistics.get_statistics()
+            if output:
+                self.output_statistics(statistics)
+            return statistics
+
         if df is None:
             # Set all statistics to 0 if no trade.
             start_date = ""
@@ -338,7 +606,10 @@ class BacktestingEngine:
         else:
             # Calculate balance related time series data
             df["balance"] = df["net_pnl"].cumsum() + self.capital
-            df["return"] = np.log(df["balance"] / df["balance"].shift(1)).fillna(0)
+            # Return of the first day and of non-positive balance is
+            # undefined (NaN) and skipped by mean/std.
+            change = df["balance"] / df["balance"].shift(1)
+            df["return"] = np.log(change.where(change > 0))
             df["highlevel"] = (
                 df["balance"].rolling(
                     min_periods=1, window=len(df), center=False).max()
@@ -385,41 +656,6 @@ class BacktestingEngine:
 
             return_drawdown_ratio = -total_return / max_ddpercent
 
-        # Output
-        if output:
-            self.output("-" * 30)
-            self.output(f"首个交易日：\t{start_date}")
-            self.output(f"最后交易日：\t{end_date}")
-
-            self.output(f"总交易日：\t{total_days}")
-            self.output(f"盈利交易日：\t{profit_days}")
-            self.output(f"亏损交易日：\t{loss_days}")
-
-            self.output(f"起始资金：\t{self.capital:,.2f}")
-            self.output(f"结束资金：\t{end_balance:,.2f}")
-
-            self.output(f"总收益率：\t{total_return:,.2f}%")
-            self.output(f"年化收益：\t{annual_return:,.2f}%")
-            self.output(f"最大回撤: \t{max_drawdown:,.2f}")
-            self.output(f"百分比最大回撤: {max_ddpercent:,.2f}%")
-
-            self.output(f"总盈亏：\t{total_net_pnl:,.2f}")
-            self.output(f"总手续费：\t{total_commission:,.2f}")
-            self.output(f"总滑点：\t{total_slippage:,.2f}")
-            self.output(f"总成交金额：\t{total_turnover:,.2f}")
-            self.output(f"总成交笔数：\t{total_trade_count}")
-
-            self.output(f"日均盈亏：\t{daily_net_pnl:,.2f}")
-            self.output(f"日均手续费：\t{daily_commission:,.2f}")
-            self.output(f"日均滑点：\t{daily_slippage:,.2f}")
-            self.output(f"日均成交金额：\t{daily_turnover:,.2f}")
-            self.output(f"日均成交笔数：\t{daily_trade_count}")
-
-            self.output(f"日均收益率：\t{daily_return:,.2f}%")
-            self.output(f"收益标准差：\t{return_std:,.2f}%")
-            self.output(f"Sharpe Ratio：\t{sharpe_ratio:,.2f}")
-            self.output(f"收益回撤比：\t{return_drawdown_ratio:,.2f}")
-
         statistics = {
             "start_date": start_date,
             "end_date": end_date,
@@ -448,8 +684,48 @@ class BacktestingEngine:
             "return_drawdown_ratio": return_drawdown_ratio,
         }
 
+        if output:
+            self.output_statistics(statistics)
+
         return statistics
 
+    def output_statistics(self, statistics: dict):
+        """
+        Output statistics calculated by calculate_statistics.
+        """
+        self.output("-" * 30)
+        self.output(f"首个交易日：\t{statistics['start_date']}")
+        self.output(f"最后交易日：\t{statistics['end_date']}")
+
+        self.output(f"总交易日：\t{statistics['total_days']}")
+        self.output(f"盈利交易日：\t{statistics['profit_days']}")
+        self.output(f"亏损交易日：\t{statistics['loss_days']}")
+
+        self.output(f"起始资金：\t{self.capital:,.2f}")
+        self.output(f"结束资金：\t{statistics['end_balance']:,.2f}")
+
+        self.output(f"总收益率：\t{statistics['total_return']:,.2f}%")
+        self.output(f"年化收益：\t{statistics['annual_return']:,.2f}%")
+        self.output(f"最大回撤: \t{statistics['max_drawdown']:,.2f}")
+        self.output(f"百分比最大回撤: {statistics['max_ddpercent']:,.2f}%")
+
+        self.output(f"总盈亏：\t{statistics['total_net_pnl']:,.2f}")
+        self.output(f"总手续费：\t{statistics['total_commission']:,.2f}")
+        self.output(f"总滑点：\t{statistics['total_slippage']:,.2f}")
+        self.output(f"总成交金额：\t{statistics['total_turnover']:,.2f}")
+        self.output(f"总成交笔数：\t{statistics['total_trade_count']}")
+
+        self.output(f"日均盈亏：\t{statistics['daily_net_pnl']:,.2f}")
+        self.output(f"日均手续费：\t{statistics['daily_commission']:,.2f}")
+        self.output(f"日均滑点：\t{statistics['daily_slippage']:,.2f}")
+        self.output(f"日均成交金额：\t{statistics['daily_turnover']:,.2f}")
+        self.output(f"日均成交笔数：\t{statistics['daily_trade_count']}")
+
+        self.output(f"日均收益率：\t{statistics['daily_return']:,.2f}%")
+        self.output(f"收益标准差：\t{statistics['return_std']:,.2f}%")
+        self.output(f"Sharpe Ratio：\t{statistics['sharpe_ratio']:,.2f}")
+        self.output(f"收益回撤比：\t{statistics['return_drawdown_ratio']:,.2f}")
+
     def show_chart(self, df: DataFrame = None):
         """
         在plt显示数据
@@ -482,8 +758,17 @@ class BacktestingEngine:
 
         plt.show()
 
-    def run_optimization(self, optimization_setting: OptimizationSetting, output=True):
-        """"""
+    def run_optimization(
+        self,
+        optimization_setting: OptimizationSetting,
+        output=True,
+        vectorized=False
+    ):
+        """
+        With vectorized, every setting is run by run_vector_backtesting.
+        Streaming and drawdown_limit of set_parameters are also used by
+        every setting.
+        """
         # Get optimization setting and target
         settings = optimization_setting.generate_setting()
         target_name = optimization_setting.target_name
@@ -514,7 +799,10 @@ class BacktestingEngine:
                 self.pricetick,
                 self.capital,
                 self.end,
-                self.mode
+                self.mode,
+                vectorized,
+                self.streaming,
+                self.drawdown_limit
             )))
             results.append(result)
 
@@ -574,6 +862,8 @@ class BacktestingEngine:
         global ga_capital
         global ga_end
         global ga_mode
+        global ga_streaming
+        global ga_drawdown_limit
 
         ga_target_name = target_name
         ga_strategy_class = self.strategy_class
@@ -588,6 +878,8 @@ class BacktestingEngine:
         ga_capital = self.capital
         ga_end = self.end
         ga_mode = self.mode
+        ga_streaming = self.streaming
+        ga_drawdown_limit = self.drawdown_limit
 
         # Set up genetic algorithem
         toolbox = base.Toolbox() 
@@ -668,6 +960,40 @@ class BacktestingEngine:
         else:
             self.daily_results[d] = DailyResult(d, price)
 
+    def close_daily_result(self):
+        """
+        Calculate pnl of last day into streaming statistics, then drop
+        its trades and finished orders.
+        """
+        if not self.daily_results:
+            return
+        _, daily_result = self.daily_results.popitem()
+
+        for trade in self.trades.values():
+            daily_result.add_trade(trade)
+        self.trades.clear()
+
+        statistics = self.streaming_statistics
+        daily_result.calculate_pnl(
+            statistics.pre_close,
+            statistics.end_pos,
+            self.size,
+            self.rate,
+            self.slippage
+        )
+        statistics.update_daily_result(daily_result)
+
+        self.limit_orders = {
+            vt_orderid: order
+            for vt_orderid, order in self.limit_orders.items()
+            if vt_orderid in self.active_limit_orders
+        }
+        self.stop_orders = {
+            stop_orderid: stop_order
+            for stop_orderid, stop_order in self.stop_orders.items()
+            if stop_orderid in self.active_stop_orders
+        }
+
     def new_bar(self, bar: BarData):
         """"""
         self.bar = bar
@@ -692,7 +1018,8 @@ class BacktestingEngine:
 
     def cross_limit_order(self):
         """
-        Cross limit order with last bar/tick data.
+        Cross limit order with last bar/tick data. Crossed orders are
+        found in price sorted order book, and filled in sending order.
         """
         if self.mode == BacktestingMode.BAR:
             long_cross_price = self.bar.low_price
@@ -705,35 +1032,33 @@ class BacktestingEngine:
             long_best_price = long_cross_price
             short_best_price = short_cross_price
 
-        for order in list(self.active_limit_orders.values()):
-            # Push order update with status "not traded" (pending).
-            if order.status == Status.SUBMITTING:
-                order.status = Status.NOTTRADED
-                self.strategy.on_order(order)
-
-            # Check whether limit orders can be filled.
-            long_cross = (
-                order.direction == Direction.LONG 
-                and order.price >= long_cross_price 
-                and long_cross_price > 0
+        # Limit long orders at or above long cross price and limit short
+        # orders at or below short cross price can be filled.
+        vt_orderids = []
+        if long_cross_price > 0:
+            vt_orderids.extend(
+                self.limit_order_book.get_above(Direction.LONG, long_cross_price)
             )
-
-            short_cross = (
-                order.direction == Direction.SHORT 
-                and order.price <= short_cross_price 
-                and short_cross_price > 0
+        if short_cross_price > 0:
+            vt_orderids.extend(
+                self.limit_order_book.get_below(Direction.SHORT, short_cross_price)
             )
+        vt_orderids = self.limit_order_book.sort(vt_orderids)
 
-            if not long_cross and not short_cross:
+        for vt_orderid in vt_orderids:
+            # Order may be cancelled in callback of previous fills.
+            order = self.active_limit_orders.pop(vt_orderid, None)
+            if not order:
                 continue
+            self.limit_order_book.remove(vt_orderid)
+
+            long_cross = order.direction == Direction.LONG
 
             # Push order udpate with status "all traded" (filled).
             order.traded = order.volume
             order.status = Status.ALLTRADED
             self.strategy.on_order(order)
 
-            self.active_limit_orders.pop(order.vt_orderid)
-
             # Push trade update
             self.trade_count += 1
 
@@ -765,7 +1090,8 @@ class BacktestingEngine:
 
     def cross_stop_order(self):
         """
-        Cross stop order with last bar/tick data.
+        Cross stop order with last bar/tick data. Triggered orders are
+        found in price sorted order book, and filled in sending order.
         """
         if self.mode == BacktestingMode.BAR:
             long_cross_price = self.bar.high_price
@@ -778,20 +1104,22 @@ class BacktestingEngine:
             long_best_price = long_cross_price
             short_best_price = short_cross_price
 
-        for stop_order in list(self.active_stop_orders.values()):
-            # Check whether stop order can be triggered.
-            long_cross = (
-                stop_order.direction == Direction.LONG 
-                and stop_order.price <= long_cross_price
-            )
-
-            short_cross = (
-                stop_order.direction == Direction.SHORT 
-                and stop_order.price >= short_cross_price
-            )
+        # Stop long orders at or below long cross price and stop short
+        # orders at or above short cross price are triggered.
+        stop_orderids = self.stop_order_book.get_below(Direction.LONG, long_cross_price)
+        stop_orderids.extend(
+            self.stop_order_book.get_above(Direction.SHORT, short_cross_price)
+        )
+        stop_orderids = self.stop_order_book.sort(stop_orderids)
 
-            if not long_cross and not short_cross:
+        for stop_orderid in stop_orderids:
+            # Stop order may be cancelled in callback of previous fills.
+            stop_order = self.active_stop_orders.pop(stop_orderid, None)
+            if not stop_order:
                 continue
+            self.stop_order_book.remove(stop_orderid)
+
+            long_cross = stop_order.direction == Direction.LONG
 
             # Create order data.
             self.limit_order_count += 1
@@ -840,8 +1168,6 @@ class BacktestingEngine:
             stop_order.vt_orderid = order.vt_orderid
             stop_order.status = StopOrderStatus.TRIGGERED
 
-            self.active_stop_orders.pop(stop_order.stop_orderid)
-
             # Push update to strategy.
             self.strategy.on_stop_order(stop_order)
             self.strategy.on_order(order)
@@ -901,6 +1227,7 @@ class BacktestingEngine:
 
         self.active_stop_orders[stop_order.stop_orderid] = stop_order
         self.stop_orders[stop_order.stop_orderid] = stop_order
+        self.stop_order_book.add(stop_order.stop_orderid, direction, price)
 
         return stop_order.stop_orderid
 
@@ -928,6 +1255,7 @@ class BacktestingEngine:
 
         self.active_limit_orders[order.vt_orderid] = order
         self.limit_orders[order.vt_orderid] = order
+        self.limit_order_book.add(order.vt_orderid, direction, price)
 
         return order.vt_orderid
 
@@ -945,6 +1273,7 @@ class BacktestingEngine:
         if vt_orderid not in self.active_stop_orders:
             return
         stop_order = self.active_stop_orders.pop(vt_orderid)
+        self.stop_order_book.remove(vt_orderid)
 
         stop_order.status = StopOrderStatus.CANCELLED
         self.strategy.on_stop_order(stop_order)
@@ -954,6 +1283,7 @@ class BacktestingEngine:
         if vt_orderid not in self.active_limit_orders:
             return
         order = self.active_limit_orders.pop(vt_orderid)
+        self.limit_order_book.remove(vt_orderid)
 
         order.status = Status.CANCELLED
         self.strategy.on_order(order)
@@ -1002,6 +1332,67 @@ class BacktestingEngine:
         print(f"{datetime.now()}\t{msg}")
 
 
+class OrderBook:
+    """
+    Active orders of backtesting sorted by price for each direction,
+    so orders crossed by a price are found with bisect instead of
+    checking every order.
+    """
+
+    def __init__(self):
+        """"""
+        self.count = 0
+        self.keys = {}
+        self.sorted_keys = {Direction.LONG: [], Direction.SHORT: []}
+
+    def add(self, orderid: str, direction: Direction, price: float):
+        """
+        Add order, sequence number of sending is kept for sort.
+        """
+        self.count += 1
+        key = (price, self.count, orderid)
+        self.keys[orderid] = (direction, key)
+        insort(self.sorted_keys[direction], key)
+
+    def remove(self, orderid: str):
+        """"""
+        if orderid not in self.keys:
+            return
+        direction, key = self.keys.pop(orderid)
+
+        sorted_keys = self.sorted_keys[direction]
+        del sorted_keys[bisect_left(sorted_keys, key)]
+
+    def get_above(self, direction: Direction, price: float):
+        """
+        Get ids of orders with price >= price.
+        """
+        sorted_keys = self.sorted_keys[direction]
+        ix = bisect_left(sorted_keys, (price,))
+        return [key[2] for key in sorted_keys[ix:]]
+
+    def get_below(self, direction: Direction, price: float):
+        """
+        Get ids of orders with price <= price.
+        """
+        sorted_keys = self.sorted_keys[direction]
+        ix = bisect_right(sorted_keys, (price, inf))
+        return [key[2] for key in sorted_keys[:ix]]
+
+    def sort(self, orderids: list):
+        """
+        Sort order ids by sequence of sending.
+        """
+        return sorted(orderids, key=lambda orderid: self.keys[orderid][1][1])
+
+    def clear(self):
+        """"""
+        self.count = 0
+        self.keys.clear()
+        for sorted_keys in self.sorted_keys.values():
+            sorted_keys.clear()
+
+
 class DailyResult:
     """"""
 
@@ -1070,6 +1461,261 @@ class DailyResult:
         self.net_pnl = self.total_pnl - self.commission - self.slippage
 
 
+class StreamingStatistics:
+    """
+    Statistics of calculate_statistics accumulated from daily results
+    one day at a time during replay, using running sums, running max of
+    balance and running mean/variance of daily log return.
+    """
+
+    def __init__(self, capital: float, drawdown_limit: float = 0):
+        """"""
+        self.capital = capital
+        self.drawdown_limit = drawdown_limit
+        self.stopped = False
+
+        self.pre_close = 0
+        self.end_pos = 0
+
+        self.start_date = ""
+        self.end_date = ""
+        self.total_days = 0
+        self.profit_days = 0
+        self.loss_days = 0
+
+        self.balance = capital
+        self.highlevel = -inf
+        self.max_drawdown = 0
+        self.max_ddpercent = 0
+
+        self.total_net_pnl = 0
+        self.total_commission = 0
+        self.total_slippage = 0
+        self.total_turnover = 0
+        self.total_trade_count = 0
+
+        self.return_count = 0
+        self.return_mean = 0
+        self.return_m2 = 0
+
+    def update_daily_result(self, daily_result: DailyResult):
+        """
+        Update daily result with pnl calculated.
+        """
+        self.pre_close = daily_result.close_price
+        self.end_pos = daily_result.end_pos
+
+        if not self.total_days:
+            self.start_date = daily_result.date
+        self.end_date = daily_result.date
+        self.total_days += 1
+
+        net_pnl = daily_result.net_pnl
+        if net_pnl > 0:
+            self.profit_days += 1
+        elif net_pnl < 0:
+            self.loss_days += 1
+
+        self.total_net_pnl += net_pnl
+        self.total_commission += daily_result.commission
+        self.total_slippage += daily_result.slippage
+        self.total_turnover += daily_result.turnover
+        self.total_trade_count += daily_result.trade_count
+
+        # Return of the first day and of non-positive balance is
+        # undefined and skipped, same as NaN in calculate_statistics.
+        pre_balance = self.balance
+        self.balance = self.total_net_pnl + self.capital
+
+        if self.total_days > 1 and self.balance / pre_balance > 0:
+            self.update_return(log(self.balance / pre_balance))
+
+        self.highlevel = max(self.highlevel, self.balance)
+        drawdown = self.balance - self.highlevel
+        ddpercent = drawdown / self.highlevel * 100
+
+        self.max_drawdown = min(self.max_drawdown, drawdown)
+        self.max_ddpercent = min(self.max_ddpercent, ddpercent)
+
+        if self.drawdown_limit and -ddpercent >= self.drawdown_limit:
+            self.stopped = True
+
+    def update_return(self, value: float):
+        """
+        Update running mean and variance by Welford's method.
+        """
+        self.return_count += 1
+        delta = value - self.return_mean
+        self.return_mean += delta / self.return_count
+        self.return_m2 += delta * (value - self.return_mean)
+
+    def get_statistics(self):
+        """
+        Get statistics in the same format as calculate_statistics,
+        after at least one day is updated.
+        """
+        total_days = self.total_days
+        total_return = (self.balance / self.capital - 1) * 100
+        if self.return_count:
+            daily_return = self.return_mean * 100
+        else:
+            daily_return = np.nan
+
+        if self.return_count > 1:
+            return_std = sqrt(self.return_m2 / (self.return_count - 1)) * 100
+        else:
+            return_std = np.nan
+
+        if return_std:
+            sharpe_ratio = daily_return / return_std * np.sqrt(240)
+        else:
+            sharpe_ratio = 0
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return_drawdown_ratio = -np.float64(total_return) / self.max_ddpercent
+
+        statistics = {
+            "start_date": self.start_date,
+            "end_date": self.end_date,
+            "total_days": total_days,
+            "profit_days": self.profit_days,
+            "loss_days": self.loss_days,
+            "capital": self.capital,
+            "end_balance": self.balance,
+            "max_drawdown": self.max_drawdown,
+            "max_ddpercent": self.max_ddpercent,
+            "total_net_pnl": self.total_net_pnl,
+            "daily_net_pnl": self.total_net_pnl / total_days,
+            "total_commission": self.total_commission,
+            "daily_commission": self.total_commission / total_days,
+            "total_slippage": self.total_slippage,
+            "daily_slippage": self.total_slippage / total_days,
+            "total_turnover": self.total_turnover,
+            "daily_turnover": self.total_turnover / total_days,
+            "total_trade_count": self.total_trade_count,
+            "daily_trade_count": self.total_trade_count / total_days,
+            "total_return": total_return,
+            "annual_return": total_return / total_days * 240,
+            "daily_return": daily_return,
+            "return_std": return_std,
+            "sharpe_ratio": sharpe_ratio,
+            "return_drawdown_ratio": return_drawdown_ratio,
+        }
+        return statistics
+
+
+def cross_orders(
+    open_price: np.ndarray,
+    high_price: np.ndarray,
+    low_price: np.ndarray,
+    price: np.ndarray,
+    stop: np.ndarray
+):
+    """
+    Cross orders sent on close of every bar with the next bar, by the
+    same rules as cross_limit_order and cross_stop_order in bar mode.
+    Return fill flags and trade prices of long/short orders indexed by
+    the bar which sent the order (the last bar never fills).
+    """
+    next_open = np.append(open_price[1:], np.nan)
+    next_high = np.append(high_price[1:], np.nan)
+    next_low = np.append(low_price[1:], np.nan)
+    market = np.isnan(price)
+    filled = ~np.isnan(next_open)
+
+    # Limit long/short stop cross low price, limit short/stop long cross high price
+    low_cross = (next_low <= price) & (next_low > 0)
+    high_cross = (next_high >= price) & (next_high > 0)
+
+    long_fill = filled & (market | np.where(stop, high_cross, low_cross))
+    short_fill = filled & (market | np.where(stop, low_cross, high_cross))
+
+    long_price = np.where(
+        market,
+        next_open,
+        np.where(stop, np.maximum(price, next_open), np.minimum(price, next_open))
+    )
+    short_price = np.where(
+        market,
+        next_open,
+        np.where(stop, np.minimum(price, next_open), np.maximum(price, next_open))
+    )
+    return long_fill, long_price, short_fill, short_price
+
+
+def calculate_daily_result(
+    dates: list,
+    close_prices: np.ndarray,
+    trade_days: np.ndarray,
+    trade_changes: np.ndarray,
+    trade_prices: np.ndarray,
+    size: float,
+    rate: float,
+    slippage: float,
+    trades: list = None
+):
+    """
+    Calculate the columns of DailyResult for all days with numpy.
+    trade_days is the index of day of every trade, trade_changes the
+    signed volume. Return DataFrame indexed by date like calculate_result,
+    positions are integer if all trade volumes are integer.
+    """
+    count = len(dates)
+    close_prices = np.asarray(close_prices, dtype=float)
+    trade_days = np.asarray(trade_days, dtype=int)
+    trade_changes = np.asarray(trade_changes)
+    integer_pos = np.issubdtype(trade_changes.dtype, np.integer)
+    trade_changes = trade_changes.astype(float)
+    trade_prices = np.asarray(trade_prices, dtype=float)
+
+    pre_close = np.concatenate([[0], close_prices[:-1]])
+
+    trade_volumes = np.abs(trade_changes)
+    trade_turnover = trade_prices * trade_volumes * size
+
+    def sum_by_day(values):
+        return np.bincount(trade_days, weights=values, minlength=count)
+
+    pos_change = sum_by_day(trade_changes)
+    end_pos = np.cumsum(pos_change)
+    start_pos = end_pos - pos_change
+    if integer_pos:
+        end_pos = end_pos.astype(np.int64)
+        start_pos = start_pos.astype(np.int64)
+
+    turnover = sum_by_day(trade_turnover)
+    commission = sum_by_day(trade_turnover * rate)
+    slippage_cost = sum_by_day(trade_volumes * size * slippage)
+
+    trading_pnl = sum_by_day(
+        trade_changes * (close_prices[trade_days] - trade_prices) * size
+    )
+    holding_pnl = start_pos * (close_prices - pre_close) * size
+    total_pnl = trading_pnl + holding_pnl
+    net_pnl = total_pnl - commission - slippage_cost
+
+    if trades is None:
+        trades = [[] for _ in range(count)]
+
+    df = DataFrame({
+        "date": dates,
+        "close_price": close_prices,
+        "pre_close": pre_close,
+        "trades": trades,
+        "trade_count": np.bincount(trade_days, minlength=count),
+        "start_pos": start_pos,
+        "end_pos": end_pos,
+        "turnover": turnover,
+        "commission": commission,
+        "slippage": slippage_cost,
+        "trading_pnl": trading_pnl,
+        "holding_pnl": holding_pnl,
+        "total_pnl": total_pnl,
+        "net_pnl": net_pnl,
+    })
+    return df.set_index("date")
+
+
 def optimize(
     target_name: str,
     strategy_class: CtaTemplate,
@@ -1083,7 +1729,10 @@ def optimize(
     pricetick: float,
     capital: int,
     end: datetime,
-    mode: BacktestingMode
+    mode: BacktestingMode,
+    vectorized: bool = False,
+    streaming: bool = False,
+    drawdown_limit: float = 0
 ):
     """
     Function for running in multiprocessing.pool
@@ -1100,13 +1749,19 @@ def optimize(
         pricetick=pricetick,
         capital=capital,
         end=end,
-        mode=mode
+        mode=mode,
+        streaming=streaming,
+        drawdown_limit=drawdown_limit
     )
 
     engine.add_strategy(strategy_class, setting)
     engine.load_data()
-    engine.run_backtesting()
-    engine.calculate_result()
+    if vectorized:
+        engine.run_vector_backtesting()
+    else:
+        engine.run_backtesting()
+        if not streaming:
+            engine.calculate_result()
     statistics = engine.calculate_statistics(output=False)
 
     target_value = statistics[target_name]
@@ -1131,7 +1786,10 @@ def _ga_optimize(parameter_values: tuple):
         ga_pricetick,
         ga_capital,
         ga_end,
-        ga_mode
+        ga_mode,
+        False,
+        ga_streaming,
+        ga_drawdown_limit
     )
     return (result[1],)
 
@@ -1150,7 +1808,7 @@ def load_bar_data(
     end: datetime
 ):
     """"""
-    return database_manager.load_bar_data(
+    return database_manager.load_bar_buffer(
         symbol, exchange, interval, start, end
     )
 
@@ -1163,7 +1821,7 @@ def load_tick_data(
     end: datetime
 ):
     """"""
-    return database_manager.load_tick_data(
+    return database_manager.load_tick_buffer(
         symbol, exchange, start, end
     )
 
@@ -1182,3 +1840,5 @@ ga_slippage = None
 ga_size = None
 ga_pricetick = None
 ga_capital = None
+ga_streaming = False
+ga_drawdown_limit = 0
@@ -38,6 +38,7 @@ from vnpy.trader.constant import (
     Status
 )
 from vnpy.trader.utility import load_json, save_json, extract_vt_symbol
+from vnpy.trader.symbol import symbol_registry
 # 初始化数据库
 from vnpy.trader.database import database_manager
 
@@ -585,8 +586,9 @@ class CtaEngine(BaseEngine):
         strategy = strategy_class(self, strategy_name, vt_symbol, setting)
         self.strategies[strategy_name] = strategy
 
-        # Add vt_symbol to strategy map.
-        strategies = self.symbol_strategy_map[vt_symbol]
+        # Add vt_symbol to strategy map, keyed by the interned vt_symbol
+        # shared with tick data.
+        strategies = self.symbol_strategy_map[symbol_registry.intern(vt_symbol)]
         strategies.append(strategy)
 
         # Update to setting file.
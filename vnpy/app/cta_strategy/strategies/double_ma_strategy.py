@@ -1,3 +1,6 @@
+import numpy as np
+import talib
+
 from vnpy.app.cta_strategy import (
     CtaTemplate,
     StopOrder,
@@ -99,6 +102,33 @@ class DoubleMaStrategy(CtaTemplate):
 
         self.put_event()
 
+    def generate_signals(self, data):
+        """
+        Vectorized version of on_bar: hold 1 lot in direction of the last
+        MA cross, with limit orders at close price of the cross bar. Only
+        an approximation of on_bar, which never cancels orders.
+        """
+        close = data.close_price
+        fast_ma = talib.SMA(close, self.fast_window)
+        slow_ma = talib.SMA(close, self.slow_window)
+
+        cross_over = np.zeros(len(close), dtype=bool)
+        cross_below = np.zeros(len(close), dtype=bool)
+        cross_over[1:] = (fast_ma[1:] > slow_ma[1:]) & (fast_ma[:-1] < slow_ma[:-1])
+        cross_below[1:] = (fast_ma[1:] < slow_ma[1:]) & (fast_ma[:-1] > slow_ma[:-1])
+
+        # Signals start after ArrayManager is inited.
+        inited = np.arange(len(close)) >= self.am.size - 1
+        signal = np.where(cross_over & inited, 1, np.where(cross_below & inited, -1, 0))
+
+        # Hold target and order price of the last cross, since orders
+        # are not cancelled until filled.
+        bars = np.arange(len(close))
+        index = np.maximum.accumulate(np.where(signal != 0, bars, 0))
+        target = np.where(signal[index] != 0, signal[index], 0)
+
+        return target, close[index], None
+
     def on_order(self, order: OrderData):
         """
         Callback of new order data update.
@@ -5,7 +5,7 @@ from vnpy.app.cta_strategy import (
     BarData,
     TradeData,
     OrderData,
-    BarGenerator,
+    MultiBarGenerator,
     ArrayManager,
 )
 
@@ -43,10 +43,11 @@ class MultiTimeframeStrategy(CtaTemplate):
         self.rsi_long = 50 + self.rsi_signal
         self.rsi_short = 50 - self.rsi_signal
 
-        self.bg5 = BarGenerator(self.on_bar, 5, self.on_5min_bar)
+        self.bg = MultiBarGenerator(self.on_bar)
+        self.bg.add_window(5, self.on_5min_bar)
         self.am5 = ArrayManager()
 
-        self.bg15 = BarGenerator(self.on_bar, 15, self.on_15min_bar)
+        self.bg.add_window(15, self.on_15min_bar)
         self.am15 = ArrayManager()
 
     def on_init(self):
@@ -72,14 +73,13 @@ class MultiTimeframeStrategy(CtaTemplate):
         """
         Callback of new tick data update.
         """
-        self.bg5.update_tick(tick)
+        self.bg.update_tick(tick)
 
     def on_bar(self, bar: BarData):
         """
         Callback of new bar data update.
         """
-        self.bg5.update_bar(bar)
-        self.bg15.update_bar(bar)
+        self.bg.update_bar(bar)
 
     def on_5min_bar(self, bar: BarData):
         """"""
@@ -1,5 +1,6 @@
 """"""
 from abc import ABC
+from copy import copy
 from typing import Any, Callable
 
 from vnpy.trader.constant import Interval, Direction, Offset
@@ -163,6 +164,18 @@ class CtaTemplate(ABC):
         """
         pass
 
+    @virtual
+    def generate_signals(self, data):
+        """
+        Array-level signals for BacktestingEngine.run_vector_backtesting.
+        data is BarBuffer of all history bars. Return (target, price,
+        stop) arrays of target position on close of every bar, order
+        price (nan for market order at next open, None for all market)
+        and stop order flag (None for all limit orders).
+        向量化回测的信号函数
+        """
+        pass
+
     def buy(self, price: float, volume: float, stop: bool = False, lock: bool = False):
         """
         Send buy order to open a long position.
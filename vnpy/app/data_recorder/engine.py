@@ -4,6 +4,7 @@ from threading import Thread
 from queue import Queue, Empty
 from copy import copy
 from time import sleep
+from typing import List
 import datetime
 from vnpy.event import Event, EventEngine
 from vnpy.trader.constant import Interval
@@ -18,6 +19,7 @@ from vnpy.trader.object import (
 from vnpy.trader.event import EVENT_TICK, EVENT_CONTRACT
 from vnpy.trader.utility import load_json, save_json, BarGenerator, extract_vt_symbol, TimeUtils
 from vnpy.trader.database import database_manager
+from vnpy.trader.symbol import symbol_registry
 
 # 应用名称， 这个应用功能是 数据实时获取并存储， 还有历史（1min k）数据的获取与存储
 APP_NAME = "DataRecorder"
@@ -64,10 +66,16 @@ class RecorderEngine(BaseEngine):
         :return: 
         """
         setting = load_json(self.setting_filename)
-        # 存入数据库的 tick 交易对
-        self.tick_recordings = setting.get("tick", {})
+        # 存入数据库的 tick 交易对，key使用与tick数据共享的vt_symbol
+        self.tick_recordings = {
+            symbol_registry.intern(vt_symbol): data
+            for vt_symbol, data in setting.get("tick", {}).items()
+        }
         # 存入数据库的 bar 交易对
-        self.bar_recordings = setting.get("bar", {})
+        self.bar_recordings = {
+            symbol_registry.intern(vt_symbol): data
+            for vt_symbol, data in setting.get("bar", {}).items()
+        }
 
     def save_setting(self):
         """
@@ -93,8 +101,8 @@ class RecorderEngine(BaseEngine):
                 task_type, data = task
 
                 if task_type == "tick":
-                    # tick 数据存数据库
-                    database_manager.save_tick_data([data])
+                    # tick 数据存数据库，data是一批tick数据
+                    database_manager.save_tick_data(data)
                 elif task_type == "bar":
                     # bar 数据存数据库
                     database_manager.save_bar_data([data])
@@ -218,31 +226,37 @@ class RecorderEngine(BaseEngine):
         注册事件到事件引擎  把数据存入数据库   和 订阅tick数据
         :return: 
         """
-        # tick 数据事件， 把数据存入数据库
-        self.event_engine.register(EVENT_TICK, self.process_tick_event)
+        # tick 数据事件， 把数据存入数据库，批量处理
+        self.event_engine.register_batch(EVENT_TICK, self.process_tick_events)
         # # bar 数据数据， 把bar数据存入数据库
         # self.event_engine.register(EVENT_BAR, self.process_bar_event)
         # 订阅tick数据 和 bar 1min 数据， rest 请求 bar 1min 历史数据
         self.event_engine.register(EVENT_CONTRACT, self.process_contract_event)
 
-    def process_tick_event(self, event: Event):
+    def process_tick_events(self, events: List[Event]):
         """
-        EVENT_TICK 事件 关联的回调函数， 把tick数据存入数据库  
-        :param event: Event
+        EVENT_TICK 事件 关联的批量回调函数， 把一批tick数据存入数据库
+        :param events: 同一类型的Event列表
         :return: 
         """
-        # 拿到 tick数据
-        tick = event.data
+        ticks = []
+
+        for event in events:
+            # 拿到 tick数据
+            tick = event.data
+
+            if tick.vt_symbol in self.tick_recordings:
+                # 如果tick的符号在 tick_recordings里，则存入数据库
+                ticks.append(copy(tick))
 
-        if tick.vt_symbol in self.tick_recordings:
-            # 如果tick的符号在 tick_recordings里，则存入数据库
-            self.record_tick(tick)
+            if tick.vt_symbol in self.bar_recordings:
+                # 如果tick的符号在 bar_recordings里，则根据tick数据生成bar数据，但是这并不准确
+                bg = self.get_bar_generator(tick.vt_symbol)
+                bg.update_tick(tick)
 
-        if tick.vt_symbol in self.bar_recordings:
-            # 如果tick的符号在 bar_recordings里，则根据tick数据生成bar数据，但是这并不准确
-            bg = self.get_bar_generator(tick.vt_symbol)
-            # 这里存入数据库了吗？？
-            bg.update_tick(tick)
+        if ticks:
+            # 一次放入整批tick数据，数据库一次写入
+            self.queue.put(("tick", ticks))
 
     def process_bar_event(self, event: Event):
         """
@@ -317,7 +331,7 @@ class RecorderEngine(BaseEngine):
         :param tick: TickData数据
         :return: 
         """
-        task = ("tick", copy(tick))
+        task = ("tick", [copy(tick)])
         # 数据库专用队列里放 tick数据
         self.queue.put(task)
 
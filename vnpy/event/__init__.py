@@ -1 +1,18 @@
-from .engine import Event, EventEngine, EVENT_TIMER
+from .engine import (
+    Event,
+    EventEngine,
+    EventQueue,
+    ConflatedHandler,
+    PickleCodec,
+    EVENT_TIMER,
+    PRIORITY_TRADING,
+    PRIORITY_MARKET,
+    PRIORITY_NORMAL,
+    PRIORITY_LOG,
+    PRIORITY_TIMER,
+    PRIORITY_LANES,
+    partition_by_type,
+    partition_by_symbol
+)
+from .stats import EVENT_ENGINE_STATS, EventStats
+from .async_engine import AsyncEventEngine
@@ -0,0 +1,536 @@
+"""
+Asyncio based event engine.
+基于asyncio的事件引擎
+"""
+
+import asyncio
+from collections import defaultdict
+from inspect import isawaitable
+from itertools import count
+from threading import Lock, Thread, get_ident
+from time import monotonic, perf_counter
+from typing import Callable, Coroutine, List
+
+from .engine import (
+    Event,
+    EVENT_CALLBACK,
+    EVENT_TIMER,
+    PRIORITY_LANES,
+    PRIORITY_NORMAL,
+    PRIORITY_TIMER,
+    BatchHandlerType,
+    ConflatedHandler,
+    HandlerType,
+    PartitionType,
+    ScheduledTimer,
+    partition_by_symbol,
+)
+from .stats import EVENT_ENGINE_STATS, EventStats, get_handler_name
+
+
+class AsyncEventEngine:
+    """
+    Event engine running on an asyncio event loop. It has the same
+    interface as a single worker EventEngine, and handlers (including
+    batch handlers and dispatched scheduled callbacks) can be either
+    functions or coroutine functions.
+
+    Handlers of one event are called (and awaited) one by one before the
+    next event is processed, so the order contract of EventEngine holds.
+    A handler which should not block the following events can start its
+    own task with asyncio.ensure_future.
+
+    put is thread-safe, so gateways running in threads can still be used.
+    Gateways and apps written as coroutines can be run on the same loop
+    with run_coroutine instead of spawning threads.
+    异步事件引擎，处理函数可以是普通函数或协程函数
+    """
+
+    def __init__(
+        self,
+        interval: int = 1,
+        priority: bool = False,
+        batch_size: int = 1000
+    ):
+        """
+        Priority lanes and batch_size work as in EventEngine. Timer
+        events and scheduled callbacks are driven by the event loop.
+        """
+        self._interval = interval
+        self._active = False
+        self._stopped = False
+
+        # 事件优先级，队列中的元素为(优先级, 序号, 事件)
+        self._priority = priority
+        self._priorities = {EVENT_TIMER: PRIORITY_TIMER}
+        self._lane_cache = {}
+        self._depth = [0] * (PRIORITY_LANES if priority else 1)
+        self._sequence = count()
+
+        # 事件循环，start时在独立线程中运行，也可以在外部循环中await run()
+        self._loop = None
+        self._loop_thread_id = None
+        self._thread = None
+
+        # 事件循环启动前放入的事件
+        self._queue = None
+        self._pending = []
+        self._pending_lock = Lock()
+
+        self._handlers = defaultdict(list)
+        self._general_handlers = []
+        self._batch_handlers = defaultdict(list)
+        self._batch_size = batch_size
+        self._conflated_handlers = {}
+
+        # 定时回调，事件循环启动后由loop.call_at驱动
+        self._timers = {}
+        self._timer_count = count(1)
+        self.schedule(interval, self._put_timer_event, interval, False)
+
+        # 性能统计，默认关闭
+        self._stats = None
+        self._stats_timer = 0
+
+    @property
+    def loop(self):
+        """
+        Event loop the engine is running on.
+        """
+        return self._loop
+
+    async def run(self):
+        """
+        Process events on the current event loop until stop is called.
+        """
+        self._loop = asyncio.get_event_loop()
+        self._loop_thread_id = get_ident()
+        self._active = True
+
+        for conflated_handler in list(self._conflated_handlers.values()):
+            conflated_handler.start()
+
+        with self._pending_lock:
+            self._queue = asyncio.PriorityQueue()
+            for item in self._pending:
+                self._queue.put_nowait(item)
+            self._pending = []
+
+            for timer in self._timers.values():
+                self._start_timer(timer)
+
+        queue = self._queue
+        while not self._stopped:
+            lane, _, event = await queue.get()
+            if event is None:
+                break
+            self._depth[lane] -= 1
+
+            if not self._batch_handlers:
+                await self._process(event)
+                continue
+
+            # Drain waiting events for batch handlers.
+            events = [event]
+            while len(events) < self._batch_size and not queue.empty():
+                lane, _, event = queue.get_nowait()
+                if event is None:
+                    self._stopped = True
+                    break
+                self._depth[lane] -= 1
+                events.append(event)
+            await self._process_batch(events)
+
+        self._active = False
+        for conflated_handler in list(self._conflated_handlers.values()):
+            conflated_handler.stop()
+
+    async def _process(self, event: Event):
+        """
+        Distribute event to handlers registered for its type, then to
+        general handlers, awaiting coroutine handlers one by one.
+        Scheduled callbacks are run instead of being distributed.
+        """
+        stats = self._stats
+        if stats:
+            put_time = getattr(event, "put_time", None)
+            if put_time is not None:
+                stats.update_latency(event.type, perf_counter() - put_time)
+
+        if event.type == EVENT_CALLBACK:
+            await self._call(event.data)
+            return
+
+        handlers = self._handlers.get(event.type, [])
+        if self._general_handlers:
+            handlers = handlers + self._general_handlers
+
+        for handler in handlers:
+            await self._call(handler, event)
+
+    async def _process_batch(self, events: List[Event]):
+        """
+        Process events one by one with normal handlers, then call each
+        batch handler once with all events of its type.
+        """
+        batches = {}
+
+        for event in events:
+            await self._process(event)
+
+            if event.type in self._batch_handlers:
+                batch = batches.get(event.type, None)
+                if batch is None:
+                    batch = batches[event.type] = []
+                batch.append(event)
+
+        for type, batch in batches.items():
+            for handler in self._batch_handlers.get(type, []):
+                await self._call(handler, batch)
+
+    async def _call(self, handler: Callable, *args):
+        """
+        Call handler and await its result if it is awaitable, recording
+        wall time if stats is enabled.
+        """
+        if self._stats:
+            start = perf_counter()
+
+        result = handler(*args)
+        if result is not None and isawaitable(result):
+            await result
+
+        if self._stats:
+            self._stats.update_handler(
+                get_handler_name(handler), perf_counter() - start
+            )
+
+    def _put_timer_event(self):
+        """
+        Generate a timer event every interval seconds.
+        """
+        self.put(Event(EVENT_TIMER))
+
+    def _start_timer(self, timer: ScheduledTimer):
+        """
+        Add timer into event loop, called from event loop thread.
+        """
+        self._loop.call_at(timer.deadline, self._run_timer, timer)
+
+    def _run_timer(self, timer: ScheduledTimer):
+        """
+        Run due timer callback, and schedule the next run if repeating.
+        """
+        if timer.cancelled or self._stopped:
+            return
+
+        if timer.interval:
+            # Keep a fixed rate, but skip missed runs if late.
+            timer.deadline = max(timer.deadline + timer.interval, monotonic())
+            self._start_timer(timer)
+        else:
+            with self._pending_lock:
+                self._timers.pop(timer.timer_id, None)
+
+        if timer.dispatch:
+            self.put(Event(EVENT_CALLBACK, timer.callback))
+        else:
+            result = timer.callback()
+            if result is not None and isawaitable(result):
+                asyncio.ensure_future(result)
+
+    def start(self):
+        """
+        Start a new event loop in its own thread, and process events.
+        """
+        self._loop = asyncio.new_event_loop()
+        self._thread = Thread(target=self._run_loop)
+        self._thread.start()
+
+    def _run_loop(self):
+        """"""
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_until_complete(self.run())
+        self._loop.close()
+
+    def stop(self):
+        """
+        Stop processing events, and the event loop if started by start.
+        """
+        self._stopped = True
+        if self._loop and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wake)
+
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _wake(self):
+        """
+        Wake up run waiting for events after stopped.
+        """
+        if self._queue is not None:
+            self._queue.put_nowait((-1, 0, None))
+
+    def put(self, event: Event):
+        """
+        Put an event object into event queue, from any thread.
+        """
+        if self._stats:
+            event.put_time = perf_counter()
+
+        if self._priority:
+            lane = self._lane_cache.get(event.type, None)
+            if lane is None:
+                lane = self._get_lane(event.type)
+        else:
+            lane = 0
+        item = (lane, next(self._sequence), event)
+
+        if self._queue is None:
+            with self._pending_lock:
+                if self._queue is None:
+                    self._depth[lane] += 1
+                    self._pending.append(item)
+                    return
+
+        if get_ident() == self._loop_thread_id:
+            self._enqueue(item)
+        else:
+            self._loop.call_soon_threadsafe(self._enqueue, item)
+
+    def _enqueue(self, item: tuple):
+        """"""
+        self._depth[item[0]] += 1
+        self._queue.put_nowait(item)
+
+    def run_coroutine(self, coroutine: Coroutine):
+        """
+        Run a coroutine on the event loop of engine from any thread,
+        return a concurrent.futures.Future.
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    def _get_lane(self, type: str):
+        """
+        Find priority lane of event type by the longest matching prefix
+        and cache it.
+        """
+        lane = PRIORITY_NORMAL
+        matched = ""
+
+        for prefix, prefix_lane in self._priorities.items():
+            if type.startswith(prefix) and len(prefix) > len(matched):
+                lane = prefix_lane
+                matched = prefix
+
+        self._lane_cache[type] = lane
+        return lane
+
+    def set_priority(self, prefix: str, lane: int):
+        """
+        Set priority lane for all event types starting with prefix,
+        used when engine is created with priority enabled.
+        设置事件类型前缀对应的优先级
+        """
+        self._priorities[prefix] = lane
+        self._lane_cache.clear()
+
+    def get_queue_depth(self):
+        """
+        Get number of events waiting in each priority lane.
+        获取每个优先级通道中等待处理的事件数量
+        """
+        return dict(enumerate(self._depth))
+
+    def schedule(
+        self,
+        delay: float,
+        callback: Callable,
+        interval: float = 0,
+        dispatch: bool = True
+    ):
+        """
+        Call callback after delay seconds, and then every interval seconds
+        if interval is not 0, from any thread.
+
+        With dispatch True the callback is run in order with other events,
+        and can be a coroutine function. Otherwise it is run directly by
+        the event loop, which must never be blocked.
+        添加定时回调，interval不为0时重复执行，返回定时器编号
+        """
+        timer_id = next(self._timer_count)
+        timer = ScheduledTimer(
+            timer_id, callback, monotonic() + delay, interval, dispatch
+        )
+
+        with self._pending_lock:
+            self._timers[timer_id] = timer
+            if self._queue is None:
+                return timer_id
+
+        if get_ident() == self._loop_thread_id:
+            self._start_timer(timer)
+        else:
+            self._loop.call_soon_threadsafe(self._start_timer, timer)
+        return timer_id
+
+    def cancel(self, timer_id: int):
+        """
+        Cancel a scheduled callback.
+        取消定时回调
+        """
+        with self._pending_lock:
+            timer = self._timers.pop(timer_id, None)
+            if timer:
+                timer.cancelled = True
+
+    def enable_stats(self, interval: float = 0):
+        """
+        Start recording stats as EventEngine.enable_stats does.
+        开启性能统计
+        """
+        if not self._stats:
+            self._stats = EventStats()
+            for conflated_handler in self._conflated_handlers.values():
+                conflated_handler.stats = self._stats
+
+        if self._stats_timer:
+            self.cancel(self._stats_timer)
+            self._stats_timer = 0
+
+        if interval:
+            self._stats_timer = self.schedule(
+                interval, self._put_stats_event, interval, False
+            )
+
+    def disable_stats(self):
+        """
+        Stop recording stats.
+        关闭性能统计
+        """
+        if self._stats_timer:
+            self.cancel(self._stats_timer)
+            self._stats_timer = 0
+
+        self._stats = None
+        for conflated_handler in self._conflated_handlers.values():
+            conflated_handler.stats = None
+
+    def get_stats(self):
+        """
+        Get stats in the same format as EventEngine.get_stats.
+        获取性能统计数据
+        """
+        return self._get_stats(False)
+
+    def _get_stats(self, reset: bool):
+        """"""
+        if not self._stats:
+            return {}
+
+        stats = self._stats.get_summary(reset)
+        depth = self.get_queue_depth()
+        stats["queue_depth"] = sum(depth.values())
+        stats["lane_depth"] = depth
+        return stats
+
+    def _put_stats_event(self):
+        """
+        Put stats event, which starts a new events per second window.
+        """
+        self.put(Event(EVENT_ENGINE_STATS, self._get_stats(True)))
+
+    def register(self, type: str, handler: HandlerType):
+        """
+        Register a new handler function or coroutine function for a
+        specific event type.
+        """
+        handler_list = self._handlers[type]
+        if handler not in handler_list:
+            handler_list.append(handler)
+
+    def unregister(self, type: str, handler: HandlerType):
+        """
+        Unregister an existing handler function from event engine.
+        """
+        handler_list = self._handlers[type]
+
+        if handler in handler_list:
+            handler_list.remove(handler)
+
+        if not handler_list:
+            self._handlers.pop(type)
+
+    def register_batch(self, type: str, handler: BatchHandlerType):
+        """
+        Register a handler (or coroutine function) receiving a list of
+        events of the type, as EventEngine.register_batch.
+        注册批量处理函数，一次收到队列中同一类型的全部事件
+        """
+        handler_list = self._batch_handlers[type]
+        if handler not in handler_list:
+            handler_list.append(handler)
+
+    def unregister_batch(self, type: str, handler: BatchHandlerType):
+        """
+        Unregister an existing batch handler.
+        """
+        handler_list = self._batch_handlers[type]
+
+        if handler in handler_list:
+            handler_list.remove(handler)
+
+        if not handler_list:
+            self._batch_handlers.pop(type)
+
+    def register_conflated(
+        self,
+        type: str,
+        handler: HandlerType,
+        key: PartitionType = partition_by_symbol
+    ):
+        """
+        Register a slow function handler which only needs the latest
+        event of each key, run on its own thread as in EventEngine.
+        Return the ConflatedHandler.
+        注册最新值优先的处理函数
+        """
+        conflated_handler = self._conflated_handlers.get((type, handler), None)
+        if conflated_handler:
+            return conflated_handler
+
+        conflated_handler = ConflatedHandler(handler, key)
+        conflated_handler.stats = self._stats
+        self._conflated_handlers[(type, handler)] = conflated_handler
+        self.register(type, conflated_handler)
+
+        if self._active:
+            conflated_handler.start()
+
+        return conflated_handler
+
+    def unregister_conflated(self, type: str, handler: HandlerType):
+        """
+        Unregister an existing conflated handler.
+        """
+        conflated_handler = self._conflated_handlers.pop((type, handler), None)
+        if not conflated_handler:
+            return
+
+        self.unregister(type, conflated_handler)
+        conflated_handler.stop()
+
+    def register_general(self, handler: Callable):
+        """
+        Register a new handler function for all event types.
+        """
+        if handler not in self._general_handlers:
+            self._general_handlers.append(handler)
+
+    def unregister_general(self, handler: Callable):
+        """
+        Unregister an existing general handler function.
+        """
+        if handler in self._general_handlers:
+            self._general_handlers.remove(handler)
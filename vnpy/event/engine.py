@@ -2,14 +2,30 @@
 Event-driven framework of vn.py framework.
 """
 
-from collections import defaultdict
-from queue import Empty, Queue
-from threading import Thread
-from time import sleep
-from typing import Any, Callable
+import pickle
+from collections import defaultdict, deque
+from heapq import heappop, heappush
+from itertools import count
+from queue import Empty
+from threading import Condition, Thread
+from time import monotonic, perf_counter
+from typing import Any, Callable, Hashable, List
+
+from .stats import EVENT_ENGINE_STATS, EventStats, get_handler_name
 
 # 定时器事件
 EVENT_TIMER = "eTimer"
+# 定时回调事件，只在事件引擎内部使用，不会分发给处理函数
+EVENT_CALLBACK = "eCallback"
+
+# Priority lanes of event queue, lower value is processed first.
+# 事件队列优先级，数值越小越先处理
+PRIORITY_TRADING = 0
+PRIORITY_MARKET = 1
+PRIORITY_NORMAL = 2
+PRIORITY_LOG = 3
+PRIORITY_TIMER = 4
+PRIORITY_LANES = 5
 
 
 class Event:
@@ -28,10 +44,277 @@ class Event:
         self.data = data
 
 
+class PickleCodec:
+    """
+    Encode event into bytes with pickle, used by ProcessEventEngine.
+    """
+
+    def encode(self, event: Event):
+        """"""
+        return pickle.dumps((event.type, event.data), pickle.HIGHEST_PROTOCOL)
+
+    def decode(self, data: bytes):
+        """"""
+        type, event_data = pickle.loads(data)
+        return Event(type, event_data)
+
+
 # Defines handler function to be used in event engine.
 # 定义处理函数在EventEngine使用
 HandlerType = Callable[[Event], None]
 
+# Defines handler function receiving a list of events of the same type.
+# 定义批量处理函数，一次处理同一类型的多个事件
+BatchHandlerType = Callable[[List[Event]], None]
+
+# Defines function mapping an event to its partition key.
+# 定义分区函数，把事件映射到分区键
+PartitionType = Callable[[Event], Hashable]
+
+
+def partition_by_type(event: Event):
+    """
+    Default partition key: all events of the same type are processed
+    in order by the same worker.
+    默认按事件类型分区
+    """
+    return event.type
+
+
+def partition_by_symbol(event: Event):
+    """
+    Partition key using vt_symbol of event data if available, so that
+    EVENT_TICK and EVENT_TICK + vt_symbol (and orders/trades) of one
+    symbol are kept in order by the same worker. Events without
+    vt_symbol fall back to their type.
+    按vt_symbol分区，没有vt_symbol的事件按类型分区
+    """
+    return getattr(event.data, "vt_symbol", event.type)
+
+
+class EventQueue:
+    """
+    FIFO queue with several priority lanes. Events in a lower lane are
+    got before events in higher lanes, events in the same lane keep
+    their put order. A waiting lane is served once it has been passed
+    over by burst gets, so higher lanes cannot starve it.
+    多优先级通道的事件队列，同一通道内先进先出，等待过久的通道优先处理
+    """
+
+    def __init__(self, lanes: int = 1, burst: int = 100):
+        """"""
+        self._lanes = [deque() for _ in range(lanes)]
+        self._burst = burst
+        self._waits = [0] * lanes
+        self._size = 0
+        self._closed = False
+        self._condition = Condition()
+
+    def put(self, event: Event, lane: int = 0):
+        """
+        Put an event into the specific lane.
+        """
+        with self._condition:
+            self._lanes[lane].append(event)
+            self._size += 1
+            self._condition.notify()
+
+    def get(self, block: bool = True, timeout: float = None):
+        """
+        Get the first event of the lane with highest priority.
+        Raise queue.Empty if no event is available.
+        """
+        with self._condition:
+            if not self._size:
+                if not block or self._closed:
+                    raise Empty
+                self._condition.wait(timeout)
+                if not self._size:
+                    raise Empty
+
+            self._size -= 1
+            return self._pop()
+
+    def get_many(self, count: int, timeout: float = None):
+        """
+        Wait until any event is available, then get up to count events
+        in priority order. Raise queue.Empty if no event is available.
+        """
+        with self._condition:
+            if not self._size:
+                if self._closed:
+                    raise Empty
+                self._condition.wait(timeout)
+                if not self._size:
+                    raise Empty
+
+            count = min(count, self._size)
+            events = [self._pop() for _ in range(count)]
+
+            self._size -= count
+            return events
+
+    def _pop(self):
+        """
+        Pop the first event of the lane with highest priority, unless a
+        lower lane has waited for burst gets.
+        """
+        if len(self._lanes) == 1:
+            return self._lanes[0].popleft()
+
+        waiting = [n for n, lane in enumerate(self._lanes) if lane]
+        chosen = waiting[0]
+        for n in waiting[1:]:
+            if self._waits[n] >= self._burst:
+                chosen = n
+                break
+
+        for n in waiting:
+            self._waits[n] += 1
+        self._waits[chosen] = 0
+
+        return self._lanes[chosen].popleft()
+
+    def close(self):
+        """
+        Wake up all waiting getters immediately. Getting from a closed
+        and empty queue raises queue.Empty without blocking.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def qsize(self):
+        """
+        Get total number of events waiting in queue.
+        """
+        return self._size
+
+    def depth(self):
+        """
+        Get number of events waiting in each lane.
+        """
+        return [len(lane) for lane in self._lanes]
+
+
+class ConflatedHandler:
+    """
+    Latest-value-wins mailbox in front of a slow handler.
+
+    Events are stored by key (vt_symbol by default) and delivered to the
+    handler on its own thread. If the handler cannot keep up, a newer
+    event replaces the pending one with the same key and the replaced
+    one is counted as skipped. Only the conflated handler is affected,
+    other handlers of the same event type still receive every event.
+    最新值优先的处理函数，消费者处理不过来时只收到每个key最新的事件
+    """
+
+    def __init__(self, handler: HandlerType, key: PartitionType):
+        """"""
+        self.handler = handler
+        self._key = key
+
+        # 等待处理的事件，key对应最新事件
+        self._pending = {}
+        # 被跳过的事件数量
+        self._skipped = defaultdict(int)
+        self.skipped = 0
+
+        self._condition = Condition()
+        self._active = False
+        self._thread = None
+
+        # 性能统计，由事件引擎设置，记录处理函数在自己线程中的耗时
+        self.stats = None
+        self.name = get_handler_name(handler)
+
+    def __call__(self, event: Event):
+        """
+        Store event into mailbox, called from event engine thread.
+        """
+        key = self._key(event)
+
+        with self._condition:
+            if key in self._pending:
+                self._skipped[key] += 1
+                self.skipped += 1
+            self._pending[key] = event
+            self._condition.notify()
+
+    def _run(self):
+        """
+        Deliver pending events to handler.
+        """
+        while True:
+            with self._condition:
+                while self._active and not self._pending:
+                    self._condition.wait()
+
+                if not self._active:
+                    break
+
+                key = next(iter(self._pending))
+                event = self._pending.pop(key)
+
+            stats = self.stats
+            if stats:
+                start = perf_counter()
+                self.handler(event)
+                stats.update_handler(self.name, perf_counter() - start)
+            else:
+                self.handler(event)
+
+    def start(self):
+        """"""
+        if self._active:
+            return
+
+        self._active = True
+        self._thread = Thread(target=self._run)
+        self._thread.start()
+
+    def stop(self):
+        """"""
+        if not self._active:
+            return
+
+        with self._condition:
+            self._active = False
+            self._condition.notify()
+        self._thread.join()
+
+    def get_skipped(self, key: Hashable = None):
+        """
+        Get number of skipped events of key, or of all keys if key is None.
+        获取被跳过的事件数量
+        """
+        if key is None:
+            return self.skipped
+        return self._skipped.get(key, 0)
+
+
+class ScheduledTimer:
+    """
+    One-shot or repeating callback scheduled in event engine.
+    事件引擎中的定时回调
+    """
+
+    def __init__(
+        self,
+        timer_id: int,
+        callback: Callable,
+        deadline: float,
+        interval: float,
+        dispatch: bool
+    ):
+        """"""
+        self.timer_id = timer_id
+        self.callback = callback
+        self.deadline = deadline
+        self.interval = interval
+        self.dispatch = dispatch
+        self.cancelled = False
+
 
 class EventEngine:
     """
@@ -43,37 +326,104 @@ class EventEngine:
     事件引擎
     """
 
-    def __init__(self, interval: int = 1):
+    def __init__(
+        self,
+        interval: int = 1,
+        workers: int = 1,
+        partition: PartitionType = partition_by_type,
+        priority: bool = False,
+        batch_size: int = 1000
+    ):
         """
         Timer event is generated every 1 second by default, if
         interval not specified.
         默认定时器事件1秒一次
+
+        By default all events are processed by one thread in the order
+        they are put. With workers > 1, each event is hashed by its
+        partition key onto one of the worker threads, each with its own
+        queue, so events with the same key are still processed in order.
+
+        Concurrency contract when workers > 1:
+            * handlers of events with the same partition key never run
+              concurrently and see events in put order.
+            * a handler registered for several types (or for a type whose
+              events have different keys, e.g. partition_by_symbol) may
+              be called from several workers at the same time, so it
+              must be thread-safe.
+            * general handlers are called from every worker and must
+              always be thread-safe.
+        workers > 1 时按分区键把事件分配到多个工作线程，同一分区内保持顺序
+
+        With priority enabled, events are put into priority lanes by their
+        type (see set_priority), so that trading events overtake market
+        data, market data overtakes logs and timer events come last.
+        Events in the same lane keep their order. A lane passed over by
+        100 gets is served next, so timer events still arrive under
+        sustained market data load.
+        priority为True时，交易事件优先于行情，行情优先于日志，定时器最后
+
+        Once any batch handler is registered, up to batch_size waiting
+        events are drained from queue at a time (see register_batch).
+
+        Timer events and callbacks added by schedule are driven by one
+        scheduler thread waiting for the nearest deadline, so both they
+        and stop() take effect without polling delay.
         """
         # 定时器事件的产生间隔，默认1秒
         self._interval = interval
-        # 队列
-        self._queue = Queue()
+        # 工作线程数量和分区函数
+        self._workers = max(workers, 1)
+        self._partition = partition
+        # 事件优先级，事件类型前缀对应的优先级通道
+        self._priority = priority
+        self._priorities = {EVENT_TIMER: PRIORITY_TIMER}
+        self._lane_cache = {}
+        # 队列，每个工作线程一个
+        lanes = PRIORITY_LANES if priority else 1
+        self._queues = [EventQueue(lanes) for _ in range(self._workers)]
+        self._queue = self._queues[0]
         # 下面两个线程的开关，一个是_thread， 另外一个是_timer
         self._active = False
         # 从队列获取事件，并且处理它。
-        self._thread = Thread(target=self._run)
-        # 休眠（interval）一秒
-        # 然后生成一个定时器事件
+        self._threads = [
+            Thread(target=self._run, args=(queue,)) for queue in self._queues
+        ]
+        self._thread = self._threads[0]
+        # 定时调度线程，按最近的截止时间等待，然后执行定时回调
+        # 定时器事件也是其中一个重复回调
         self._timer = Thread(target=self._run_timer)
+        self._timer_heap = []
+        self._timers = {}
+        self._timer_count = count(1)
+        self._timer_condition = Condition()
+        self.schedule(interval, self._put_timer_event, interval, False)
+        # 性能统计，默认关闭
+        self._stats = None
+        self._stats_timer = 0
         # 事件注册表
         self._handlers = defaultdict(list)
         self._general_handlers = []
         # 一个事件的数据结构 type 和 dict 类型的handlerList
+        # 批量处理函数注册表，以及一次最多取出的事件数量
+        self._batch_handlers = defaultdict(list)
+        self._batch_size = batch_size
+        # 最新值优先的处理函数，(type, handler)对应ConflatedHandler
+        self._conflated_handlers = {}
 
-    def _run(self):
+    def _run(self, queue: EventQueue):
         """
         Get event from queue and then process it.
         从队列获取事件，并且处理它。 事件引擎
         """
         while self._active:
             try:
-                event = self._queue.get(block=True, timeout=1)
-                self._process(event)
+                if self._batch_handlers:
+                    events = queue.get_many(self._batch_size)
+                    self._process_batch(events)
+                else:
+                    event = queue.get(block=True)
+                    self._process(event)
             except Empty:
                 pass
 
@@ -85,21 +435,136 @@ class EventEngine:
         to all types.
         根据事件类型和事件内容，调用相应的回调函数，来进行处理
         """
+        if event.type == EVENT_CALLBACK:
+            event.data()
+            return
+
         if event.type in self._handlers:
             [handler(event) for handler in self._handlers[event.type]]
 
         if self._general_handlers:
             [handler(event) for handler in self._general_handlers]
 
+    def _process_batch(self, events: List[Event]):
+        """
+        Process drained events one by one with normal handlers, then
+        call each batch handler once with all events of its type.
+        先逐个处理事件，再把同一类型的事件一次交给批量处理函数
+        """
+        batches = {}
+
+        for event in events:
+            self._process(event)
+
+            if event.type in self._batch_handlers:
+                batch = batches.get(event.type, None)
+                if batch is None:
+                    batch = batches[event.type] = []
+                batch.append(event)
+
+        for type, batch in batches.items():
+            for handler in self._batch_handlers.get(type, []):
+                if self._stats:
+                    start = perf_counter()
+                    handler(batch)
+                    self._stats.update_handler(
+                        get_handler_name(handler), perf_counter() - start
+                    )
+                else:
+                    handler(batch)
+
+    def _put_with_stats(self, event: Event):
+        """
+        Put event with enqueue time, used when stats is enabled.
+        """
+        event.put_time = perf_counter()
+        type(self).put(self, event)
+
+    def _process_with_stats(self, event: Event):
+        """
+        Process event and record latency and handler time, used when
+        stats is enabled.
+        """
+        stats = self._stats
+        start = perf_counter()
+
+        put_time = getattr(event, "put_time", None)
+        if put_time is not None:
+            stats.update_latency(event.type, start - put_time)
+
+        if event.type == EVENT_CALLBACK:
+            event.data()
+            stats.update_handler(
+                get_handler_name(event.data), perf_counter() - start
+            )
+            return
+
+        handlers = self._handlers.get(event.type, [])
+        for handler in handlers + self._general_handlers:
+            start = perf_counter()
+            handler(event)
+            stats.update_handler(
+                get_handler_name(handler), perf_counter() - start
+            )
+
+    def _put_stats_event(self):
+        """
+        Put stats event, which starts a new events per second window.
+        """
+        self.put(Event(EVENT_ENGINE_STATS, self._get_stats(True)))
+
     def _run_timer(self):
         """
-        Sleep by interval second(s) and then generate a timer event.
-        休眠（interval）一秒 然后生成一个定时器事件
+        Wait until the nearest deadline, then run due timer callbacks.
+        等待最近的截止时间，然后执行到期的定时回调
         """
-        while self._active:
-            sleep(self._interval)
-            event = Event(EVENT_TIMER)
-            self.put(event)
+        while True:
+            with self._timer_condition:
+                while self._active:
+                    if not self._timer_heap:
+                        self._timer_condition.wait()
+                        continue
+
+                    deadline, _, timer = self._timer_heap[0]
+                    remaining = deadline - monotonic()
+                    if remaining <= 0:
+                        break
+                    self._timer_condition.wait(remaining)
+
+                if not self._active:
+                    return
+
+                heappop(self._timer_heap)
+                if timer.cancelled:
+                    continue
+
+                if timer.interval:
+                    # Keep a fixed rate, but skip missed runs if late.
+                    timer.deadline = max(
+                        timer.deadline + timer.interval, monotonic()
+                    )
+                    self._push_timer(timer)
+                else:
+                    self._timers.pop(timer.timer_id, None)
+
+            if timer.dispatch:
+                self.put(Event(EVENT_CALLBACK, timer.callback))
+            else:
+                timer.callback()
+
+    def _push_timer(self, timer: ScheduledTimer):
+        """"""
+        heappush(
+            self._timer_heap,
+            (timer.deadline, next(self._timer_count), timer)
+        )
+
+    def _put_timer_event(self):
+        """
+        Generate a timer event every interval seconds.
+        生成一个定时器事件
+        """
+        self.put(Event(EVENT_TIMER))
 
     def start(self):
         """
@@ -107,7 +572,10 @@ class EventEngine:
         开始事件引擎，并产生定时器事件
         """
         self._active = True
-        self._thread.start()
+        for conflated_handler in self._conflated_handlers.values():
+            conflated_handler.start()
+        for thread in self._threads:
+            thread.start()
         self._timer.start()
 
     def stop(self):
@@ -115,15 +583,177 @@ class EventEngine:
         Stop event engine.
         关闭事件引擎
         """
-        self._active = False
+        with self._timer_condition:
+            self._active = False
+            self._timer_condition.notify()
         self._timer.join()
-        self._thread.join()
+
+        for queue in self._queues:
+            queue.close()
+        for thread in self._threads:
+            thread.join()
+        for conflated_handler in self._conflated_handlers.values():
+            conflated_handler.stop()
 
     def put(self, event: Event):
         """
         Put an event object into event queue.
+        多线程模式下，根据分区键放入对应工作线程的队列
+        """
+        if self._priority:
+            lane = self._lane_cache.get(event.type, None)
+            if lane is None:
+                lane = self._get_lane(event.type)
+        else:
+            lane = 0
+
+        if self._workers == 1:
+            self._queue.put(event, lane)
+        else:
+            key = self._partition(event)
+            self._queues[hash(key) % self._workers].put(event, lane)
+
+    def _get_lane(self, type: str):
+        """
+        Find priority lane of event type by the longest matching prefix
+        and cache it.
+        """
+        lane = PRIORITY_NORMAL
+        matched = ""
+
+        for prefix, prefix_lane in self._priorities.items():
+            if type.startswith(prefix) and len(prefix) > len(matched):
+                lane = prefix_lane
+                matched = prefix
+
+        self._lane_cache[type] = lane
+        return lane
+
+    def set_priority(self, prefix: str, lane: int):
+        """
+        Set priority lane for all event types starting with prefix.
+        Types without any matching prefix use PRIORITY_NORMAL.
+        设置事件类型前缀对应的优先级
+        """
+        self._priorities[prefix] = lane
+        self._lane_cache.clear()
+
+    def get_queue_depth(self):
+        """
+        Get number of events waiting in each priority lane.
+        获取每个优先级通道中等待处理的事件数量
+        """
+        depth = {lane: 0 for lane in range(len(self._queue.depth()))}
+        for queue in self._queues:
+            for lane, n in enumerate(queue.depth()):
+                depth[lane] += n
+        return depth
+
+    def schedule(
+        self,
+        delay: float,
+        callback: Callable,
+        interval: float = 0,
+        dispatch: bool = True
+    ):
         """
-        self._queue.put(event)
+        Call callback after delay seconds, and then every interval seconds
+        if interval is not 0. Sub-second delay and interval are supported.
+
+        With dispatch True the callback is run by the event processing
+        thread in order with other events, so it has the same threading
+        contract as event handlers. Otherwise it is run directly by the
+        scheduler thread, which must never be blocked.
+        添加定时回调，interval不为0时重复执行，返回定时器编号
+        """
+        timer_id = next(self._timer_count)
+        timer = ScheduledTimer(
+            timer_id, callback, monotonic() + delay, interval, dispatch
+        )
+
+        with self._timer_condition:
+            self._timers[timer_id] = timer
+            self._push_timer(timer)
+            self._timer_condition.notify()
+
+        return timer_id
+
+    def cancel(self, timer_id: int):
+        """
+        Cancel a scheduled callback.
+        取消定时回调
+        """
+        with self._timer_condition:
+            timer = self._timers.pop(timer_id, None)
+            if timer:
+                timer.cancelled = True
+
+    def enable_stats(self, interval: float = 0):
+        """
+        Start recording enqueue-to-dispatch latency of each event type,
+        wall time of each handler and events per second. If interval is
+        not 0, an EVENT_ENGINE_STATS event with get_stats() as data is
+        put every interval seconds.
+
+        Stats is off by default. When off, put and process are not
+        wrapped, so there is no extra cost.
+        开启性能统计，关闭时没有额外开销
+        """
+        if not self._stats:
+            self._stats = EventStats()
+            self.put = self._put_with_stats
+            self._process = self._process_with_stats
+
+            for conflated_handler in self._conflated_handlers.values():
+                conflated_handler.stats = self._stats
+
+        if self._stats_timer:
+            self.cancel(self._stats_timer)
+            self._stats_timer = 0
+
+        if interval:
+            self._stats_timer = self.schedule(
+                interval, self._put_stats_event, interval, False
+            )
+
+    def disable_stats(self):
+        """
+        Stop recording stats.
+        关闭性能统计
+        """
+        if self._stats_timer:
+            self.cancel(self._stats_timer)
+            self._stats_timer = 0
+
+        if self._stats:
+            del self.put
+            del self._process
+            self._stats = None
+
+            for conflated_handler in self._conflated_handlers.values():
+                conflated_handler.stats = None
+
+    def get_stats(self):
+        """
+        Get latency (seconds) of each event type, wall time (seconds) of
+        each handler as count/p50/p99/max, events per second since last
+        stats event (or since stats enabled), and current queue depth.
+        Handlers registered by register_conflated are timed on their own
+        threads under their own names.
+        获取性能统计数据
+        """
+        return self._get_stats(False)
+
+    def _get_stats(self, reset: bool):
+        """"""
+        if not self._stats:
+            return {}
+
+        stats = self._stats.get_summary(reset)
+        depth = self.get_queue_depth()
+        stats["queue_depth"] = sum(depth.values())
+        stats["lane_depth"] = depth
+        return stats
 
     def register(self, type: str, handler: HandlerType):
         """
@@ -146,6 +776,74 @@ class EventEngine:
         if not handler_list:
             self._handlers.pop(type)
 
+    def register_batch(self, type: str, handler: BatchHandlerType):
+        """
+        Register a handler receiving a list of events of the type.
+
+        Event engine drains all waiting events (up to batch_size) from
+        queue at a time, and calls the batch handler once with all events
+        of its type in put order, after the normal handlers of these
+        events are called.
+        注册批量处理函数，一次收到队列中同一类型的全部事件
+        """
+        handler_list = self._batch_handlers[type]
+        if handler not in handler_list:
+            handler_list.append(handler)
+
+    def unregister_batch(self, type: str, handler: BatchHandlerType):
+        """
+        Unregister an existing batch handler.
+        """
+        handler_list = self._batch_handlers[type]
+
+        if handler in handler_list:
+            handler_list.remove(handler)
+
+        if not handler_list:
+            self._batch_handlers.pop(type)
+
+    def register_conflated(
+        self,
+        type: str,
+        handler: HandlerType,
+        key: PartitionType = partition_by_symbol
+    ):
+        """
+        Register a slow handler which only needs the latest event of each
+        key, e.g. a tick consumer using EVENT_TICK or EVENT_TICK + vt_symbol.
+        The handler runs on its own thread, and stale events are dropped
+        if it falls behind. Never use it for order/trade events, which
+        must be processed without loss.
+        注册最新值优先的处理函数，只能用于行情等允许丢弃旧数据的事件
+
+        Return the ConflatedHandler, which can be used to query number of
+        skipped events.
+        """
+        conflated_handler = self._conflated_handlers.get((type, handler), None)
+        if conflated_handler:
+            return conflated_handler
+
+        conflated_handler = ConflatedHandler(handler, key)
+        conflated_handler.stats = self._stats
+        self._conflated_handlers[(type, handler)] = conflated_handler
+        self.register(type, conflated_handler)
+
+        if self._active:
+            conflated_handler.start()
+
+        return conflated_handler
+
+    def unregister_conflated(self, type: str, handler: HandlerType):
+        """
+        Unregister an existing conflated handler.
+        """
+        conflated_handler = self._conflated_handlers.pop((type, handler), None)
+        if not conflated_handler:
+            return
+
+        self.unregister(type, conflated_handler)
+        conflated_handler.stop()
+
     def register_general(self, handler: HandlerType):
         """
         Register a new handler function for all event types. Every 
@@ -0,0 +1,258 @@
+"""
+Multiprocess event engine using shared memory ring buffers.
+
+Processes are connected by single-producer single-consumer ring buffers
+created by name. The producing process forwards selected event types
+into a ring, and the consuming process reads them back into its own
+event engine, e.g.:
+
+    # gateway process
+    event_engine = ProcessEventEngine(codec=TraderEventCodec())
+    ring = SharedRingBuffer("vnpy_cta", 64 * 1024 * 1024, create=True)
+    event_engine.add_outbound(ring, [EVENT_TICK, EVENT_ORDER, EVENT_TRADE])
+
+    # strategy process
+    event_engine = ProcessEventEngine(codec=TraderEventCodec())
+    event_engine.add_inbound(SharedRingBuffer("vnpy_cta"))
+
+Use one ring for each consuming process. Requests such as send_order
+still need to go back through RpcService/RpcGateway. Shared memory
+requires Python 3.8+, it is only imported when a ring is created.
+基于共享内存环形缓冲区的多进程事件引擎
+"""
+
+import struct
+from threading import Thread
+from time import monotonic, sleep
+from typing import Sequence
+
+from .engine import EVENT_CALLBACK, EVENT_TIMER, Event, EventEngine, PickleCodec
+
+# capacity, write position, read position on separate cache lines
+CAPACITY = struct.Struct("Q")
+POSITION = struct.Struct("Q")
+WRITE_OFFSET = 64
+READ_OFFSET = 128
+HEADER_SIZE = 192
+
+LENGTH = struct.Struct("I")
+WRAP = 0xFFFFFFFF
+ALIGN = 8
+
+
+def _align(size: int):
+    """"""
+    return (size + ALIGN - 1) // ALIGN * ALIGN
+
+
+class SharedRingBuffer:
+    """
+    Single-producer single-consumer ring buffer of variable length
+    records in shared memory. Read and write positions are monotonic
+    byte counters, each written by one side only.
+    单生产者单消费者的共享内存环形缓冲区
+    """
+
+    def __init__(self, name: str, capacity: int = 0, create: bool = False):
+        """
+        Create a new ring buffer with capacity bytes, or attach to an
+        existing one by name.
+        """
+        from multiprocessing.shared_memory import SharedMemory
+
+        self.name = name
+        self._created = create
+
+        if create:
+            capacity = _align(capacity)
+            self._shm = SharedMemory(
+                name=name, create=True, size=HEADER_SIZE + capacity
+            )
+            CAPACITY.pack_into(self._shm.buf, 0, capacity)
+            POSITION.pack_into(self._shm.buf, WRITE_OFFSET, 0)
+            POSITION.pack_into(self._shm.buf, READ_OFFSET, 0)
+        else:
+            self._shm = SharedMemory(name=name)
+
+        self._buf = self._shm.buf
+        self._capacity = CAPACITY.unpack_from(self._buf, 0)[0]
+
+    def put(self, data: bytes):
+        """
+        Write a record. Return False if there is not enough free space.
+        """
+        buf = self._buf
+        capacity = self._capacity
+        size = _align(LENGTH.size + len(data))
+        if size > capacity:
+            raise ValueError(f"记录长度{len(data)}超过缓冲区容量{capacity}")
+
+        write = POSITION.unpack_from(buf, WRITE_OFFSET)[0]
+        read = POSITION.unpack_from(buf, READ_OFFSET)[0]
+
+        offset = write % capacity
+        tail = capacity - offset
+        needed = size if tail >= size else tail + size
+        if capacity - (write - read) < needed:
+            return False
+
+        # Record never wraps, skip the rest of buffer with a marker.
+        if tail < size:
+            LENGTH.pack_into(buf, HEADER_SIZE + offset, WRAP)
+            write += tail
+            offset = 0
+
+        start = HEADER_SIZE + offset
+        LENGTH.pack_into(buf, start, len(data))
+        buf[start + LENGTH.size:start + LENGTH.size + len(data)] = data
+
+        # Publish record after it is completely written.
+        POSITION.pack_into(buf, WRITE_OFFSET, write + size)
+        return True
+
+    def get(self):
+        """
+        Read a record. Return None if the ring buffer is empty.
+        """
+        buf = self._buf
+        capacity = self._capacity
+
+        write = POSITION.unpack_from(buf, WRITE_OFFSET)[0]
+        read = POSITION.unpack_from(buf, READ_OFFSET)[0]
+        if read == write:
+            return None
+
+        offset = read % capacity
+        length = LENGTH.unpack_from(buf, HEADER_SIZE + offset)[0]
+        if length == WRAP:
+            read += capacity - offset
+            offset = 0
+            length = LENGTH.unpack_from(buf, HEADER_SIZE)[0]
+
+        start = HEADER_SIZE + offset + LENGTH.size
+        data = bytes(buf[start:start + length])
+
+        POSITION.pack_into(
+            buf, READ_OFFSET, read + _align(LENGTH.size + length)
+        )
+        return data
+
+    def close(self):
+        """
+        Detach from shared memory, and remove it if created by this object.
+        """
+        self._buf = None
+        self._shm.close()
+        if self._created:
+            self._shm.unlink()
+
+
+class ProcessEventEngine(EventEngine):
+    """
+    Event engine which also forwards events to, and receives events from,
+    other processes through shared memory ring buffers. Events received
+    are processed like local events but never forwarded again.
+    多进程事件引擎，通过共享内存与其他进程交换事件
+    """
+
+    def __init__(self, interval: int = 1, codec=None, **kwargs):
+        """"""
+        super().__init__(interval, **kwargs)
+
+        self._codec = codec if codec else PickleCodec()
+        self._outbounds = []
+        self._inbounds = []
+        self._dropped = {}
+        self._reader = Thread(target=self._run_reader)
+
+    def add_outbound(
+        self,
+        ring: SharedRingBuffer,
+        types: Sequence[str],
+        timeout: float = 0.1
+    ):
+        """
+        Forward events whose type starts with any of types into ring.
+        EVENT_TIMER and internal EVENT_CALLBACK are never forwarded,
+        every process has its own timer. If the ring is full, put waits
+        up to timeout seconds for the consumer to catch up, then drops
+        the event for this ring and counts it in get_dropped, so a slow
+        consumer never stalls the engine.
+        """
+        types = tuple(types)
+        if not types or not all(types):
+            raise ValueError("转发事件类型不能为空")
+        self._outbounds.append((ring, types, timeout))
+        self._dropped[ring] = 0
+
+    def get_dropped(self, ring: SharedRingBuffer):
+        """
+        Get number of events dropped because ring was full.
+        """
+        return self._dropped.get(ring, 0)
+
+    def add_inbound(self, ring: SharedRingBuffer):
+        """
+        Receive events from ring.
+        """
+        self._inbounds.append(ring)
+
+    def put(self, event: Event):
+        """
+        Put event into local queue and forward it to other processes.
+        """
+        super().put(event)
+
+        if event.type == EVENT_TIMER or event.type == EVENT_CALLBACK:
+            return
+
+        data = None
+        for ring, types, timeout in self._outbounds:
+            if not event.type.startswith(types):
+                continue
+
+            if data is None:
+                data = self._codec.encode(event)
+
+            if ring.put(data):
+                continue
+
+            deadline = monotonic() + timeout
+            while not ring.put(data):
+                if not self._active or monotonic() >= deadline:
+                    self._dropped[ring] += 1
+                    break
+                sleep(0.0001)
+
+    def _run_reader(self):
+        """
+        Poll inbound rings and put events into local queue, backing off
+        up to 1 millisecond while there is no data.
+        """
+        idle = 0
+
+        while self._active:
+            received = False
+
+            for ring in self._inbounds:
+                data = ring.get()
+                while data is not None:
+                    received = True
+                    EventEngine.put(self, self._codec.decode(data))
+                    data = ring.get()
+
+            if received:
+                idle = 0
+            else:
+                idle = min(idle + 1, 10)
+                sleep(idle * 0.0001)
+
+    def start(self):
+        """"""
+        super().start()
+        self._reader.start()
+
+    def stop(self):
+        """"""
+        super().stop()
+        self._reader.join()
@@ -0,0 +1,126 @@
+"""
+Statistics of event engine for finding slow handlers.
+事件引擎的性能统计
+"""
+
+from collections import defaultdict, deque
+from threading import Lock
+from time import monotonic
+
+# 事件引擎统计数据事件
+EVENT_ENGINE_STATS = "eEngineStats"
+
+
+class LatencyStats:
+    """
+    Count, maximum and percentiles of recent samples of a duration
+    in seconds.
+    """
+
+    def __init__(self, size: int = 1000):
+        """"""
+        self.samples = deque(maxlen=size)
+        self.count = 0
+        self.max = 0.0
+
+    def update(self, value: float):
+        """"""
+        self.samples.append(value)
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def get_summary(self):
+        """
+        Get count, p50, p99 and max of samples.
+        """
+        samples = sorted(self.samples)
+        if not samples:
+            return {"count": 0, "p50": 0, "p99": 0, "max": 0}
+
+        n = len(samples) - 1
+        return {
+            "count": self.count,
+            "p50": samples[int(n * 0.5)],
+            "p99": samples[int(n * 0.99)],
+            "max": self.max,
+        }
+
+
+class EventStats:
+    """
+    Collects enqueue-to-dispatch latency of each event type, wall time
+    of each handler and number of events processed.
+    收集事件排队延迟、处理函数耗时和事件处理数量
+    """
+
+    def __init__(self):
+        """"""
+        self._lock = Lock()
+        self.latency = defaultdict(LatencyStats)
+        self.handler_time = defaultdict(LatencyStats)
+
+        self.count = 0
+        self._last_count = 0
+        self._last_time = monotonic()
+
+    def update_latency(self, type: str, value: float):
+        """"""
+        with self._lock:
+            self.latency[type].update(value)
+            self.count += 1
+
+    def update_handler(self, name: str, value: float):
+        """"""
+        with self._lock:
+            self.handler_time[name].update(value)
+
+    def get_summary(self, reset: bool = False):
+        """
+        Get summary of all statistics. Events per second is calculated
+        since the last reset (or since created), and reset starts a new
+        window for the next call.
+        """
+        with self._lock:
+            now = monotonic()
+            elapsed = now - self._last_time
+            if elapsed > 0:
+                rate = (self.count - self._last_count) / elapsed
+            else:
+                rate = 0
+
+            if reset:
+                self._last_count = self.count
+                self._last_time = now
+
+            return {
+                "count": self.count,
+                "events_per_second": rate,
+                "latency": {
+                    type: stats.get_summary()
+                    for type, stats in self.latency.items()
+                },
+                "handlers": {
+                    name: stats.get_summary()
+                    for name, stats in self.handler_time.items()
+                },
+            }
+
+
+def get_handler_name(handler):
+    """
+    Get readable name of handler function or bound method. Wrappers
+    such as ConflatedHandler are named by the handler they wrap.
+    """
+    name = getattr(handler, "__qualname__", None)
+    if not name:
+        wrapped = getattr(handler, "handler", None)
+        if wrapped is not None:
+            wrapper_name = type(handler).__name__
+            return f"{get_handler_name(wrapped)} ({wrapper_name})"
+        name = type(handler).__qualname__
+
+    module = getattr(handler, "__module__", "")
+    if module:
+        return f"{module}.{name}"
+    return name
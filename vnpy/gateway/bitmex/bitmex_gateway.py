@@ -26,6 +26,7 @@ from vnpy.trader.constant import (
     Interval
 )
 from vnpy.trader.gateway import BaseGateway
+from vnpy.trader.timestamp import parse_iso
 from vnpy.trader.object import (
     TickData,
     OrderData,
@@ -344,8 +345,7 @@ class BitmexRestApi(RestClient):
                     break
 
                 for d in data:
-                    dt = datetime.strptime(
-                        d["timestamp"], "%Y-%m-%dT%H:%M:%S.%fZ")
+                    dt = parse_iso(d["timestamp"])
                     bar = BarData(
                         symbol=req.symbol,
                         exchange=req.exchange,
@@ -621,8 +621,7 @@ class BitmexWebsocketApi(WebsocketClient):
             tick.__setattr__("ask_price_%s" % (n + 1), price)
             tick.__setattr__("ask_volume_%s" % (n + 1), volume)
 
-        tick.datetime = datetime.strptime(
-            d["timestamp"], "%Y-%m-%dT%H:%M:%S.%fZ")
+        tick.datetime = parse_iso(d["timestamp"])
         # self.gateway.on_tick(copy(tick))
 
     def on_trade(self, d):
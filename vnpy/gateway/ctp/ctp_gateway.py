@@ -47,6 +47,7 @@ from vnpy.trader.constant import (
     OptionType
 )
 from vnpy.trader.gateway import BaseGateway
+from vnpy.trader.timestamp import parse_compact
 from vnpy.trader.object import (
     TickData,
     OrderData,
@@ -289,7 +290,7 @@ class CtpMdApi(MdApi):
         tick = TickData(
             symbol=symbol,
             exchange=exchange,
-            datetime=datetime.strptime(timestamp, "%Y%m%d %H:%M:%S.%f"),
+            datetime=parse_compact(timestamp),
             name=symbol_name_map[symbol],
             volume=data["Volume"],
             last_price=data["LastPrice"],
@@ -43,6 +43,7 @@ from vnpy.trader.constant import (
 )
 from vnpy.trader.event import EVENT_TIMER
 from vnpy.trader.gateway import BaseGateway
+from vnpy.trader.timestamp import parse_compact
 from vnpy.trader.object import (
     AccountData,
     CancelRequest,
@@ -279,7 +280,7 @@ class FemasMdApi(MdApi):
         tick = TickData(
             symbol=symbol,
             exchange=exchange,
-            datetime=datetime.strptime(timestamp, "%Y%m%d %H:%M:%S.%f"),
+            datetime=parse_compact(timestamp),
             name=symbol_name_map[symbol],
             volume=data["Volume"],
             last_price=data["LastPrice"],
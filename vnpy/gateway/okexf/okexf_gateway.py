@@ -30,6 +30,7 @@ from vnpy.trader.constant import (
     Interval
 )
 from vnpy.trader.gateway import BaseGateway
+from vnpy.trader.timestamp import parse_iso
 from vnpy.trader.object import (
     TickData,
     OrderData,
@@ -987,7 +988,8 @@ def get_timestamp():
     return timestamp + "Z"
 
 
+CHINA_OFFSET = timedelta(hours=8)
+
+
 def utc_to_local(timestamp):
-    time = datetime.strptime(timestamp, "%Y-%m-%dT%H:%M:%S.%fZ") 
-    utc_time = time + timedelta(hours=8)
-    return utc_time
+    return parse_iso(timestamp, CHINA_OFFSET)
@@ -0,0 +1,157 @@
+"""
+Compact binary encoding of trading events for ProcessEventEngine.
+交易事件的二进制编码，用于多进程事件引擎
+"""
+
+import struct
+from dataclasses import fields
+from datetime import datetime, timedelta
+from enum import Enum
+
+from vnpy.event import Event, PickleCodec
+
+from .object import TickData, OrderData, TradeData
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+STRING_LENGTH = struct.Struct("<H")
+INTEGER = struct.Struct("<q")
+
+# 数据类型标记，0表示使用pickle
+KIND_PICKLE = 0
+
+
+class DataCodec:
+    """
+    Encode dataclass object into bytes by its field annotations: float
+    fields are packed together as doubles, str and Enum fields as utf-8
+    strings, naive datetime fields as microseconds since epoch.
+    根据字段类型把dataclass对象编码成二进制
+    """
+
+    def __init__(self, data_class: type):
+        """"""
+        self.data_class = data_class
+
+        self.float_names = []
+        self.other_fields = []
+        for field in fields(data_class):
+            if field.type is float:
+                self.float_names.append(field.name)
+            else:
+                self.other_fields.append((field.name, field.type))
+
+        self.float_struct = struct.Struct(f"<{len(self.float_names)}d")
+
+    def encode(self, data: object):
+        """
+        Raise TypeError if any field cannot be encoded.
+        """
+        parts = [
+            self.float_struct.pack(
+                *[getattr(data, name) for name in self.float_names]
+            )
+        ]
+
+        for name, field_type in self.other_fields:
+            value = getattr(data, name)
+
+            if field_type is datetime:
+                if value is None or value.tzinfo is not None:
+                    raise TypeError(f"无法编码的时间：{value}")
+                parts.append(INTEGER.pack((value - EPOCH) // MICROSECOND))
+                continue
+
+            if isinstance(value, Enum):
+                value = value.value
+            elif not isinstance(value, str):
+                raise TypeError(f"无法编码的字段：{name}={value}")
+
+            text = value.encode("utf-8")
+            parts.append(STRING_LENGTH.pack(len(text)))
+            parts.append(text)
+
+        return b"".join(parts)
+
+    def decode(self, data: bytes, offset: int = 0):
+        """"""
+        kwargs = dict(zip(
+            self.float_names,
+            self.float_struct.unpack_from(data, offset)
+        ))
+        offset += self.float_struct.size
+
+        for name, field_type in self.other_fields:
+            if field_type is datetime:
+                value = INTEGER.unpack_from(data, offset)[0]
+                kwargs[name] = EPOCH + value * MICROSECOND
+                offset += INTEGER.size
+                continue
+
+            length = STRING_LENGTH.unpack_from(data, offset)[0]
+            offset += STRING_LENGTH.size
+            value = data[offset:offset + length].decode("utf-8")
+            offset += length
+
+            if issubclass(field_type, Enum):
+                try:
+                    value = field_type(value)
+                except ValueError:
+                    pass
+            kwargs[name] = value
+
+        return self.data_class(**kwargs)
+
+
+class TraderEventCodec(PickleCodec):
+    """
+    Encode TickData/OrderData/TradeData events with DataCodec, and any
+    other event with pickle.
+    """
+
+    data_classes = [TickData, OrderData, TradeData]
+
+    def __init__(self):
+        """"""
+        self.codecs = {}
+        self.kinds = {}
+
+        for n, data_class in enumerate(self.data_classes):
+            kind = n + 1
+            self.codecs[kind] = DataCodec(data_class)
+            self.kinds[data_class] = kind
+
+    def encode(self, event: Event):
+        """"""
+        kind = self.kinds.get(type(event.data), KIND_PICKLE)
+
+        if kind != KIND_PICKLE:
+            try:
+                body = self.codecs[kind].encode(event.data)
+            except TypeError:
+                kind = KIND_PICKLE
+
+        if kind == KIND_PICKLE:
+            return bytes([KIND_PICKLE]) + super().encode(event)
+
+        text = event.type.encode("utf-8")
+        return b"".join([
+            bytes([kind]),
+            STRING_LENGTH.pack(len(text)),
+            text,
+            body
+        ])
+
+    def decode(self, data: bytes):
+        """"""
+        kind = data[0]
+        if kind == KIND_PICKLE:
+            return super().decode(data[1:])
+
+        length = STRING_LENGTH.unpack_from(data, 1)[0]
+        offset = 1 + STRING_LENGTH.size
+        type = data[offset:offset + length].decode("utf-8")
+
+        event_data = self.codecs[kind].decode(data, offset + length)
+        return Event(type, event_data)
@@ -0,0 +1,254 @@
+"""
+Struct-of-arrays containers for bulk storage of TickData/BarData.
+
+Each float field is kept in a numpy column, datetime in a datetime64
+column, and str/Enum fields as integer codes into a shared table of
+values, so a tick costs a few hundred bytes instead of a dataclass
+object with its own __dict__. Rows are read through light-weight views
+which have the same attribute API as the data objects.
+列式存储TickData/BarData，节省内存和对象创建
+"""
+
+from dataclasses import MISSING, fields
+from datetime import datetime
+from typing import Iterable
+
+import numpy as np
+
+from .object import BarData, TickData
+from .symbol import get_vt_symbol
+
+
+class DataView:
+    """
+    Read-only view of one row in DataBuffer, with the same attributes
+    as the data object.
+    """
+
+    __slots__ = ("_buffer", "_index")
+
+    def __init__(self, buffer: "DataBuffer", index: int):
+        """"""
+        self._buffer = buffer
+        self._index = index
+
+    def __getattr__(self, name: str):
+        """"""
+        return self._buffer.get_value(name, self._index)
+
+    def __repr__(self):
+        """"""
+        return f"{self.__class__.__name__}({self._buffer.data_class.__name__}, {self._index})"
+
+    def to_data(self):
+        """
+        Create a normal data object of this row.
+        """
+        return self._buffer.to_data(self._index)
+
+
+class DataBuffer:
+    """
+    Growable struct-of-arrays container of a dataclass.
+    """
+
+    data_class = None
+
+    def __init__(self, capacity: int = 1024):
+        """"""
+        self.float_names = []
+        self.datetime_names = []
+        self.code_names = []
+
+        for field in fields(self.data_class):
+            if field.type is float:
+                self.float_names.append(field.name)
+            elif field.type is datetime:
+                self.datetime_names.append(field.name)
+            else:
+                self.code_names.append(field.name)
+
+        self.size = 0
+        self.capacity = max(capacity, 1)
+
+        self.columns = {}
+        for name in self.float_names:
+            self.columns[name] = np.zeros(self.capacity)
+        for name in self.datetime_names:
+            self.columns[name] = np.zeros(self.capacity, dtype="datetime64[us]")
+        for name in self.code_names:
+            self.columns[name] = np.zeros(self.capacity, dtype=np.int32)
+
+        # str/Enum值表，值对应编号
+        self.values = []
+        self.codes = {}
+
+    @classmethod
+    def from_columns(cls, columns: dict, **values):
+        """
+        Create buffer from numpy arrays of float/datetime fields, without
+        creating data objects. str/Enum fields are given as keyword with
+        one value for all rows, others use default value of field.
+        """
+        size = len(columns["datetime"])
+        buffer = cls(size)
+
+        for name, column in columns.items():
+            buffer.columns[name][:size] = column
+
+        for field in fields(cls.data_class):
+            if field.name not in buffer.code_names:
+                continue
+
+            default = None if field.default is MISSING else field.default
+            value = values.get(field.name, default)
+            buffer.columns[field.name][:size] = buffer._get_code(value)
+
+        buffer.size = size
+        return buffer
+
+    def __len__(self):
+        """"""
+        return self.size
+
+    def __getitem__(self, index: int):
+        """"""
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError(index)
+        return DataView(self, index)
+
+    def __iter__(self):
+        """"""
+        for index in range(self.size):
+            yield DataView(self, index)
+
+    def __getattr__(self, name: str):
+        """
+        Get column of a float/datetime field as numpy array of current size.
+        """
+        columns = self.__dict__.get("columns", {})
+        if name in columns and name not in self.code_names:
+            return columns[name][:self.size]
+        raise AttributeError(name)
+
+    def _get_code(self, value):
+        """"""
+        code = self.codes.get(value, None)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self.codes[value] = code
+        return code
+
+    def _grow(self):
+        """"""
+        self.capacity *= 2
+        for name, column in self.columns.items():
+            new_column = np.zeros(self.capacity, dtype=column.dtype)
+            new_column[:self.size] = column[:self.size]
+            self.columns[name] = new_column
+
+    def append(self, data: object):
+        """
+        Append a data object to the end of buffer.
+        """
+        if self.size == self.capacity:
+            self._grow()
+
+        index = self.size
+        columns = self.columns
+
+        for name in self.float_names:
+            columns[name][index] = getattr(data, name)
+        for name in self.datetime_names:
+            value = getattr(data, name)
+            if value is not None:
+                value = value.replace(tzinfo=None)
+            columns[name][index] = value
+        for name in self.code_names:
+            columns[name][index] = self._get_code(getattr(data, name))
+
+        self.size += 1
+
+    def extend(self, data_list: Iterable):
+        """"""
+        for data in data_list:
+            self.append(data)
+
+    def iter_data(self, reuse: bool = False, chunk_size: int = 10000):
+        """
+        Iterate rows as data objects, which are created lazily chunk by
+        chunk so memory does not grow with number of rows. With reuse, a
+        single object is updated in place for every row, so the caller
+        must not keep references to it.
+        """
+        names = [field.name for field in fields(self.data_class)]
+        data = None
+
+        for start in range(0, self.size, chunk_size):
+            end = min(start + chunk_size, self.size)
+
+            chunk = {}
+            for name in self.float_names:
+                chunk[name] = self.columns[name][start:end].tolist()
+            for name in self.datetime_names:
+                chunk[name] = self.columns[name][start:end].tolist()
+            for name in self.code_names:
+                values = self.values
+                chunk[name] = [values[code] for code in self.columns[name][start:end].tolist()]
+
+            for row in zip(*[chunk[name] for name in names]):
+                if reuse and data:
+                    data.__dict__.update(zip(names, row))
+                    data.__post_init__()
+                else:
+                    data = self.data_class(*row)
+                yield data
+
+    def get_value(self, name: str, index: int):
+        """
+        Get value of field in a row.
+        """
+        if name == "vt_symbol":
+            return get_vt_symbol(
+                self.get_value("symbol", index),
+                self.get_value("exchange", index)
+            )
+
+        column = self.columns.get(name, None)
+        if column is None:
+            raise AttributeError(name)
+
+        if name in self.code_names:
+            return self.values[column[index]]
+        if name in self.datetime_names:
+            return column[index].item()
+        return float(column[index])
+
+    def to_data(self, index: int):
+        """
+        Create a normal data object of a row.
+        """
+        kwargs = {
+            field.name: self.get_value(field.name, index)
+            for field in fields(self.data_class)
+        }
+        return self.data_class(**kwargs)
+
+
+class TickBuffer(DataBuffer):
+    """
+    Struct-of-arrays container of TickData.
+    """
+
+    data_class = TickData
+
+
+class BarBuffer(DataBuffer):
+    """
+    Struct-of-arrays container of BarData.
+    """
+
+    data_class = BarData
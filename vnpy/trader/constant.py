@@ -139,3 +139,13 @@ class Interval(Enum):
     HOUR = "1h"
     DAILY = "d"
     WEEKLY = "w"
+
+
+class BarType(Enum):
+    """
+    Activity which closes a bar in ThresholdBarGenerator.
+    """
+    TICK = "tick"
+    VOLUME = "volume"
+    # 成交额（计价货币）
+    TURNOVER = "turnover"
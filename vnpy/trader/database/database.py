@@ -1,7 +1,11 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
 from enum import Enum
-from typing import Optional, Sequence, TYPE_CHECKING
+from typing import Iterable, Optional, Sequence, TYPE_CHECKING
+
+import numpy as np
+
+from vnpy.trader.columnar import BarBuffer, TickBuffer
 
 if TYPE_CHECKING:
     from vnpy.trader.constant import Interval, Exchange  # noqa
@@ -18,6 +22,42 @@ class Driver(Enum):
     MONGODB = "mongodb"
 
 
+def load_columns(rows: Iterable[tuple], names: Sequence[str], chunk_size: int = 100000):
+    """
+    Collect rows of values into numpy columns chunk by chunk, so only
+    chunk_size rows exist as Python objects at the same time. Null float
+    values are stored as NaN, so missing data is not taken as 0.
+    """
+    chunks = {name: [] for name in names}
+    buf = []
+
+    def flush():
+        for name, values in zip(names, zip(*buf)):
+            if name == "datetime":
+                column = np.array(values, dtype="datetime64[us]")
+            else:
+                column = np.array(values, dtype=float)
+            chunks[name].append(column)
+        buf.clear()
+
+    for row in rows:
+        buf.append(row)
+        if len(buf) == chunk_size:
+            flush()
+    if buf:
+        flush()
+
+    columns = {}
+    for name in names:
+        if chunks[name]:
+            columns[name] = np.concatenate(chunks[name])
+        elif name == "datetime":
+            columns[name] = np.array([], dtype="datetime64[us]")
+        else:
+            columns[name] = np.array([], dtype=float)
+    return columns
+
+
 class BaseDatabaseManager(ABC):
     """
         数据库基类
@@ -44,6 +84,37 @@ class BaseDatabaseManager(ABC):
     ) -> Sequence["TickData"]:
         pass
 
+    def load_bar_buffer(
+        self,
+        symbol: str,
+        exchange: "Exchange",
+        interval: "Interval",
+        start: datetime,
+        end: datetime
+    ) -> BarBuffer:
+        """
+        Load bar data into columnar BarBuffer. Drivers override this to
+        fill columns without creating BarData objects.
+        """
+        buffer = BarBuffer()
+        buffer.extend(self.load_bar_data(symbol, exchange, interval, start, end))
+        return buffer
+
+    def load_tick_buffer(
+        self,
+        symbol: str,
+        exchange: "Exchange",
+        start: datetime,
+        end: datetime
+    ) -> TickBuffer:
+        """
+        Load tick data into columnar TickBuffer. Drivers override this to
+        fill columns without creating TickData objects.
+        """
+        buffer = TickBuffer()
+        buffer.extend(self.load_tick_data(symbol, exchange, start, end))
+        return buffer
+
     @abstractmethod
     def save_bar_data(
         self,
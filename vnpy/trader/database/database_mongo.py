@@ -5,8 +5,9 @@ from typing import Sequence, Optional
 from mongoengine import DateTimeField, Document, FloatField, StringField, connect
 
 from vnpy.trader.constant import Exchange, Interval
+from vnpy.trader.columnar import BarBuffer, TickBuffer
 from vnpy.trader.object import BarData, TickData
-from .database import BaseDatabaseManager, Driver
+from .database import BaseDatabaseManager, Driver, load_columns
 
 
 def init(_: Driver, settings: dict):
@@ -298,6 +299,66 @@ class MongoManager(BaseDatabaseManager):
             for k, v in d.__dict__.items()
         }
 
+    def load_bar_buffer(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+    ) -> BarBuffer:
+        """
+        Load raw documents of bar data directly into BarBuffer.
+        """
+        names = [
+            "datetime", "volume", "open_interest",
+            "open_price", "high_price", "low_price", "close_price"
+        ]
+        s = DbBarData.objects(
+            symbol=symbol,
+            exchange=exchange.value,
+            interval=interval.value,
+            datetime__gte=start,
+            datetime__lte=end,
+        ).order_by("+datetime").only(*names).as_pymongo()
+
+        rows = (tuple(d.get(name) for name in names) for d in s)
+        return BarBuffer.from_columns(
+            load_columns(rows, names),
+            symbol=symbol,
+            exchange=exchange,
+            interval=interval,
+            gateway_name="DB"
+        )
+
+    def load_tick_buffer(
+        self, symbol: str, exchange: Exchange, start: datetime, end: datetime
+    ) -> TickBuffer:
+        """
+        Load raw documents of tick data directly into TickBuffer.
+        """
+        names = ["datetime"] + [
+            name for name in TickBuffer().float_names
+            if name in DbTickData._fields
+        ]
+        query = DbTickData.objects(
+            symbol=symbol,
+            exchange=exchange.value,
+            datetime__gte=start,
+            datetime__lte=end,
+        )
+        s = query.order_by("+datetime").only(*names).as_pymongo()
+
+        rows = (tuple(d.get(name) for name in names) for d in s)
+        first = query.only("name").first()
+        return TickBuffer.from_columns(
+            load_columns(rows, names),
+            symbol=symbol,
+            exchange=exchange,
+            name=first.name if first else "",
+            gateway_name="DB"
+        )
+
     def save_bar_data(self, datas: Sequence[BarData]):
         for d in datas:
             updates = self.to_update_param(d)
@@ -20,9 +20,15 @@ from peewee import (
 
 from vnpy.trader.constant import Exchange, Interval
 
+from vnpy.trader.columnar import BarBuffer, TickBuffer
 from vnpy.trader.object import BarData, TickData
 from vnpy.trader.utility import get_file_path, TimeUtils
-from .database import BaseDatabaseManager, Driver
+from .database import BaseDatabaseManager, Driver, load_columns
+
+BAR_COLUMNS = [
+    "datetime", "volume", "open_interest",
+    "open_price", "high_price", "low_price", "close_price"
+]
 
 
 def init(driver: Driver, settings: dict):
@@ -404,6 +410,78 @@ class SqlManager(BaseDatabaseManager):
         data = [db_tick.to_tick() for db_tick in s]
         return data
 
+    def load_bar_buffer(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+    ) -> BarBuffer:
+        """
+        Load bar data as tuples of columns directly into BarBuffer.
+        """
+        s = (
+            self.class_bar.select(
+                *[getattr(self.class_bar, name) for name in BAR_COLUMNS]
+            )
+            .where(
+                (self.class_bar.symbol == symbol)
+                & (self.class_bar.exchange == exchange.value)
+                & (self.class_bar.interval == interval.value)
+                & (self.class_bar.datetime >= start)
+                & (self.class_bar.datetime <= end)
+            )
+            .order_by(self.class_bar.datetime)
+            .tuples()
+        )
+
+        columns = load_columns(s.iterator(), BAR_COLUMNS)
+        return BarBuffer.from_columns(
+            columns,
+            symbol=symbol,
+            exchange=exchange,
+            interval=interval,
+            gateway_name="DB"
+        )
+
+    def load_tick_buffer(
+        self, symbol: str, exchange: Exchange, start: datetime, end: datetime
+    ) -> TickBuffer:
+        """
+        Load tick data as tuples of columns directly into TickBuffer.
+        """
+        names = ["datetime"] + [
+            name for name in TickBuffer().float_names
+            if hasattr(self.class_tick, name)
+        ]
+
+        query = (
+            self.class_tick.select()
+            .where(
+                (self.class_tick.symbol == symbol)
+                & (self.class_tick.exchange == exchange.value)
+                & (self.class_tick.datetime >= start)
+                & (self.class_tick.datetime <= end)
+            )
+        )
+
+        s = (
+            query.select(*[getattr(self.class_tick, name) for name in names])
+            .order_by(self.class_tick.datetime)
+            .tuples()
+        )
+        columns = load_columns(s.iterator(), names)
+
+        first = query.select(self.class_tick.name).first()
+        return TickBuffer.from_columns(
+            columns,
+            symbol=symbol,
+            exchange=exchange,
+            name=first.name if first else "",
+            gateway_name="DB"
+        )
+
     def save_bar_data(self, datas: Sequence[BarData]):
         ds = [self.class_bar.from_bar(i) for i in datas]
         self.class_bar.save_all(ds)
@@ -25,7 +25,8 @@ from .event import (
     EVENT_POSITION,
     EVENT_ACCOUNT,
     EVENT_CONTRACT,
-    EVENT_LOG
+    EVENT_LOG,
+    EVENT_PRIORITIES
 )
 from .gateway import BaseGateway
 from .object import (
@@ -53,6 +54,9 @@ class MainEngine:
         else:
             # 如果为None，创建一个EventEngine
             self.event_engine = EventEngine()
+        # 设置交易事件的优先级，只在EventEngine开启priority时生效
+        for prefix, lane in EVENT_PRIORITIES.items():
+            self.event_engine.set_priority(prefix, lane)
         # 开始事件引擎，并产生定时器事件
         self.event_engine.start()
         # 保存交易通道
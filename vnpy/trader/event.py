@@ -3,7 +3,13 @@ Event type string used in VN Trader.
 事件字符串
 """
 
-from vnpy.event import EVENT_TIMER  # noqa
+from vnpy.event import (  # noqa
+    EVENT_TIMER,
+    PRIORITY_TRADING,
+    PRIORITY_MARKET,
+    PRIORITY_NORMAL,
+    PRIORITY_LOG
+)
 
 # websocket   tick数据存入数据库事件
 EVENT_TICK = "eTick."
@@ -22,3 +28,14 @@ EVENT_CONTRACT = "eContract."
 
 # 日志事件
 EVENT_LOG = "eLog"
+
+# 事件优先级，EventEngine开启priority时使用
+EVENT_PRIORITIES = {
+    EVENT_TRADE: PRIORITY_TRADING,
+    EVENT_ORDER: PRIORITY_TRADING,
+    EVENT_POSITION: PRIORITY_TRADING,
+    EVENT_ACCOUNT: PRIORITY_TRADING,
+    EVENT_TICK: PRIORITY_MARKET,
+    EVENT_CONTRACT: PRIORITY_NORMAL,
+    EVENT_LOG: PRIORITY_LOG,
+}
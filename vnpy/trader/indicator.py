@@ -0,0 +1,530 @@
+"""
+Incremental (streaming) technical indicators.
+
+Each indicator is updated with one bar in O(1) (CCI needs O(n) for its
+mean deviation) and keeps its latest value in the value attribute.
+Seeding follows talib, so values are the same as talib calculated over
+the whole history. ArrayManager calculates talib over its last size
+bars only, so Wilder/EMA smoothed indicators differ from its results
+by the truncated warm-up, which becomes negligible for size >> n.
+增量计算的技术指标，每根bar以O(1)更新
+"""
+
+from abc import ABC, abstractmethod
+from collections import deque
+from math import nan, sqrt
+
+from .object import BarData
+
+
+class Indicator(ABC):
+    """
+    Base class of incremental indicators.
+    """
+
+    def __init__(self):
+        """"""
+        self.count = 0
+        self.value = nan
+
+    @property
+    def inited(self):
+        """
+        Whether value is available.
+        """
+        return self.value == self.value
+
+    def update_bar(self, bar: BarData):
+        """
+        Update new bar data into indicator.
+        """
+        return self.update(
+            bar.open_price,
+            bar.high_price,
+            bar.low_price,
+            bar.close_price,
+            bar.volume
+        )
+
+    @abstractmethod
+    def update(
+        self,
+        open_price: float,
+        high_price: float,
+        low_price: float,
+        close_price: float,
+        volume: float
+    ):
+        """
+        Update new bar prices and return the latest value.
+        """
+        pass
+
+
+class Sma:
+    """
+    Simple moving average of a series by running sum.
+    """
+
+    def __init__(self, n: int):
+        """"""
+        self.n = n
+        self.values = deque()
+        self.total = 0.0
+        self.value = nan
+
+    def update(self, value: float):
+        """"""
+        self.values.append(value)
+        self.total += value
+
+        if len(self.values) > self.n:
+            self.total -= self.values.popleft()
+
+        if len(self.values) == self.n:
+            self.value = self.total / self.n
+        return self.value
+
+
+class Ema:
+    """
+    Exponential moving average of a series, seeded by the simple
+    average of the first n values like talib.
+    """
+
+    def __init__(self, n: int, k: float = 0):
+        """"""
+        self.n = n
+        self.k = k if k else 2 / (n + 1)
+        self.count = 0
+        self.total = 0.0
+        self.value = nan
+
+    def update(self, value: float):
+        """"""
+        self.count += 1
+
+        if self.count < self.n:
+            self.total += value
+        elif self.count == self.n:
+            self.value = (self.total + value) / self.n
+        else:
+            self.value += (value - self.value) * self.k
+        return self.value
+
+
+class Wilder(Ema):
+    """
+    Wilder smoothing (EMA with k = 1 / n) seeded by simple average.
+    """
+
+    def __init__(self, n: int):
+        """"""
+        super().__init__(n, 1 / n)
+
+
+class SmaIndicator(Indicator):
+    """
+    Simple moving average of close price.
+    """
+
+    def __init__(self, n: int):
+        """"""
+        super().__init__()
+        self.sma = Sma(n)
+
+    def update(self, open_price, high_price, low_price, close_price, volume):
+        """"""
+        self.count += 1
+        self.value = self.sma.update(close_price)
+        return self.value
+
+
+class EmaIndicator(Indicator):
+    """
+    Exponential moving average of close price.
+    """
+
+    def __init__(self, n: int):
+        """"""
+        super().__init__()
+        self.ema = Ema(n)
+
+    def update(self, open_price, high_price, low_price, close_price, volume):
+        """"""
+        self.count += 1
+        self.value = self.ema.update(close_price)
+        return self.value
+
+
+class StdIndicator(Indicator):
+    """
+    Population standard deviation of close price by running sums.
+    Running sums are of prices shifted by a recent close price, and
+    are recalculated with a new shift every n bars, so they stay
+    accurate when price drifts far away.
+    """
+
+    def __init__(self, n: int):
+        """"""
+        super().__init__()
+        self.n = n
+        self.values = deque()
+        self.shift = 0.0
+        self.total = 0.0
+        self.total_square = 0.0
+
+    def update(self, open_price, high_price, low_price, close_price, volume):
+        """"""
+        self.count += 1
+        self.values.append(close_price)
+
+        if len(self.values) > self.n:
+            old = self.values.popleft() - self.shift
+            self.total -= old
+            self.total_square -= old * old
+
+        # Recalculate sums shifted by latest close once the window wraps.
+        if not self.count % self.n:
+            self.shift = close_price
+            self.total = 0.0
+            self.total_square = 0.0
+            for value in self.values:
+                value -= close_price
+                self.total += value
+                self.total_square += value * value
+        else:
+            value = close_price - self.shift
+            self.total += value
+            self.total_square += value * value
+
+        if len(self.values) == self.n:
+            mean = self.total / self.n
+            variance = self.total_square / self.n - mean * mean
+            self.value = sqrt(variance) if variance > 0 else 0.0
+        return self.value
+
+
+class TrueRange:
+    """
+    True range of bar, available from the second bar.
+    """
+
+    def __init__(self):
+        """"""
+        self.last_close = nan
+
+    def update(self, high_price, low_price, close_price):
+        """"""
+        last_close = self.last_close
+        self.last_close = close_price
+
+        if last_close != last_close:
+            return nan
+
+        return max(
+            high_price - low_price,
+            abs(high_price - last_close),
+            abs(low_price - last_close)
+        )
+
+
+class AtrIndicator(Indicator):
+    """
+    Average true range with Wilder smoothing.
+    """
+
+    def __init__(self, n: int):
+        """"""
+        super().__init__()
+        self.true_range = TrueRange()
+        self.wilder = Wilder(n)
+
+    def update(self, open_price, high_price, low_price, close_price, volume):
+        """"""
+        self.count += 1
+        tr = self.true_range.update(high_price, low_price, close_price)
+        if tr == tr:
+            self.value = self.wilder.update(tr)
+        return self.value
+
+
+class RsiIndicator(Indicator):
+    """
+    Relative strength index with Wilder smoothing of gains and losses.
+    """
+
+    def __init__(self, n: int):
+        """"""
+        super().__init__()
+        self.gain = Wilder(n)
+        self.loss = Wilder(n)
+        self.last_close = nan
+
+    def update(self, open_price, high_price, low_price, close_price, volume):
+        """"""
+        self.count += 1
+        last_close = self.last_close
+        self.last_close = close_price
+
+        if last_close != last_close:
+            return self.value
+
+        change = close_price - last_close
+        gain = self.gain.update(max(change, 0))
+        loss = self.loss.update(max(-change, 0))
+
+        if gain == gain:
+            total = gain + loss
+            self.value = 100 * gain / total if total else 0.0
+        return self.value
+
+
+class CciIndicator(Indicator):
+    """
+    Commodity channel index. Mean deviation needs O(n) per bar.
+    """
+
+    def __init__(self, n: int):
+        """"""
+        super().__init__()
+        self.n = n
+        self.sma = Sma(n)
+
+    def update(self, open_price, high_price, low_price, close_price, volume):
+        """"""
+        self.count += 1
+        typical = (high_price + low_price + close_price) / 3
+        mean = self.sma.update(typical)
+
+        if mean == mean:
+            deviation = sum(abs(v - mean) for v in self.sma.values) / self.n
+            if deviation:
+                self.value = (typical - mean) / (0.015 * deviation)
+            else:
+                self.value = 0.0
+        return self.value
+
+
+class MacdIndicator(Indicator):
+    """
+    MACD line, signal line and histogram. Like talib, the fast EMA
+    starts later so that both EMAs begin at the same bar, and values
+    are available once the signal line is.
+    """
+
+    def __init__(self, fast_period: int, slow_period: int, signal_period: int):
+        """"""
+        super().__init__()
+        self.fast_start = max(slow_period - fast_period, 0)
+        self.fast = Ema(fast_period)
+        self.slow = Ema(slow_period)
+        self.signal = Ema(signal_period)
+        self.value = (nan, nan, nan)
+
+    @property
+    def inited(self):
+        """"""
+        return self.value[0] == self.value[0]
+
+    def update(self, open_price, high_price, low_price, close_price, volume):
+        """"""
+        self.count += 1
+        slow = self.slow.update(close_price)
+        if self.count > self.fast_start:
+            fast = self.fast.update(close_price)
+        else:
+            fast = nan
+
+        if slow == slow:
+            macd = fast - slow
+            signal = self.signal.update(macd)
+            if signal == signal:
+                self.value = (macd, signal, macd - signal)
+        return self.value
+
+
+class AdxIndicator(Indicator):
+    """
+    Average directional index, calculated in the same way as talib.
+    """
+
+    def __init__(self, n: int):
+        """"""
+        super().__init__()
+        self.n = n
+        self.plus_dm = 0.0
+        self.minus_dm = 0.0
+        self.tr = 0.0
+        self.dx_total = 0.0
+        self.adx = nan
+
+        self.last_high = nan
+        self.last_low = nan
+        self.last_close = nan
+
+    def update(self, open_price, high_price, low_price, close_price, volume):
+        """"""
+        self.count += 1
+        n = self.n
+        last_high, last_low, last_close = self.last_high, self.last_low, self.last_close
+        self.last_high, self.last_low, self.last_close = high_price, low_price, close_price
+
+        # First bar only provides previous prices.
+        if self.count == 1:
+            return self.value
+
+        # Sum of first n - 1 periods, then Wilder smoothing.
+        if self.count > n:
+            self.plus_dm -= self.plus_dm / n
+            self.minus_dm -= self.minus_dm / n
+            self.tr -= self.tr / n
+
+        diff_plus = high_price - last_high
+        diff_minus = last_low - low_price
+        if diff_minus > 0 and diff_plus < diff_minus:
+            self.minus_dm += diff_minus
+        elif diff_plus > 0 and diff_plus > diff_minus:
+            self.plus_dm += diff_plus
+
+        self.tr += max(
+            high_price - low_price,
+            abs(high_price - last_close),
+            abs(low_price - last_close)
+        )
+
+        if self.count <= n:
+            return self.value
+
+        dx = nan
+        if self.tr:
+            minus_di = 100 * self.minus_dm / self.tr
+            plus_di = 100 * self.plus_dm / self.tr
+            total = minus_di + plus_di
+            if total:
+                dx = 100 * abs(minus_di - plus_di) / total
+
+        # Average of first n DX, then Wilder smoothing.
+        if self.count < 2 * n:
+            if dx == dx:
+                self.dx_total += dx
+        elif self.count == 2 * n:
+            if dx == dx:
+                self.dx_total += dx
+            self.value = self.dx_total / n
+        elif dx == dx:
+            self.value = (self.value * (n - 1) + dx) / n
+        return self.value
+
+
+class DonchianIndicator(Indicator):
+    """
+    Highest high and lowest low of last n bars by monotonic deques.
+    """
+
+    def __init__(self, n: int):
+        """"""
+        super().__init__()
+        self.n = n
+        self.highs = deque()
+        self.lows = deque()
+        self.value = (nan, nan)
+
+    @property
+    def inited(self):
+        """"""
+        return self.count >= self.n
+
+    def update(self, open_price, high_price, low_price, close_price, volume):
+        """"""
+        count = self.count
+        self.count += 1
+
+        highs = self.highs
+        while highs and highs[-1][1] <= high_price:
+            highs.pop()
+        highs.append((count, high_price))
+        if highs[0][0] <= count - self.n:
+            highs.popleft()
+
+        lows = self.lows
+        while lows and lows[-1][1] >= low_price:
+            lows.pop()
+        lows.append((count, low_price))
+        if lows[0][0] <= count - self.n:
+            lows.popleft()
+
+        if self.count >= self.n:
+            self.value = (highs[0][1], lows[0][1])
+        return self.value
+
+
+class BollIndicator(Indicator):
+    """
+    Bollinger channel (up, down) of SMA and standard deviation.
+    """
+
+    def __init__(self, n: int, dev: float):
+        """"""
+        super().__init__()
+        self.dev = dev
+        self.sma = SmaIndicator(n)
+        self.std = StdIndicator(n)
+        self.value = (nan, nan)
+
+    @property
+    def inited(self):
+        """"""
+        return self.sma.inited
+
+    def update(self, open_price, high_price, low_price, close_price, volume):
+        """"""
+        self.count += 1
+        args = (open_price, high_price, low_price, close_price, volume)
+        mid = self.sma.update(*args)
+        std = self.std.update(*args)
+        self.value = (mid + std * self.dev, mid - std * self.dev)
+        return self.value
+
+
+class KeltnerIndicator(Indicator):
+    """
+    Keltner channel (up, down) of SMA and ATR.
+    """
+
+    def __init__(self, n: int, dev: float):
+        """"""
+        super().__init__()
+        self.dev = dev
+        self.sma = SmaIndicator(n)
+        self.atr = AtrIndicator(n)
+        self.value = (nan, nan)
+
+    @property
+    def inited(self):
+        """"""
+        return self.atr.inited
+
+    def update(self, open_price, high_price, low_price, close_price, volume):
+        """"""
+        self.count += 1
+        args = (open_price, high_price, low_price, close_price, volume)
+        mid = self.sma.update(*args)
+        atr = self.atr.update(*args)
+        self.value = (mid + atr * self.dev, mid - atr * self.dev)
+        return self.value
+
+
+INDICATOR_CLASSES = {
+    "sma": SmaIndicator,
+    "ema": EmaIndicator,
+    "std": StdIndicator,
+    "atr": AtrIndicator,
+    "rsi": RsiIndicator,
+    "cci": CciIndicator,
+    "macd": MacdIndicator,
+    "adx": AdxIndicator,
+    "donchian": DonchianIndicator,
+    "boll": BollIndicator,
+    "keltner": KeltnerIndicator,
+}
@@ -0,0 +1,86 @@
+"""
+Interned identifiers of (symbol, exchange) pairs.
+
+All data objects of the same contract share one SymbolId and one
+vt_symbol string object, so vt_symbol is never rebuilt for each
+tick/order/trade, and dict lookups keyed by vt_symbol compare by
+identity first.
+交易对标识的驻留表，同一合约共享同一个vt_symbol字符串对象
+"""
+
+import sys
+
+from .constant import Exchange
+
+
+class SymbolId:
+    """
+    Shared identifier of a (symbol, exchange) pair.
+    """
+
+    __slots__ = ("symbol", "exchange", "vt_symbol")
+
+    def __init__(self, symbol: str, exchange: Exchange):
+        """"""
+        self.symbol = symbol
+        self.exchange = exchange
+        self.vt_symbol = sys.intern(f"{symbol}.{exchange.value}")
+
+    def __repr__(self):
+        """"""
+        return f"SymbolId({self.vt_symbol})"
+
+
+class SymbolRegistry:
+    """
+    Maps (symbol, exchange) and vt_symbol to shared SymbolId objects.
+    """
+
+    def __init__(self):
+        """"""
+        self._ids = {}
+        self._vt_symbols = {}
+
+    def get(self, symbol: str, exchange: Exchange):
+        """
+        Get SymbolId of symbol and exchange, created on first use.
+        """
+        symbol_id = self._ids.get((symbol, exchange), None)
+        if symbol_id is None:
+            symbol_id = SymbolId(symbol, exchange)
+            symbol_id = self._ids.setdefault((symbol, exchange), symbol_id)
+            self._vt_symbols.setdefault(symbol_id.vt_symbol, symbol_id)
+        return symbol_id
+
+    def get_vt_symbol(self, symbol: str, exchange: Exchange):
+        """
+        Get interned vt_symbol string of symbol and exchange.
+        """
+        symbol_id = self._ids.get((symbol, exchange), None)
+        if symbol_id is None:
+            symbol_id = self.get(symbol, exchange)
+        return symbol_id.vt_symbol
+
+    def parse(self, vt_symbol: str):
+        """
+        Get SymbolId of vt_symbol string, splitting it only on first use.
+        """
+        symbol_id = self._vt_symbols.get(vt_symbol, None)
+        if symbol_id is None:
+            symbol, exchange_str = vt_symbol.split(".")
+            symbol_id = self.get(symbol, Exchange(exchange_str))
+        return symbol_id
+
+    def intern(self, vt_symbol: str):
+        """
+        Get the shared vt_symbol string object equal to vt_symbol, e.g.
+        for keys of dict looked up with vt_symbol of data objects.
+        """
+        symbol_id = self._vt_symbols.get(vt_symbol, None)
+        if symbol_id:
+            return symbol_id.vt_symbol
+        return sys.intern(vt_symbol)
+
+
+symbol_registry = SymbolRegistry()
+get_vt_symbol = symbol_registry.get_vt_symbol
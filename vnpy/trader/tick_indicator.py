@@ -0,0 +1,365 @@
+"""
+Streaming tick indicators with a vectorized batch mode.
+
+Each indicator is updated with one TickData in O(1) by update_tick, and
+calculate returns the values of the same indicator for every tick of a
+columnar tick container (TickBuffer, or anything else with numpy arrays
+as tick attributes, e.g. a DataFrame), so one definition serves both
+on_tick of live strategies and backtests. Ticks with 0 last price keep
+the previous value of price based indicators.
+逐tick增量更新的指标，并支持numpy批量计算
+"""
+
+from abc import ABC, abstractmethod
+from collections import deque
+from math import nan, sqrt
+
+import numpy as np
+
+from .object import TickData
+
+def _expand(values: np.ndarray, valid: np.ndarray):
+    """
+    Map values calculated on valid ticks back to all ticks, invalid
+    ticks keep the previous value (nan before first valid tick).
+    """
+    result = np.full(len(valid), np.nan)
+    positions = np.cumsum(valid) - 1
+    filled = positions >= 0
+    result[filled] = values[positions[filled]]
+    return result
+
+
+def _ema(values: np.ndarray, k: float):
+    """
+    EMA seeded by first value, calculated in blocks of closed form
+    y[i] = d^(i+1) * (y[-1] + k * sum(x[j] / d^(j+1))) with d = 1 - k,
+    blocks are short enough to keep d^-i in float range.
+    """
+    result = np.empty(len(values))
+    if not len(values):
+        return result
+
+    decay = 1 - k
+    if decay <= 0:
+        result[:] = values
+        return result
+
+    block = max(1, int(200 / -np.log10(decay)))
+    value = values[0]
+    for start in range(0, len(values), block):
+        data = values[start:start + block]
+        powers = decay ** np.arange(1, len(data) + 1)
+        ema = powers * (value + k * np.cumsum(data / powers))
+        result[start:start + len(data)] = ema
+        value = ema[-1]
+    return result
+
+
+def _rolling_moments(values: np.ndarray, n: int, chunk_size: int = 10000):
+    """
+    Mean and population variance of every window of n values, by two
+    passes over each window instead of cumulative sums, so precision
+    does not depend on length or level of the series. Windows are
+    processed in chunks to bound temporary memory.
+    """
+    values = np.ascontiguousarray(values, dtype=float)
+    count = len(values) - n + 1
+    stride = values.strides[0]
+    windows = np.lib.stride_tricks.as_strided(
+        values, shape=(count, n), strides=(stride, stride), writeable=False
+    )
+
+    mean = np.empty(count)
+    variance = np.empty(count)
+    for start in range(0, count, chunk_size):
+        chunk = windows[start:start + chunk_size]
+        chunk_mean = chunk.mean(axis=1)
+        mean[start:start + chunk_size] = chunk_mean
+        variance[start:start + chunk_size] = (
+            (chunk - chunk_mean[:, None]) ** 2
+        ).mean(axis=1)
+    return mean, variance
+
+
+class TickIndicator(ABC):
+    """
+    Base class of tick indicators.
+    """
+
+    def __init__(self):
+        """"""
+        self.count = 0
+        self.value = nan
+
+    @property
+    def inited(self):
+        """
+        Whether value is available.
+        """
+        return self.value == self.value
+
+    @abstractmethod
+    def update_tick(self, tick: TickData):
+        """
+        Update new tick data and return the latest value.
+        """
+        pass
+
+    @abstractmethod
+    def calculate(self, ticks):
+        """
+        Calculate values for all ticks in columnar container, without
+        changing streaming state.
+        """
+        pass
+
+
+class TickEma(TickIndicator):
+    """
+    Exponential moving average of last price over n ticks, seeded by
+    the first price so it is available from the first tick.
+    """
+
+    def __init__(self, n: int):
+        """"""
+        super().__init__()
+        self.k = 2 / (n + 1)
+
+    def update_tick(self, tick: TickData):
+        """"""
+        price = tick.last_price
+        if not price:
+            return self.value
+
+        self.count += 1
+        if self.count == 1:
+            self.value = price
+        else:
+            self.value += (price - self.value) * self.k
+        return self.value
+
+    def calculate(self, ticks):
+        """"""
+        prices = np.asarray(ticks.last_price, dtype=float)
+        valid = prices != 0
+        return _expand(_ema(prices[valid], self.k), valid)
+
+
+class Vwap(TickIndicator):
+    """
+    Volume weighted average price of current trading session, using
+    changes of cumulative tick volume. A drop of volume starts a new
+    session.
+    """
+
+    def __init__(self):
+        """"""
+        super().__init__()
+        self.last_volume = nan
+        self.turnover = 0.0
+        self.volume = 0.0
+
+    def update_tick(self, tick: TickData):
+        """"""
+        price = tick.last_price
+        if not price:
+            return self.value
+
+        self.count += 1
+        volume_change = tick.volume - self.last_volume
+        self.last_volume = tick.volume
+
+        if volume_change > 0:
+            self.turnover += price * volume_change
+            self.volume += volume_change
+        elif volume_change < 0:
+            self.turnover = 0.0
+            self.volume = 0.0
+
+        self.value = self.turnover / self.volume if self.volume else nan
+        return self.value
+
+    def calculate(self, ticks):
+        """"""
+        prices = np.asarray(ticks.last_price, dtype=float)
+        valid = prices != 0
+        prices = prices[valid]
+        volumes = np.asarray(ticks.volume, dtype=float)[valid]
+
+        volume_changes = np.concatenate([[0], np.diff(volumes)])
+        resets = volume_changes < 0
+        volume_changes[resets] = 0
+
+        total_volume = np.cumsum(volume_changes)
+        total_turnover = np.cumsum(prices * volume_changes)
+
+        # Totals at the start of each session are subtracted.
+        sessions = np.cumsum(resets)
+        starts = np.concatenate([[0], np.flatnonzero(resets)])
+        session_volume = total_volume - total_volume[starts][sessions]
+        session_turnover = total_turnover - total_turnover[starts][sessions]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = np.where(
+                session_volume > 0,
+                session_turnover / session_volume,
+                np.nan
+            )
+        return _expand(values, valid)
+
+
+class ZScore(TickIndicator):
+    """
+    Rolling z-score of last price over last n ticks, 0 for a flat
+    window with the same price for all ticks. Running sums are of
+    prices shifted by a recent price, and are recalculated with a new
+    shift every n ticks, so they stay accurate when price drifts.
+    """
+
+    def __init__(self, n: int):
+        """"""
+        super().__init__()
+        self.n = n
+        self.values = deque()
+        self.shift = 0.0
+        self.total = 0.0
+        self.total_square = 0.0
+
+        self.last_price = nan
+        self.flat_count = 0
+
+    def update_tick(self, tick: TickData):
+        """"""
+        price = tick.last_price
+        if not price:
+            return self.value
+
+        self.count += 1
+        if price == self.last_price:
+            self.flat_count += 1
+        else:
+            self.flat_count = 1
+        self.last_price = price
+
+        self.values.append(price)
+        if len(self.values) > self.n:
+            old = self.values.popleft() - self.shift
+            self.total -= old
+            self.total_square -= old * old
+
+        # Recalculate sums shifted by latest price once the window wraps.
+        if not self.count % self.n:
+            self.shift = price
+            self.total = 0.0
+            self.total_square = 0.0
+            for value in self.values:
+                value -= price
+                self.total += value
+                self.total_square += value * value
+        else:
+            value = price - self.shift
+            self.total += value
+            self.total_square += value * value
+
+        if len(self.values) == self.n:
+            mean = self.total / self.n
+            variance = self.total_square / self.n - mean * mean
+            if self.flat_count < self.n and variance > 0:
+                self.value = (price - self.shift - mean) / sqrt(variance)
+            else:
+                self.value = 0.0
+        return self.value
+
+    def calculate(self, ticks):
+        """"""
+        n = self.n
+        prices = np.asarray(ticks.last_price, dtype=float)
+        valid = prices != 0
+        prices = prices[valid]
+
+        values = np.full(len(prices), np.nan)
+        if len(prices) < n:
+            return _expand(values, valid)
+
+        mean, variance = _rolling_moments(prices, n)
+
+        # Flat windows have no price change within the window.
+        changes = np.zeros(len(prices), dtype=np.int64)
+        changes[1:] = np.cumsum(prices[1:] != prices[:-1])
+        flat = changes[n - 1:] == changes[:len(prices) - n + 1]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            zscore = (prices[n - 1:] - mean) / np.sqrt(variance)
+        zscore[flat | (variance <= 0)] = 0
+        values[n - 1:] = zscore
+        return _expand(values, valid)
+
+
+class OrderBookImbalance(TickIndicator):
+    """
+    (bid volume - ask volume) / (bid volume + ask volume) of first depth
+    levels, nan for an empty order book.
+    """
+
+    def __init__(self, depth: int = 1):
+        """"""
+        super().__init__()
+        self.bid_names = [f"bid_volume_{i}" for i in range(1, depth + 1)]
+        self.ask_names = [f"ask_volume_{i}" for i in range(1, depth + 1)]
+
+    def update_tick(self, tick: TickData):
+        """"""
+        self.count += 1
+        bid_volume = sum(getattr(tick, name) for name in self.bid_names)
+        ask_volume = sum(getattr(tick, name) for name in self.ask_names)
+
+        total = bid_volume + ask_volume
+        self.value = (bid_volume - ask_volume) / total if total else nan
+        return self.value
+
+    def calculate(self, ticks):
+        """"""
+        bid_volume = sum(np.asarray(getattr(ticks, name), dtype=float) for name in self.bid_names)
+        ask_volume = sum(np.asarray(getattr(ticks, name), dtype=float) for name in self.ask_names)
+
+        total = bid_volume + ask_volume
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(total > 0, (bid_volume - ask_volume) / total, np.nan)
+
+
+class Microprice(TickIndicator):
+    """
+    Best bid/ask prices weighted by volume of the opposite side, nan
+    when either side of the order book is missing.
+    """
+
+    def update_tick(self, tick: TickData):
+        """"""
+        self.count += 1
+        bid_price = tick.bid_price_1
+        ask_price = tick.ask_price_1
+        bid_volume = tick.bid_volume_1
+        ask_volume = tick.ask_volume_1
+
+        if bid_price and ask_price and (bid_volume + ask_volume):
+            self.value = (
+                (bid_price * ask_volume + ask_price * bid_volume)
+                / (bid_volume + ask_volume)
+            )
+        else:
+            self.value = nan
+        return self.value
+
+    def calculate(self, ticks):
+        """"""
+        bid_price = np.asarray(ticks.bid_price_1, dtype=float)
+        ask_price = np.asarray(ticks.ask_price_1, dtype=float)
+        bid_volume = np.asarray(ticks.bid_volume_1, dtype=float)
+        ask_volume = np.asarray(ticks.ask_volume_1, dtype=float)
+
+        total = bid_volume + ask_volume
+        valid = (bid_price != 0) & (ask_price != 0) & (total != 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = (bid_price * ask_volume + ask_price * bid_volume) / total
+        return np.where(valid, values, np.nan)
@@ -0,0 +1,148 @@
+"""
+Fast timestamp conversion for gateways and bar generators.
+时间戳快速转换
+
+Exchange strings are normalized into the ISO format accepted by the C
+implemented datetime.fromisoformat instead of going through strptime,
+and integer timestamps (microseconds since epoch) can be shifted into
+local time with UTC offsets cached per 15 minutes, so time.localtime is
+called once per bucket instead of once per message.
+"""
+
+import time
+from datetime import datetime, timedelta
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+SECOND_MICROSECONDS = 1000000
+
+# Timezone transitions happen on whole quarters of an hour.
+OFFSET_BUCKET = 900 * SECOND_MICROSECONDS
+CACHE_SIZE = 100000
+
+_offsets = {}
+_dates = {}
+
+
+def get_local_offset(timestamp: int):
+    """
+    Get UTC offset (microseconds) of local timezone at timestamp.
+    """
+    bucket = timestamp // OFFSET_BUCKET
+    offset = _offsets.get(bucket, None)
+    if offset is None:
+        if len(_offsets) >= CACHE_SIZE:
+            _offsets.clear()
+        seconds = bucket * OFFSET_BUCKET // SECOND_MICROSECONDS
+        offset = time.localtime(seconds).tm_gmtoff * SECOND_MICROSECONDS
+        _offsets[bucket] = offset
+    return offset
+
+
+def to_local_timestamp(timestamp: int):
+    """
+    Convert UTC timestamp into local wall-clock timestamp.
+    """
+    return timestamp + get_local_offset(timestamp)
+
+
+def to_datetime(timestamp: int):
+    """
+    Convert timestamp (microseconds) into naive datetime.
+    """
+    return EPOCH + timedelta(microseconds=timestamp)
+
+
+def to_timestamp(dt: datetime):
+    """
+    Convert wall-clock datetime into timestamp (microseconds), timezone
+    of aware datetime is ignored.
+    """
+    if dt.tzinfo:
+        dt = dt.replace(tzinfo=None)
+    return (dt - EPOCH) // MICROSECOND
+
+
+def _normalize_fraction(text: str):
+    """
+    Pad/cut fraction of "YYYY-MM-DDTHH:MM:SS[.f]" to 6 digits, which is
+    required by fromisoformat before Python 3.11.
+    """
+    size = len(text)
+    if size == 19 or size == 23 or size == 26:
+        return text
+    return text[:20] + text[20:26].ljust(6, "0")
+
+
+def _parse_zone(zone: str):
+    """
+    Parse "+08:00"/"-0500"/"+08" into offset in microseconds.
+    """
+    sign = -1 if zone[0] == "-" else 1
+    zone = zone[1:].replace(":", "")
+    seconds = int(zone[:2]) * 3600 + int(zone[2:4] or 0) * 60
+    return sign * seconds * SECOND_MICROSECONDS
+
+
+def _split_zone(text: str):
+    """
+    Split ISO-8601 string into local part and zone suffix.
+    """
+    if text[-1] == "Z":
+        return text[:-1], ""
+
+    for n in range(len(text) - 1, 18, -1):
+        if text[n] in "+-":
+            return text[:n], text[n:]
+    return text, ""
+
+
+def parse_iso(text: str, offset: timedelta = None):
+    """
+    Parse ISO-8601 string ("2019-01-01T09:30:00.123Z", with optional
+    fraction of any length and "Z"/"+08:00"/"-0500" suffix) into naive
+    UTC datetime, or into UTC + offset (e.g. timedelta(hours=8) for
+    China time) if offset is given. Strings without suffix are taken as
+    UTC.
+    """
+    text, zone = _split_zone(text)
+    dt = datetime.fromisoformat(_normalize_fraction(text))
+
+    if zone:
+        dt -= timedelta(microseconds=_parse_zone(zone))
+    if offset:
+        dt += offset
+    return dt
+
+
+def parse_iso_timestamp(text: str):
+    """
+    Parse ISO-8601 string into UTC timestamp (microseconds).
+    """
+    text, zone = _split_zone(text)
+    dt = datetime.fromisoformat(_normalize_fraction(text))
+
+    timestamp = (dt - EPOCH) // MICROSECOND
+    if zone:
+        timestamp -= _parse_zone(zone)
+    return timestamp
+
+
+def parse_compact(text: str):
+    """
+    Parse "YYYYMMDD HH:MM:SS[.f]" used by CTP-like gateways into naive
+    datetime, same as strptime with "%Y%m%d %H:%M:%S.%f".
+    """
+    date = text[:8]
+    prefix = _dates.get(date, None)
+    if prefix is None:
+        if len(_dates) >= CACHE_SIZE:
+            _dates.clear()
+        prefix = f"{date[:4]}-{date[4:6]}-{date[6:]}T"
+        _dates[date] = prefix
+
+    fraction = text[18:24]
+    if fraction:
+        return datetime.fromisoformat(f"{prefix}{text[9:17]}.{fraction:0<6}")
+    return datetime.fromisoformat(prefix + text[9:17])
@@ -3,8 +3,9 @@ General utility functions.
 """
 
 import json
+from bisect import bisect_right
 from pathlib import Path
-from typing import Callable
+from typing import Callable, Sequence
 
 import numpy as np
 import talib
@@ -13,20 +14,23 @@ import time
 import datetime
 
 from .object import BarData, TickData
-from .constant import Exchange, Interval
+from .constant import BarType, Exchange, Interval
+from .symbol import symbol_registry
+from .indicator import INDICATOR_CLASSES
+from .timestamp import MICROSECOND, to_datetime, to_timestamp
 
 
 def extract_vt_symbol(vt_symbol: str):
     """
-    通过. 把 vt_symbol 拆分成 (symbol, exchange)
+    通过. 把 vt_symbol 拆分成 (symbol, exchange)，结果来自驻留表，不重复拆分
     :return: (symbol, exchange)
     """
-    symbol, exchange_str = vt_symbol.split('.')
-    return symbol, Exchange(exchange_str)
+    symbol_id = symbol_registry.parse(vt_symbol)
+    return symbol_id.symbol, symbol_id.exchange
 
 
 def generate_vt_symbol(symbol: str, exchange: Exchange):
-    return f'{symbol}.{exchange.value}'
+    return symbol_registry.get_vt_symbol(symbol, exchange)
 
 
 def _get_trader_dir(temp_name: str):
@@ -172,12 +176,8 @@ class TimeUtils(object):
         :param timestamp: 
         :return: datetime类型 的日期和时间
         """
-        # 转换成localtime
-        time_local = time.localtime(timestamp)
-        # str  to   datetime
-        dt_datetime = datetime.datetime(time_local.tm_year, time_local.tm_mon, time_local.tm_mday,
-                                        time_local.tm_hour, time_local.tm_min, time_local.tm_sec)
-        return dt_datetime
+        # 与time.localtime相同，舍去不足1秒的部分
+        return datetime.datetime.fromtimestamp(int(timestamp))
 
     def get_secend(self, timestamp):
         """
@@ -195,10 +195,13 @@ class TimeUtils(object):
         :param date: (2016-05-05 20:28:54)
         :return: 时间戳 s
         """
-        # 转为时间数组
-        timeArray = time.strptime(date, "%Y-%m-%d %H:%M:%S")
-        # 转为时间戳
-        timeStamp = int(time.mktime(timeArray))
+        # 转为时间戳，fromisoformat比strptime快得多，不支持的格式(如月日不补零)
+        # 仍用strptime解析
+        try:
+            timeStamp = int(datetime.datetime.fromisoformat(date).timestamp())
+        except ValueError:
+            timeArray = time.strptime(date, "%Y-%m-%d %H:%M:%S")
+            timeStamp = int(time.mktime(timeArray))
         return timeStamp
 
     def convert_date2timeArray(self, date):
@@ -403,6 +406,655 @@ class BarGenerator(ToString):
         self.bar = None
 
 
+DAY_MICROSECONDS = 86400 * 1000000
+
+
+def _to_timedelta(value):
+    """"""
+    if isinstance(value, datetime.time):
+        return datetime.timedelta(
+            hours=value.hour,
+            minutes=value.minute,
+            seconds=value.second,
+            microseconds=value.microsecond
+        )
+    return value
+
+
+class BarSchedule:
+    """
+    Precomputed bar boundaries, as offsets from midnight repeated every
+    day (or only on one weekday). Offsets can be negative or longer than
+    one day, e.g. a daily bar starting at 21:00 of the previous day.
+    预先计算的bar边界时间表
+    """
+
+    def __init__(self, offsets: Sequence[datetime.timedelta], weekday: int = None):
+        """"""
+        self.offsets = sorted(set(offset // MICROSECOND for offset in offsets))
+        self.weekday = weekday
+        self.boundaries = {}
+
+    @classmethod
+    def minute(
+        cls,
+        window: int,
+        sessions: Sequence[tuple] = None,
+        offset: datetime.timedelta = datetime.timedelta()
+    ):
+        """
+        Boundaries every window minutes (any number, e.g. 7, 45, 90),
+        counted from the start of each trading session. Sessions are
+        (start, end) datetime.time pairs, a session ending before it
+        starts crosses midnight. The end of a session is always a
+        boundary, so bars never span sessions. Without sessions, the
+        whole day counted from midnight is used. Offset shifts all
+        boundaries, e.g. 50 seconds for bars closing at second 50.
+        """
+        if not sessions:
+            sessions = [(datetime.time(0), datetime.time(0))]
+
+        step = datetime.timedelta(minutes=window)
+        offsets = []
+        for start, end in sessions:
+            start = _to_timedelta(start)
+            end = _to_timedelta(end)
+            if end <= start:
+                end += datetime.timedelta(days=1)
+
+            boundary = start
+            while boundary < end:
+                offsets.append(boundary + offset)
+                boundary += step
+            offsets.append(end + offset)
+
+        return cls(offsets)
+
+    @classmethod
+    def daily(cls, offset: datetime.timedelta = datetime.timedelta()):
+        """
+        One boundary every day at midnight plus offset.
+        """
+        return cls([offset])
+
+    @classmethod
+    def weekly(
+        cls,
+        weekday: int = 0,
+        offset: datetime.timedelta = datetime.timedelta()
+    ):
+        """
+        One boundary every week at midnight of weekday (Monday is 0)
+        plus offset.
+        """
+        return cls([offset], weekday)
+
+    def get_boundaries(self, day: int):
+        """
+        Get boundaries (microseconds since epoch) generated by day, which
+        is number of days since epoch.
+        """
+        boundaries = self.boundaries.get(day, None)
+        if boundaries is None:
+            # 1970-01-01 is Thursday
+            if self.weekday is not None and (day + 3) % 7 != self.weekday:
+                boundaries = []
+            else:
+                midnight = day * DAY_MICROSECONDS
+                boundaries = [midnight + offset for offset in self.offsets]
+            self.boundaries[day] = boundaries
+        return boundaries
+
+    def next_boundary(self, timestamp: int):
+        """
+        Get the first boundary after timestamp.
+        """
+        day = timestamp // DAY_MICROSECONDS - 2
+        while True:
+            boundaries = self.get_boundaries(day)
+            n = bisect_right(boundaries, timestamp)
+            if n < len(boundaries):
+                return boundaries[n]
+            day += 1
+
+    def previous_boundary(self, timestamp: int):
+        """
+        Get the last boundary at or before timestamp.
+        """
+        day = timestamp // DAY_MICROSECONDS + 2
+        while True:
+            boundaries = self.get_boundaries(day)
+            n = bisect_right(boundaries, timestamp)
+            if n:
+                return boundaries[n - 1]
+            day -= 1
+
+
+class ScheduleBarGenerator:
+    """
+    Generate bars closing at boundaries of BarSchedule, from ticks or
+    from shorter bars. Each tick/bar is checked by one integer timestamp
+    comparison with the end of current bar, and bar datetime is the
+    start boundary of the bar.
+    根据边界时间表合成任意周期的bar
+    """
+
+    def __init__(
+        self,
+        on_bar: Callable,
+        schedule: BarSchedule,
+        interval: Interval = Interval.MINUTE,
+        bar_seconds: int = 60
+    ):
+        """
+        :param on_bar: 合成bar的回调函数
+        :param schedule: bar边界时间表
+        :param interval: 合成bar的单位
+        :param bar_seconds: update_bar输入的bar的周期（秒）
+        """
+        self.on_bar = on_bar
+        self.schedule = schedule
+        self.interval = interval
+        self.bar_length = bar_seconds * 1000000
+
+        self.bar = None
+        self.end = 0
+        self.last_tick = None
+
+    def _new_bar(self, data, timestamp: int):
+        """"""
+        start = self.schedule.previous_boundary(timestamp)
+        self.end = self.schedule.next_boundary(timestamp)
+
+        self.bar = BarData(
+            symbol=data.symbol,
+            exchange=data.exchange,
+            datetime=to_datetime(start),
+            interval=self.interval,
+            gateway_name=data.gateway_name
+        )
+
+    def update_tick(self, tick: TickData):
+        """
+        Update new tick data into generator. The bar is finished by the
+        first tick at or after its end boundary.
+        """
+        # 过滤掉 最新价格为0的数据
+        if not tick.last_price:
+            return
+
+        timestamp = to_timestamp(tick.datetime)
+        if self.bar and timestamp >= self.end:
+            self.generate()
+
+        bar = self.bar
+        if not bar:
+            self._new_bar(tick, timestamp)
+            bar = self.bar
+            bar.open_price = tick.last_price
+            bar.high_price = tick.last_price
+            bar.low_price = tick.last_price
+        else:
+            bar.high_price = max(bar.high_price, tick.last_price)
+            bar.low_price = min(bar.low_price, tick.last_price)
+
+        bar.close_price = tick.last_price
+        bar.open_interest = tick.open_interest
+
+        if self.last_tick:
+            volume_change = tick.volume - self.last_tick.volume
+            bar.volume += max(volume_change, 0)
+
+        self.last_tick = tick
+
+    def update_bar(self, bar: BarData):
+        """
+        Update new bar (of bar_seconds) into generator. The bar is
+        finished as soon as the input bar reaches its end boundary.
+        """
+        timestamp = to_timestamp(bar.datetime)
+        if self.bar and timestamp >= self.end:
+            self.generate()
+
+        window_bar = self.bar
+        if not window_bar:
+            self._new_bar(bar, timestamp)
+            window_bar = self.bar
+            window_bar.open_price = bar.open_price
+            window_bar.high_price = bar.high_price
+            window_bar.low_price = bar.low_price
+        else:
+            window_bar.high_price = max(window_bar.high_price, bar.high_price)
+            window_bar.low_price = min(window_bar.low_price, bar.low_price)
+
+        window_bar.close_price = bar.close_price
+        window_bar.volume += bar.volume
+        window_bar.open_interest = bar.open_interest
+
+        if timestamp + self.bar_length >= self.end:
+            self.generate()
+
+    def generate(self):
+        """
+        Finish current bar and call callback immediately.
+        """
+        bar = self.bar
+        if bar:
+            self.bar = None
+            self.on_bar(bar)
+
+
+class _BarNode:
+    """
+    Node of aggregation tree in MultiBarGenerator.
+    """
+
+    def __init__(self, window: int, offset: datetime.timedelta, generator):
+        """"""
+        self.window = window
+        self.offset = offset
+        self.generator = generator
+        self.callbacks = []
+        self.children = []
+
+    def on_bar(self, bar: BarData):
+        """
+        Push finished bar to callbacks first, then to higher timeframes.
+        """
+        for callback in self.callbacks:
+            callback(bar)
+
+        for child in self.children:
+            child.generator.update_bar(bar)
+
+    def accepts(self, window: int, offset: datetime.timedelta):
+        """
+        Whether bars of this node can be aggregated into window bars.
+        """
+        step = datetime.timedelta(minutes=self.window)
+        return not window % self.window and not (offset - self.offset) % step
+
+
+class MultiBarGenerator:
+    """
+    One generator for many timeframes of the same symbol. Ticks are
+    aggregated into 1 minute bars once, and each higher timeframe is
+    built from the finished bars of the largest lower timeframe it is
+    a multiple of (e.g. 1m -> 5m -> 15m -> 1h -> daily).
+
+    The tree is shared only by callbacks added to the same instance.
+    There is no registry per vt_symbol, so every strategy creating its
+    own generator still builds its own chain from ticks.
+    多周期共享的K线合成器
+    """
+
+    def __init__(self, on_bar: Callable):
+        """
+        :param on_bar: 1分钟bar的回调函数
+        """
+        self.bg = ScheduleBarGenerator(on_bar, BarSchedule.minute(1))
+        self.root = _BarNode(1, datetime.timedelta(), None)
+        self.nodes = {(1, datetime.timedelta()): self.root}
+
+    def add_window(
+        self,
+        window: int,
+        on_window_bar: Callable,
+        interval: Interval = Interval.MINUTE,
+        offset: datetime.timedelta = datetime.timedelta()
+    ):
+        """
+        Add callback of window minutes bar (1440 for daily bar, use
+        offset for a daily bar starting at night). Timeframes should be
+        added before feeding data.
+        """
+        key = (window, offset)
+        node = self.nodes.get(key, None)
+
+        if not node:
+            parent = max(
+                (n for n in self.nodes.values() if n.accepts(window, offset)),
+                key=lambda n: n.window
+            )
+
+            generator = ScheduleBarGenerator(
+                None,
+                BarSchedule.minute(window, offset=offset),
+                interval,
+                parent.window * 60
+            )
+            node = _BarNode(window, offset, generator)
+            generator.on_bar = node.on_bar
+
+            # Move higher timeframes under the new node.
+            for child in list(parent.children):
+                if node.accepts(child.window, child.offset):
+                    parent.children.remove(child)
+                    node.children.append(child)
+                    child.generator.bar_length = window * 60000000
+            parent.children.append(node)
+            parent.children.sort(key=lambda n: n.window)
+
+            self.nodes[key] = node
+
+        node.callbacks.append(on_window_bar)
+
+    def remove_window(
+        self,
+        window: int,
+        on_window_bar: Callable,
+        offset: datetime.timedelta = datetime.timedelta()
+    ):
+        """
+        Remove callback of window minutes bar, the node is kept in tree
+        since higher timeframes may be built from it.
+        """
+        node = self.nodes.get((window, offset), None)
+        if node and on_window_bar in node.callbacks:
+            node.callbacks.remove(on_window_bar)
+
+    def update_tick(self, tick: TickData):
+        """
+        Update new tick data into generator, 1 minute bars are pushed to
+        on_bar, which should call update_bar.
+        """
+        self.bg.update_tick(tick)
+
+    def update_bar(self, bar: BarData):
+        """
+        Update 1 minute bar into all higher timeframes.
+        """
+        self.root.on_bar(bar)
+
+    def generate(self):
+        """
+        Finish current 1 minute bar.
+        """
+        self.bg.generate()
+
+
+class ThresholdBarGenerator:
+    """
+    Generate bars closed by activity instead of wall clock: every
+    threshold ticks, volume or turnover (volume * last price, in quote
+    currency). Activity is accumulated in a running total, a bar closes
+    on the tick which makes the total cross the next multiple of
+    threshold, so the excess of a large tick is carried into the next
+    bar. Bar datetime is the datetime of first tick and bar interval is
+    None.
+    按成交笔数、成交量或成交额合成bar
+    """
+
+    def __init__(
+        self,
+        on_bar: Callable,
+        threshold: float,
+        bar_type: BarType = BarType.VOLUME
+    ):
+        """"""
+        self.on_bar = on_bar
+        self.threshold = threshold
+        self.bar_type = bar_type
+
+        self.bar = None
+        self.last_tick = None
+        self.total = 0
+        self.next_close = threshold
+
+    def update_tick(self, tick: TickData):
+        """
+        Update new tick data into generator.
+        """
+        # 过滤掉 最新价格为0的数据
+        if not tick.last_price:
+            return
+
+        volume_change = 0
+        if self.last_tick:
+            volume_change = max(tick.volume - self.last_tick.volume, 0)
+        self.last_tick = tick
+
+        bar = self.bar
+        if not bar:
+            bar = BarData(
+                symbol=tick.symbol,
+                exchange=tick.exchange,
+                datetime=tick.datetime,
+                gateway_name=tick.gateway_name,
+                open_price=tick.last_price,
+                high_price=tick.last_price,
+                low_price=tick.last_price,
+            )
+            self.bar = bar
+        else:
+            bar.high_price = max(bar.high_price, tick.last_price)
+            bar.low_price = min(bar.low_price, tick.last_price)
+
+        bar.close_price = tick.last_price
+        bar.open_interest = tick.open_interest
+        bar.volume += volume_change
+
+        if self.bar_type == BarType.TICK:
+            self.total += 1
+        elif self.bar_type == BarType.VOLUME:
+            self.total += volume_change
+        else:
+            self.total += volume_change * tick.last_price
+
+        if self.total >= self.next_close:
+            self.next_close = (self.total // self.threshold + 1) * self.threshold
+            self.generate()
+
+    def generate(self):
+        """
+        Finish current bar and call callback immediately.
+        """
+        bar = self.bar
+        if bar:
+            self.bar = None
+            self.on_bar(bar)
+
+
+def resample_ticks_by_activity(
+    datetimes,
+    last_prices,
+    volumes,
+    threshold: float,
+    bar_type: BarType = BarType.VOLUME,
+    open_interests=None,
+    include_last: bool = False
+):
+    """
+    Generate tick/volume/turnover bars from tick arrays with numpy, the
+    batch version of ThresholdBarGenerator.update_tick. Return dict of
+    numpy arrays like resample_ticks, which can be passed to create_bars
+    (with interval None).
+    用numpy批量合成成交笔数、成交量或成交额bar
+    """
+    times = np.asarray(datetimes, dtype="datetime64[us]")
+    prices = np.asarray(last_prices, dtype=float)
+    volumes = np.asarray(volumes, dtype=float)
+    if open_interests is None:
+        open_interests = np.zeros(len(prices))
+    open_interests = np.asarray(open_interests, dtype=float)
+
+    # 过滤掉 最新价格为0的数据
+    valid = prices != 0
+    times = times[valid]
+    prices = prices[valid]
+    volumes = volumes[valid]
+    open_interests = open_interests[valid]
+
+    volume_changes = np.concatenate([[0], np.maximum(np.diff(volumes), 0)])
+
+    if bar_type == BarType.TICK:
+        activity = np.ones(len(prices))
+    elif bar_type == BarType.VOLUME:
+        activity = volume_changes
+    else:
+        activity = volume_changes * prices
+
+    # A bar closes on the tick where floor(total / threshold) increases.
+    counts = np.cumsum(activity) // threshold
+    closes = np.flatnonzero(np.diff(np.concatenate([[0], counts])) > 0)
+
+    ends = closes + 1
+    if include_last and (not len(ends) or ends[-1] < len(prices)):
+        ends = np.concatenate([ends, [len(prices)]])
+    ends = ends.astype(int)
+    starts = np.concatenate([[0], ends[:-1]]).astype(int)
+
+    if not len(ends):
+        empty = np.array([], dtype=float)
+        return {
+            "datetime": np.array([], dtype="datetime64[us]"),
+            "open_price": empty,
+            "high_price": empty,
+            "low_price": empty,
+            "close_price": empty,
+            "volume": empty,
+            "open_interest": empty,
+        }
+
+    # Ticks after the last close are not reduced into the last bar.
+    prices = prices[:ends[-1]]
+    volume_changes = volume_changes[:ends[-1]]
+
+    return {
+        "datetime": times[starts],
+        "open_price": prices[starts],
+        "high_price": np.maximum.reduceat(prices, starts),
+        "low_price": np.minimum.reduceat(prices, starts),
+        "close_price": prices[ends - 1],
+        "volume": np.add.reduceat(volume_changes, starts),
+        "open_interest": open_interests[ends - 1],
+    }
+
+
+def resample_ticks(
+    datetimes,
+    last_prices,
+    volumes,
+    open_interests=None,
+    seconds: int = 60,
+    include_last: bool = False
+):
+    """
+    Generate OHLCV bars from tick arrays with numpy group-by, the batch
+    version of BarGenerator.update_tick.
+    用numpy批量把tick数据合成bar，结果与BarGenerator.update_tick一致
+
+    For 1 minute bars (seconds=60) the result is the same as streaming
+    BarGenerator: ticks with 0 last price are dropped, a bar closes when
+    minute of tick changes (minute only, like BarGenerator), volume is
+    the sum of positive changes of cumulative volume between ticks, and
+    bar datetime is the last tick datetime with second/microsecond
+    removed. For other intervals, ticks are grouped by datetime floored
+    to seconds, and bar datetime is the start of interval.
+
+    The last bar is still being built in BarGenerator, so it is only
+    returned with include_last True (like calling generate()).
+
+    Return dict of numpy arrays with keys datetime, open_price,
+    high_price, low_price, close_price, volume and open_interest.
+    """
+    times = np.asarray(datetimes, dtype="datetime64[us]").astype(np.int64)
+    prices = np.asarray(last_prices, dtype=float)
+    volumes = np.asarray(volumes, dtype=float)
+    if open_interests is None:
+        open_interests = np.zeros(len(prices))
+    open_interests = np.asarray(open_interests, dtype=float)
+
+    # 过滤掉 最新价格为0的数据
+    valid = prices != 0
+    times = times[valid]
+    prices = prices[valid]
+    volumes = volumes[valid]
+    open_interests = open_interests[valid]
+
+    if not len(prices):
+        empty = np.array([], dtype=float)
+        return {
+            "datetime": np.array([], dtype="datetime64[us]"),
+            "open_price": empty,
+            "high_price": empty,
+            "low_price": empty,
+            "close_price": empty,
+            "volume": empty,
+            "open_interest": empty,
+        }
+
+    interval = seconds * 1000000
+    if seconds == 60:
+        keys = (times // interval) % 60
+    else:
+        keys = times // interval
+
+    starts = np.flatnonzero(np.concatenate([[True], keys[1:] != keys[:-1]]))
+    ends = np.concatenate([starts[1:], [len(prices)]])
+
+    # 成交量变化计入tick所在的bar，第一个tick没有变化量
+    volume_changes = np.concatenate([[0], np.maximum(np.diff(volumes), 0)])
+
+    if seconds == 60:
+        bar_times = times[ends - 1] // interval * interval
+    else:
+        bar_times = keys[starts] * interval
+
+    result = {
+        "datetime": bar_times.astype("datetime64[us]"),
+        "open_price": prices[starts],
+        "high_price": np.maximum.reduceat(prices, starts),
+        "low_price": np.minimum.reduceat(prices, starts),
+        "close_price": prices[ends - 1],
+        "volume": np.add.reduceat(volume_changes, starts),
+        "open_interest": open_interests[ends - 1],
+    }
+
+    if not include_last:
+        for key, value in result.items():
+            result[key] = value[:-1]
+
+    return result
+
+
+def create_bars(
+    data: dict,
+    symbol: str,
+    exchange: Exchange,
+    gateway_name: str,
+    interval: Interval = Interval.MINUTE
+):
+    """
+    Create list of BarData from arrays returned by resample_ticks.
+    """
+    bars = []
+    for dt, open_price, high_price, low_price, close_price, volume, open_interest in zip(
+        data["datetime"].tolist(),
+        data["open_price"].tolist(),
+        data["high_price"].tolist(),
+        data["low_price"].tolist(),
+        data["close_price"].tolist(),
+        data["volume"].tolist(),
+        data["open_interest"].tolist(),
+    ):
+        bar = BarData(
+            symbol=symbol,
+            exchange=exchange,
+            datetime=dt,
+            interval=interval,
+            gateway_name=gateway_name,
+            open_price=open_price,
+            high_price=high_price,
+            low_price=low_price,
+            close_price=close_price,
+            volume=volume,
+            open_interest=open_interest
+        )
+        bars.append(bar)
+    return bars
+
+
 class ArrayManager(object):
     """
     For:
@@ -420,12 +1072,21 @@ class ArrayManager(object):
         self.size = size
         # 如果没有达到size大小，计算是没有意义的，不进行计算，一旦达到size大小，则开始计算
         self.inited = False
+        # 环形缓冲区，长度为2倍size，每个数据同时写入pos和pos + size两个位置，
+        # 这样最近size个数据总是连续的buffer[pos + 1:pos + 1 + size]，
+        # 更新bar时不需要平移整个数组
         # 使用numpy ,速度比list提升10以上
-        self.open_array = np.zeros(size)
-        self.high_array = np.zeros(size)
-        self.low_array = np.zeros(size)
-        self.close_array = np.zeros(size)
-        self.volume_array = np.zeros(size)
+        self.pos = size - 1
+        self.open_buffer = np.zeros(size * 2)
+        self.high_buffer = np.zeros(size * 2)
+        self.low_buffer = np.zeros(size * 2)
+        self.close_buffer = np.zeros(size * 2)
+        self.volume_buffer = np.zeros(size * 2)
+        self.open_interest_buffer = np.zeros(size * 2)
+        # 增量计算的指标，(name, params)对应指标对象
+        self.indicators = {}
+        # 当前bar已计算的talib结果，(name, params)对应结果，update_bar时清空
+        self.results = {}
 
     def update_bar(self, bar):
         """
@@ -436,18 +1097,111 @@ class ArrayManager(object):
         self.count += 1
         if not self.inited and self.count >= self.size:
             self.inited = True
-        # 1把老数据丢掉，2数组向左平移一个，
-        self.open_array[:-1] = self.open_array[1:]
-        self.high_array[:-1] = self.high_array[1:]
-        self.low_array[:-1] = self.low_array[1:]
-        self.close_array[:-1] = self.close_array[1:]
-        self.volume_array[:-1] = self.volume_array[1:]
-        # 3倒数第一个填充新的数据
-        self.open_array[-1] = bar.open_price
-        self.high_array[-1] = bar.high_price
-        self.low_array[-1] = bar.low_price
-        self.close_array[-1] = bar.close_price
-        self.volume_array[-1] = bar.volume
+        self.results.clear()
+        # 覆盖最老的数据，O(1)
+        pos = self.pos + 1
+        if pos == self.size:
+            pos = 0
+        self.pos = pos
+        mirror = pos + self.size
+
+        self.open_buffer[pos] = self.open_buffer[mirror] = bar.open_price
+        self.high_buffer[pos] = self.high_buffer[mirror] = bar.high_price
+        self.low_buffer[pos] = self.low_buffer[mirror] = bar.low_price
+        self.close_buffer[pos] = self.close_buffer[mirror] = bar.close_price
+        self.volume_buffer[pos] = self.volume_buffer[mirror] = bar.volume
+        self.open_interest_buffer[pos] = self.open_interest_buffer[mirror] = bar.open_interest
+
+        for indicator in self.indicators.values():
+            indicator.update(
+                bar.open_price,
+                bar.high_price,
+                bar.low_price,
+                bar.close_price,
+                bar.volume
+            )
+
+    def _get_result(self, key: tuple, func: Callable, *args):
+        """
+        Get talib result of func calculated with data of current bar,
+        and cache it until next update_bar. Returned arrays are shared
+        by all callers in the same bar, so never modify them.
+        获取当前bar的talib计算结果，同一根bar内重复调用不再计算
+        """
+        result = self.results.get(key, None)
+        if result is None:
+            result = func(*args)
+            self.results[key] = result
+        return result
+
+    def get_indicator(self, name: str, *params):
+        """
+        Get incremental indicator object (see vnpy.trader.indicator),
+        e.g. get_indicator("atr", 14), which is updated in O(1) with
+        every new bar and keeps its latest result in value attribute.
+        The indicator is created on first call and warmed up with bars
+        already in array manager.
+        获取增量计算的指标对象，每根bar自动更新，最新结果在value属性
+        """
+        key = (name, params)
+        indicator = self.indicators.get(key, None)
+
+        if not indicator:
+            indicator = INDICATOR_CLASSES[name](*params)
+
+            count = min(self.count, self.size)
+            if count:
+                for open_price, high_price, low_price, close_price, volume in zip(
+                    self.open[-count:],
+                    self.high[-count:],
+                    self.low[-count:],
+                    self.close[-count:],
+                    self.volume[-count:],
+                ):
+                    indicator.update(
+                        open_price, high_price, low_price, close_price, volume
+                    )
+
+            self.indicators[key] = indicator
+
+        return indicator
+
+    def _window(self, buffer):
+        """
+        Get contiguous view of the latest size values, oldest first.
+        """
+        start = self.pos + 1
+        return buffer[start:start + self.size]
+
+    @property
+    def open_array(self):
+        """"""
+        return self._window(self.open_buffer)
+
+    @property
+    def high_array(self):
+        """"""
+        return self._window(self.high_buffer)
+
+    @property
+    def low_array(self):
+        """"""
+        return self._window(self.low_buffer)
+
+    @property
+    def close_array(self):
+        """"""
+        return self._window(self.close_buffer)
+
+    @property
+    def volume_array(self):
+        """"""
+        return self._window(self.volume_buffer)
+
+    @property
+    def open_interest_array(self):
+        """"""
+        return self._window(self.open_interest_buffer)
 
     @property
     def open(self):
@@ -489,13 +1243,21 @@ class ArrayManager(object):
         """
         return self.volume_array
 
+    @property
+    def open_interest(self):
+        """
+        Get open interest time series.
+        获取到 持仓量 数据序列
+        """
+        return self.open_interest_array
+
     def sma(self, n, array=False):
         """
         Simple moving average.
         简单移动均线  n是窗口
         array  False 返回最后一个数据， True 返回数组
         """
-        result = talib.SMA(self.close, n)
+        result = self._get_result(("sma", n), talib.SMA, self.close, n)
         if array:
             return result
         return result[-1]
@@ -506,7 +1268,7 @@ class ArrayManager(object):
         标准差 n是窗口
         array  False 返回最后一个数据， True 返回数组
         """
-        result = talib.STDDEV(self.close, n)
+        result = self._get_result(("std", n), talib.STDDEV, self.close, n)
         if array:
             return result
         return result[-1]
@@ -517,7 +1279,9 @@ class ArrayManager(object):
         n是窗口
         array  False 返回最后一个数据， True 返回数组
         """
-        result = talib.CCI(self.high, self.low, self.close, n)
+        result = self._get_result(
+            ("cci", n), talib.CCI, self.high, self.low, self.close, n
+        )
         if array:
             return result
         return result[-1]
@@ -528,7 +1292,9 @@ class ArrayManager(object):
         计算 ATR  n是窗口
         array  False 返回最后一个数据， True 返回数组
         """
-        result = talib.ATR(self.high, self.low, self.close, n)
+        result = self._get_result(
+            ("atr", n), talib.ATR, self.high, self.low, self.close, n
+        )
         if array:
             return result
         return result[-1]
@@ -539,7 +1305,7 @@ class ArrayManager(object):
         n是窗口
         array  False 返回最后一个数据， True 返回数组
         """
-        result = talib.RSI(self.close, n)
+        result = self._get_result(("rsi", n), talib.RSI, self.close, n)
         if array:
             return result
         return result[-1]
@@ -548,8 +1314,9 @@ class ArrayManager(object):
         """
         MACD.
         """
-        macd, signal, hist = talib.MACD(
-            self.close, fast_period, slow_period, signal_period
+        macd, signal, hist = self._get_result(
+            ("macd", fast_period, slow_period, signal_period),
+            talib.MACD, self.close, fast_period, slow_period, signal_period
         )
         if array:
             return macd, signal, hist
@@ -559,7 +1326,9 @@ class ArrayManager(object):
         """
         ADX.
         """
-        result = talib.ADX(self.high, self.low, self.close, n)
+        result = self._get_result(
+            ("adx", n), talib.ADX, self.high, self.low, self.close, n
+        )
         if array:
             return result
         return result[-1]
@@ -592,14 +1361,259 @@ class ArrayManager(object):
         """
         Donchian Channel.
         """
-        up = talib.MAX(self.high, n)
-        down = talib.MIN(self.low, n)
+        up = self._get_result(("max", n), talib.MAX, self.high, n)
+        down = self._get_result(("min", n), talib.MIN, self.low, n)
 
         if array:
             return up, down
         return up[-1], down[-1]
 
 
+def _rolling_mean(data: np.ndarray, n: int):
+    """
+    Rolling mean of last n columns for each row, nan before n columns.
+    """
+    result = np.full(data.shape, np.nan)
+    if data.shape[1] < n:
+        return result
+
+    total = np.cumsum(data, axis=1)
+    result[:, n - 1] = total[:, n - 1]
+    result[:, n:] = total[:, n:] - total[:, :-n]
+    return result / n
+
+
+def _wilder(data: np.ndarray, n: int):
+    """
+    Wilder smoothing of each row seeded by mean of first n columns,
+    same as talib. One numpy operation per column for all rows.
+    """
+    result = np.full(data.shape, np.nan)
+    if data.shape[1] < n:
+        return result
+
+    value = data[:, :n].mean(axis=1)
+    result[:, n - 1] = value
+    for i in range(n, data.shape[1]):
+        value = value + (data[:, i] - value) / n
+        result[:, i] = value
+    return result
+
+
+class PanelArrayManager(object):
+    """
+    Time series container of bar data for a basket of symbols, with
+    2-D (symbols x window) arrays and vectorized indicators calculated
+    for all symbols at once. Results are arrays with one value for each
+    symbol in the order of vt_symbols, or 2-D arrays if array is True.
+    多个交易对的bar数据容器，一次计算全部交易对的指标
+    """
+
+    def __init__(self, vt_symbols: list, size=100):
+        """Constructor"""
+        self.vt_symbols = list(vt_symbols)
+        self.rows = {vt_symbol: n for n, vt_symbol in enumerate(self.vt_symbols)}
+
+        self.count = 0
+        self.size = size
+        self.inited = False
+
+        # 与ArrayManager相同的双倍长度环形缓冲区，每行一个交易对
+        shape = (len(self.vt_symbols), size * 2)
+        self.pos = size - 1
+        self.open_buffer = np.zeros(shape)
+        self.high_buffer = np.zeros(shape)
+        self.low_buffer = np.zeros(shape)
+        self.close_buffer = np.zeros(shape)
+        self.volume_buffer = np.zeros(shape)
+        self.open_interest_buffer = np.zeros(shape)
+
+    def update_bars(self, bars: dict):
+        """
+        Update bars of the same period, vt_symbol mapping to BarData.
+        Symbols without bar in this period repeat their last close
+        price with 0 volume.
+        """
+        self.count += 1
+        if not self.inited and self.count >= self.size:
+            self.inited = True
+
+        last = self.pos
+        pos = last + 1
+        if pos == self.size:
+            pos = 0
+        self.pos = pos
+        mirror = pos + self.size
+
+        last_close = self.close_buffer[:, last]
+        for buffer in [self.open_buffer, self.high_buffer,
+                       self.low_buffer, self.close_buffer]:
+            buffer[:, pos] = last_close
+        self.volume_buffer[:, pos] = 0
+        self.open_interest_buffer[:, pos] = self.open_interest_buffer[:, last]
+
+        for vt_symbol, bar in bars.items():
+            row = self.rows.get(vt_symbol, None)
+            if row is None:
+                continue
+
+            self.open_buffer[row, pos] = bar.open_price
+            self.high_buffer[row, pos] = bar.high_price
+            self.low_buffer[row, pos] = bar.low_price
+            self.close_buffer[row, pos] = bar.close_price
+            self.volume_buffer[row, pos] = bar.volume
+            self.open_interest_buffer[row, pos] = bar.open_interest
+
+        for buffer in [self.open_buffer, self.high_buffer, self.low_buffer,
+                       self.close_buffer, self.volume_buffer,
+                       self.open_interest_buffer]:
+            buffer[:, mirror] = buffer[:, pos]
+
+    def _window(self, buffer):
+        """
+        Get view of the latest size columns, oldest first.
+        """
+        start = self.pos + 1
+        return buffer[:, start:start + self.size]
+
+    @property
+    def open(self):
+        """"""
+        return self._window(self.open_buffer)
+
+    @property
+    def high(self):
+        """"""
+        return self._window(self.high_buffer)
+
+    @property
+    def low(self):
+        """"""
+        return self._window(self.low_buffer)
+
+    @property
+    def close(self):
+        """"""
+        return self._window(self.close_buffer)
+
+    @property
+    def volume(self):
+        """"""
+        return self._window(self.volume_buffer)
+
+    @property
+    def open_interest(self):
+        """"""
+        return self._window(self.open_interest_buffer)
+
+    def get_row(self, vt_symbol: str):
+        """
+        Get row index of vt_symbol in result arrays.
+        """
+        return self.rows[vt_symbol]
+
+    def sma(self, n, array=False):
+        """
+        Simple moving average of all symbols.
+        """
+        if array:
+            return _rolling_mean(self.close, n)
+        return self.close[:, -n:].mean(axis=1)
+
+    def std(self, n, array=False):
+        """
+        Standard deviation of all symbols.
+        """
+        if array:
+            # 减去各交易对最新价后再计算，避免高价格时E[x²]-E[x]²的精度损失
+            close = self.close
+            shifted = close - close[:, -1:]
+            mean = _rolling_mean(shifted, n)
+            square = _rolling_mean(shifted ** 2, n)
+            return np.sqrt(np.maximum(square - mean ** 2, 0))
+        return self.close[:, -n:].std(axis=1)
+
+    def atr(self, n, array=False):
+        """
+        Average True Range of all symbols.
+        """
+        high = self.high[:, 1:]
+        low = self.low[:, 1:]
+        last_close = self.close[:, :-1]
+        tr = np.maximum.reduce([
+            high - low,
+            np.abs(high - last_close),
+            np.abs(low - last_close)
+        ])
+
+        result = np.full(self.close.shape, np.nan)
+        result[:, 1:] = _wilder(tr, n)
+        if array:
+            return result
+        return result[:, -1]
+
+    def rsi(self, n, array=False):
+        """
+        Relative Strenght Index of all symbols.
+        """
+        change = np.diff(self.close, axis=1)
+        gain = _wilder(np.maximum(change, 0), n)
+        loss = _wilder(np.maximum(-change, 0), n)
+
+        total = gain + loss
+        result = np.full(self.close.shape, np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result[:, 1:] = np.where(total > 0, 100 * gain / total, 0)
+        result[:, 1:][np.isnan(gain)] = np.nan
+
+        if array:
+            return result
+        return result[:, -1]
+
+    def boll(self, n, dev, array=False):
+        """
+        Bollinger Channel of all symbols.
+        """
+        mid = self.sma(n, array)
+        std = self.std(n, array)
+        return mid + std * dev, mid - std * dev
+
+    def keltner(self, n, dev, array=False):
+        """
+        Keltner Channel of all symbols.
+        """
+        mid = self.sma(n, array)
+        atr = self.atr(n, array)
+        return mid + atr * dev, mid - atr * dev
+
+    def donchian(self, n, array=False):
+        """
+        Donchian Channel of all symbols.
+        """
+        if not array:
+            return self.high[:, -n:].max(axis=1), self.low[:, -n:].min(axis=1)
+
+        up = np.full(self.close.shape, np.nan)
+        down = np.full(self.close.shape, np.nan)
+        for i in range(n - 1, self.size):
+            up[:, i] = self.high[:, i - n + 1:i + 1].max(axis=1)
+            down[:, i] = self.low[:, i - n + 1:i + 1].min(axis=1)
+        return up, down
+
+    def returns(self, n=1, array=False):
+        """
+        Percentage change of close price over n bars of all symbols.
+        """
+        close = self.close
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if not array:
+                return close[:, -1] / close[:, -1 - n] - 1
+
+            result = np.full(close.shape, np.nan)
+            result[:, n:] = close[:, n:] / close[:, :-n] - 1
+            return result
+
+
 def virtual(func: "callable"):
     """
     mark a function as "virtual", which means that this function can be override.